@@ -1,28 +1,52 @@
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
-import os
+from app.utils.token_cache import RevokedTokenCache
+from app.utils.static_files import StaticManifest
+from app.utils.metrics import RequestMetrics
+from app.utils.passwords import PasswordHasher
+from app.utils.rate_limit import RateLimiter
 
 db = SQLAlchemy()
 jwt = JWTManager()
+revoked_token_cache = RevokedTokenCache()
+static_manifest = StaticManifest()
+request_metrics = RequestMetrics()
+password_hasher = PasswordHasher()
+rate_limiter = RateLimiter()
 
 def create_app(config_class=Config):
-    app = Flask(__name__, static_folder='../static', static_url_path='')
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    # static/ is served by static_manifest below rather than Flask's own static route
+    app = Flask(__name__, static_folder=None)
+    CORS(app, resources={r"/api/*": {"origins": "*"}},
+         expose_headers=['X-Next-Cursor', 'Retry-After', 'RateLimit-Limit', 'RateLimit-Remaining', 'RateLimit-Reset'])
     app.config.from_object(config_class)
     
-    # Initialize Flask extensions
+    # Initialize Flask extensions; the engine profile has to be resolved before the engine is created
+    from app.utils import database
+    database.configure_engine(app)
     db.init_app(app)
+    database.init_app(app)
     jwt.init_app(app)  # Keep only JWT initialization
+    revoked_token_cache.init_app(app)
+    static_manifest.init_app(app)
+    request_metrics.init_app(app)
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
+    
+    from app.utils import query_tracker, change_feed
+    query_tracker.init_app(app)
+    change_feed.init_app(app)
     
     # JWT configuration
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        from app.models.user import TokenBlacklist
         jti = jwt_payload["jti"]
-        return TokenBlacklist.is_token_revoked(jti)
+        # Tokens issued before the user's token_version was bumped, or before the user was deleted, count as revoked too
+        return (revoked_token_cache.is_revoked(jti) or
+                revoked_token_cache.is_stale(int(jwt_payload["sub"]), jwt_payload.get("ver", 0), jwt_payload["iat"]))
     
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
@@ -46,30 +70,33 @@ def create_app(config_class=Config):
     from app.routes.quotation_routes import quotation_bp
     from app.routes.order_routes import order_bp
     from app.routes.inventory_routes import inventory_bp
+    from app.routes.metrics_routes import metrics_bp
+    from app.routes.dashboard_routes import dashboard_bp
+    from app.routes.change_routes import change_bp
     app.register_blueprint(user_bp)
     app.register_blueprint(product_bp)
     app.register_blueprint(quotation_bp)
     app.register_blueprint(order_bp)
     app.register_blueprint(inventory_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(change_bp)
+    
+    from app.cli import register_commands
+    register_commands(app)
     
     # Add route to serve files from uploads directory
-    @app.route('/uploads/<filename>')
+    @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
-        uploads_dir = os.path.join(os.path.dirname(app.root_path), 'uploads')
-        return send_from_directory(uploads_dir, filename)
+        from app.utils.uploads import send_upload
+        return send_upload(filename)
     
     # Serve index.html for root route
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve_static(path):
-        try:
-            # First try to get the file directly
-            return app.send_static_file(path)
-        except:
-            # If file not found and path ends with .html or if it's an API route, return 404
-            if path.endswith('.html') or path.startswith('api/'):
-                return app.send_static_file('404.html'), 404
-            # For any other route, return index.html
-            return app.send_static_file('index.html')
+        # Files come from the startup manifest; unknown paths get index.html,
+        # or 404.html if they look like a page or an API route
+        return static_manifest.serve(path)
 
     return app
@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import click
+from app import db
+from app.models.image_variant import ImageVariant
+from app.models.product import Product
+from app.utils import product_search, images, uploads, assets, counters, stock_index, change_feed, seed as seed_data
+
+def register_commands(app):
+    """Attach the project's flask CLI commands to app"""
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Rebuild the product full-text search index from the products table"""
+        count = product_search.rebuild_index()
+        if product_search.uses_fts():
+            click.echo(f'Indexed {count} products')
+        else:
+            click.echo('FTS5 is not available on this database; search uses LIKE matching')
+
+    @app.cli.command('build-image-variants')
+    def build_image_variants():
+        """Generate missing image variants for every product with an upload"""
+        if images.Image is None:
+            click.echo('Pillow is not installed; cannot build image variants')
+            return
+        done = {source for (source,) in ImageVariant.query.with_entities(ImageVariant.source)}
+        pending = [image for (image,) in Product.query.with_entities(Product.image).filter(Product.image.isnot(None))
+                   if image not in done]
+        for image in pending:
+            try:
+                images.generate_variants(image)
+            except Exception as e:
+                click.echo(f'Failed for {image}: {str(e)}')
+        click.echo(f'Processed {len(pending)} images')
+
+    @app.cli.command('reconcile-counters')
+    def reconcile_counters():
+        """Rebuild the dashboard counters from the quotations, orders, inventory and users tables"""
+        drift = counters.rebuild()
+        for (supplier_id, name), (old, new) in sorted(drift.items()):
+            scope = 'all' if supplier_id == counters.GLOBAL else f'supplier {supplier_id}'
+            click.echo(f'{scope:<16}{name:<24}{old:>10} -> {new}')
+        click.echo(f'Rebuilt dashboard counters; {len(drift)} had drifted')
+
+    @app.cli.command('rebuild-stock-index')
+    def rebuild_stock_index():
+        """Recompute every product's total stock and supplier count from the inventory table"""
+        count = stock_index.rebuild()
+        click.echo(f'Indexed stock for {count} products')
+
+    @app.cli.command('compact-changes')
+    def compact_changes():
+        """Drop change feed entries past the configured retention and row limit"""
+        removed = change_feed.compact()
+        click.echo(f'Removed {removed} change log entries')
+
+    @app.cli.command('migrate-uploads')
+    def migrate_uploads():
+        """Move product images saved under their upload names into content-addressed storage"""
+        migrated, missing = uploads.migrate_legacy()
+        click.echo(f'Migrated {migrated} images')
+        for image in missing:
+            click.echo(f'Missing file for {image}')
+
+    @app.cli.command('build-assets')
+    @click.option('--out', 'out_dir', default=None, help='Output folder (default: build/static)')
+    def build_assets(out_dir):
+        """Bundle, minify and fingerprint static/ for deployment; serve the result via STATIC_ROOT"""
+        project_root = os.path.dirname(app.root_path)
+        out_dir = out_dir or os.path.join(project_root, 'build', 'static')
+        report_path = os.path.join(os.path.dirname(os.path.abspath(out_dir)), 'asset-report.json')
+        previous = assets.load_report(report_path)
+        try:
+            report = assets.build(os.path.join(project_root, 'static'), out_dir)
+        except assets.AssetBuildError as e:
+            raise click.ClickException(str(e))
+        assets.save_report(report_path, report)
+
+        click.echo(f"{'bundle':<28}{'files':>6}{'source':>10}{'min':>10}{'gzip':>10}{'br':>10}{'delta':>10}")
+        for name, entry in report.items():
+            before = previous.get(name, {}).get('gzip')
+            delta = f"{entry['gzip'] - before:+d}" if before is not None and entry['gzip'] is not None else ''
+            click.echo(f"{name:<28}{entry['sources']:>6}{entry['source_bytes']:>10}{entry['bytes']:>10}"
+                       f"{entry['gzip'] or '-':>10}{entry['br'] or '-':>10}{delta:>10}")
+        click.echo(f'Wrote {out_dir}; size report in {report_path}')
+
+    @app.cli.command('seed')
+    @click.option('--suppliers', default=50, show_default=True, help='Supplier accounts to create')
+    @click.option('--products', default=2000, show_default=True, help='Catalogue size')
+    @click.option('--quotations', default=20000, show_default=True,
+                  help='Quotations to create; accepted ones also get an order')
+    @click.option('--items', 'items_per_quotation', default=4, show_default=True,
+                  help='Median line items per quotation')
+    @click.option('--seed', 'random_seed', default=42, show_default=True, help='Random seed')
+    @click.option('--reset', is_flag=True, help='Drop and recreate every table first')
+    @click.option('--snapshot', 'snapshot_path', default=None, help='Save the seeded database to this file')
+    @click.option('--from-snapshot', 'restore_path', default=None,
+                  help='Load a saved snapshot instead of generating data')
+    def seed(suppliers, products, quotations, items_per_quotation, random_seed, reset, snapshot_path, restore_path):
+        """Fill the database with a deterministic synthetic dataset for development and load testing"""
+        try:
+            if restore_path:
+                if not os.path.exists(restore_path):
+                    raise click.ClickException(f'Snapshot {restore_path} does not exist')
+                seed_data.load_snapshot(restore_path)
+                click.echo(f'Restored database from {restore_path}')
+                return
+
+            if reset:
+                seed_data.reset_database()
+            else:
+                db.create_all()
+            started = time.perf_counter()
+            counts = seed_data.generate(suppliers, products, quotations, items_per_quotation, random_seed)
+            elapsed = time.perf_counter() - started
+            for table, count in counts.items():
+                click.echo(f'{table:<20}{count:>10}')
+            click.echo(f'Inserted {sum(counts.values())} rows in {elapsed:.1f}s; '
+                       f'supplier password is {seed_data.SUPPLIER_PASSWORD}')
+
+            if snapshot_path:
+                seed_data.save_snapshot(snapshot_path)
+                click.echo(f'Saved snapshot to {snapshot_path}')
+        except seed_data.SnapshotError as e:
+            raise click.ClickException(str(e))
+
+    @app.cli.command('bench')
+    @click.option('--sizes', default='100,1000,10000', show_default=True,
+                  help='Comma-separated dataset sizes, in quotations')
+    @click.option('-k', 'keyword', default=None, help='Only run cases whose name contains this')
+    @click.option('--save', 'save_path', default=None, help='Results file (default: build/benchmarks.json)')
+    @click.option('--baseline', 'baseline_path', default=None,
+                  help='Baseline to compare against (default: benchmarks/baseline.json)')
+    @click.option('--save-baseline', is_flag=True, help='Write the results as the new baseline')
+    @click.option('--threshold', default=0.2, show_default=True,
+                  help='Median slowdown, as a fraction, reported as a regression')
+    def bench(sizes, keyword, save_path, baseline_path, save_baseline, threshold):
+        """Run the microbenchmarks in benchmarks/ and compare them with the stored baseline"""
+        import benchmarks
+
+        project_root = os.path.dirname(app.root_path)
+        save_path = save_path or os.path.join(project_root, 'build', 'benchmarks.json')
+        baseline_path = baseline_path or os.path.join(project_root, 'benchmarks', 'baseline.json')
+        try:
+            sizes = [int(size) for size in sizes.split(',')]
+        except ValueError:
+            raise click.ClickException('--sizes must be comma-separated integers')
+
+        def report(entry):
+            stats = entry['stats']
+            click.echo(f"{entry['fullname']:<52}{stats['median'] * 1e6:>12.1f} us"
+                       f"{stats['iqr'] * 1e6:>10.1f} iqr{stats['rounds']:>7} rounds")
+
+        results = benchmarks.run(sizes, benchmarks.seeded_dataset, keyword, report)
+        benchmarks.save_results(save_path, results)
+        click.echo(f'Saved results to {save_path}')
+        if save_baseline:
+            benchmarks.save_results(baseline_path, results)
+            click.echo(f'Saved baseline to {baseline_path}')
+            return
+
+        baseline = benchmarks.load_results(baseline_path)
+        if baseline is None:
+            click.echo(f'No baseline at {baseline_path}; run with --save-baseline to record one')
+            return
+        if baseline.get('machine_info', {}).get('node') != results['machine_info']['node']:
+            click.echo('Warning: the baseline was recorded on another machine')
+
+        rows = benchmarks.compare(results, baseline, threshold)
+        click.echo(f"{'benchmark':<52}{'baseline':>12}{'current':>12}{'change':>9}")
+        for fullname, before, now, change, verdict in rows:
+            before_text = f'{before * 1e6:.1f}' if before is not None else '-'
+            change_text = f'{change:+.0%}' if change is not None else ''
+            click.echo(f'{fullname:<52}{before_text:>12}{now * 1e6:>12.1f}{change_text:>9}  {verdict}')
+        regressed = [row[0] for row in rows if row[4] == 'regressed']
+        if regressed:
+            raise click.ClickException(f'{len(regressed)} benchmarks regressed beyond {threshold:.0%}: '
+                                       f'{", ".join(regressed)}')
+
+    @app.cli.command('loadtest')
+    @click.option('--url', default='http://127.0.0.1:5000', show_default=True, help='Server to load')
+    @click.option('--stages', default='2:10,10:30,10:30', show_default=True,
+                  help='Ramp schedule as users:seconds stages')
+    @click.option('--scenario', 'scenarios', multiple=True,
+                  help='Only run these scenarios (procurement, supplier_dashboard, admin_dashboard)')
+    @click.option('--think', default=0.0, show_default=True, help='Mean pause between requests, in seconds')
+    @click.option('--suppliers', 'supplier_count', default=20, show_default=True,
+                  help='Seeded supplier accounts to spread virtual users over')
+    @click.option('--out', 'out_path', default=None, help='Results file (default: build/loadtest.json)')
+    def loadtest(url, stages, scenarios, think, supplier_count, out_path):
+        """Replay dashboard workflows over HTTP with a ramp of concurrent virtual users"""
+        from benchmarks import load
+
+        out_path = out_path or os.path.join(os.path.dirname(app.root_path), 'build', 'loadtest.json')
+        try:
+            schedule = load.parse_stages(stages)
+            unknown = set(scenarios) - set(load.SCENARIOS)
+            if unknown:
+                raise load.LoadTestError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            weights = {name: weight for name, weight in load.DEFAULT_WEIGHTS.items()
+                       if not scenarios or name in scenarios}
+            admin, suppliers = load.prepare_accounts(app.config['ADMIN_EMAIL'], app.config['ADMIN_PASSWORD'],
+                                                     supplier_count)
+            runner = load.LoadRunner(url, admin, suppliers, weights, think)
+        except load.LoadTestError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(f'Loading {url} with {len(suppliers)} supplier accounts, '
+                   f'{sum(s for _, s in schedule):.0f}s in {len(schedule)} stages')
+        windows = runner.run(schedule, lambda elapsed, users, requests: click.echo(
+            f'  {elapsed:5.0f}s  {users:4} users  {requests:7} requests'))
+        summary = load.summarize(runner.recorder.samples, windows)
+
+        def ms(seconds):
+            return f'{seconds * 1000:.1f}' if seconds is not None else '-'
+
+        header = f"{'':<42}{'requests':>9}{'rps':>8}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        click.echo('\n' + header)
+        rows = list(summary['endpoints'].items()) + [('total', summary['total'])]
+        for endpoint, stats in rows:
+            click.echo(f"{endpoint:<42}{stats['requests']:>9}{stats['rps']:>8.1f}{stats['error_rate']:>8.1%}"
+                       f"{ms(stats['p50']):>9}{ms(stats['p95']):>9}{ms(stats['p99']):>9}")
+        click.echo('\n' + header.replace(' ' * 42, f"{'stage':<42}", 1))
+        for index, stats in enumerate(summary['stages'], start=1):
+            label = f"{index}: ramp to {stats['users']} users over {stats['seconds']:.0f}s"
+            click.echo(f"{label:<42}{stats['requests']:>9}{stats['rps']:>8.1f}{stats['error_rate']:>8.1%}"
+                       f"{ms(stats['p50']):>9}{ms(stats['p95']):>9}{ms(stats['p99']):>9}")
+
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        with open(out_path, 'w') as f:
+            json.dump({'url': url, 'stages': schedule, 'weights': weights, **summary}, f, indent=2)
+        click.echo(f'Saved results to {out_path}')
@@ -0,0 +1,41 @@
+from flask import jsonify, request, current_app
+from app.models.user import UserRole
+from app.utils import change_feed
+from app.utils.auth import auth_required
+from app.utils.pagination import encode_cursor, decode_cursor
+
+@auth_required
+def get_changes(current_user):
+    """
+    Order and quotation changes after ?since=<cursor>: every one for admins,
+    those of the supplier's own quotations and orders otherwise. Without
+    since, only the cursor to start from is returned. A 410 with resync set
+    means the changes since the cursor are gone and the collections must be
+    reloaded.
+    """
+    since = None
+    if request.args.get('since'):
+        try:
+            *_, since = decode_cursor(request.args['since'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    try:
+        limit = int(request.args.get('limit', current_app.config['PAGE_SIZE_DEFAULT']))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    limit = min(limit, current_app.config['PAGE_SIZE_MAX'])
+
+    supplier_id = None if current_user.role == UserRole.ADMIN else current_user.id
+    try:
+        entries, position, has_more = change_feed.changes_since(since, supplier_id, limit)
+    except change_feed.ResyncRequired as e:
+        return jsonify({'error': str(e), 'resync': True, 'cursor': encode_cursor(e.head)}), 410
+
+    return jsonify({
+        'changes': [entry.to_dict() for entry in entries],
+        'cursor': encode_cursor(position),
+        'has_more': has_more
+    }), 200
@@ -0,0 +1,17 @@
+from flask import jsonify, request
+from app.models.user import UserRole
+from app.utils import counters
+from app.utils.auth import auth_required
+
+@auth_required
+def get_summary(current_user):
+    """
+    Counts for the dashboards: across all suppliers for admins (or one
+    supplier with ?supplier_user_id=), the supplier's own otherwise.
+    """
+    if current_user.role == UserRole.ADMIN:
+        supplier_user_id = request.args.get('supplier_user_id', type=int)
+    else:
+        supplier_user_id = current_user.id
+    
+    return jsonify({'supplier_user_id': supplier_user_id, **counters.summary(supplier_user_id)}), 200
@@ -1,9 +1,74 @@
+import io
+import csv
+import json
+import logging
 from app import db
 from app.models.inventory import Inventory
+from app.models.product import Product
 from app.models.user import UserRole
+from app.utils import counters, query_tracker, stock_index
+from app.utils.pagination import apply_date_range, list_response
 from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import bindparam, case
 from sqlalchemy.exc import IntegrityError
 
+BULK_MODES = ('set', 'add')
+
+def _as_integer(value):
+    """An int from a JSON number or CSV text, or None; 1.7 and True are not integers"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _validate_bulk_row(record):
+    product_id = _as_integer(record.get('product_id'))
+    quantity = _as_integer(record.get('quantity'))
+    if product_id is None or quantity is None:
+        return None, 'product_id and quantity must be integers'
+
+    mode = record.get('mode') or 'set'
+    if not isinstance(mode, str):
+        return None, "mode must be 'set' or 'add'"
+    mode = mode.strip().lower()
+    if mode not in BULK_MODES:
+        return None, "mode must be 'set' or 'add'"
+    if mode == 'set' and quantity < 0:
+        return None, 'Quantity cannot be negative'
+    if mode == 'add' and quantity <= 0:
+        return None, 'Quantity must be positive'
+
+    return {'product_id': product_id, 'quantity': quantity, 'mode': mode}, None
+
+def parse_bulk_rows(stream, fmt):
+    """
+    Lazily parse a CSV (with a header row) or NDJSON body of stock updates.
+
+    Yields (line, row, error) so the caller never holds the whole body in memory.
+    """
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text_stream)
+        for record in reader:
+            yield (reader.line_num, *_validate_bulk_row(record))
+    else:
+        for line_no, line in enumerate(text_stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_no, None, 'Invalid JSON'
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, 'Each line must be a JSON object'
+                continue
+            yield (line_no, *_validate_bulk_row(record))
+
 class InventoryController:
     @staticmethod
     def add_product_to_inventory(supplier_id, product_id, quantity):
@@ -16,7 +81,9 @@ class InventoryController:
             
             if inventory_item:
                 # Update existing inventory
+                stock_index.record([(product_id, inventory_item.quantity, inventory_item.quantity + quantity)])
                 inventory_item.quantity += quantity
+                counters.bump({counters.STOCK_UNITS: quantity}, supplier_id)
             else:
                 # Create new inventory entry
                 inventory_item = Inventory(
@@ -25,6 +92,8 @@ class InventoryController:
                     quantity=quantity
                 )
                 db.session.add(inventory_item)
+                stock_index.record([(product_id, 0, quantity)])
+                counters.bump({counters.STOCK_UNITS: quantity, counters.STOCK_LINES: 1}, supplier_id)
                 
             db.session.commit()
             return inventory_item.to_dict(), None
@@ -50,7 +119,9 @@ class InventoryController:
             if inventory_item.quantity < quantity:
                 return None, "Insufficient quantity in inventory"
                 
+            stock_index.record([(product_id, inventory_item.quantity, inventory_item.quantity - quantity)])
             inventory_item.quantity -= quantity
+            counters.bump({counters.STOCK_UNITS: -quantity}, supplier_id)
             db.session.commit()
             
             return inventory_item.to_dict(), None
@@ -58,6 +129,52 @@ class InventoryController:
             db.session.rollback()
             return None, str(e)
 
+    @staticmethod
+    def decrement_for_shipment(supplier_id, items):
+        """
+        Take (product_id, qty) pairs out of a supplier's stock in one statement.
+
+        The UPDATE only touches rows that still hold enough stock, so a row count
+        short of the number of products means at least one line cannot ship.
+        The stock index is updated from the quantities the UPDATE returns.
+        Nothing is committed and the dashboard counters are left to the caller,
+        which commits or rolls back with the order. Returns an error message, or None.
+        """
+        needed = {}
+        for product_id, qty in items:
+            needed[product_id] = needed.get(product_id, 0) + qty
+        if not needed:
+            return None
+
+        table = Inventory.__table__
+        amount = case(needed, value=table.c.product_id)
+        result = db.session.execute(
+            table.update()
+            .where(
+                table.c.supplier_id == supplier_id,
+                table.c.product_id.in_(needed),
+                table.c.quantity >= amount
+            )
+            .values(quantity=table.c.quantity - amount)
+            .returning(table.c.product_id, table.c.quantity)
+        ).all()
+        if len(result) == len(needed):
+            stock_index.record([(product_id, quantity + needed[product_id], quantity) for product_id, quantity in result])
+            return None
+
+        # Failure path only: work out which products are short
+        available = dict(db.session.query(Inventory.product_id, Inventory.quantity).filter(
+            Inventory.supplier_id == supplier_id,
+            Inventory.product_id.in_(needed)
+        ))
+        problems = []
+        for product_id, qty in needed.items():
+            if product_id not in available:
+                problems.append(f'Product {product_id} not found in inventory')
+            elif available[product_id] < qty:
+                problems.append(f'Insufficient quantity for product {product_id} in inventory')
+        return '; '.join(problems) or 'Inventory changed while shipping, please retry'
+
     @staticmethod
     def update_inventory_quantity(supplier_id, product_id, new_quantity):
         """Update the quantity of a product in supplier's inventory"""
@@ -78,8 +195,12 @@ class InventoryController:
                     quantity=new_quantity
                 )
                 db.session.add(inventory_item)
+                stock_index.record([(product_id, 0, new_quantity)])
+                counters.bump({counters.STOCK_UNITS: new_quantity, counters.STOCK_LINES: 1}, supplier_id)
             else:
                 # Update existing inventory
+                stock_index.record([(product_id, inventory_item.quantity, new_quantity)])
+                counters.bump({counters.STOCK_UNITS: new_quantity - inventory_item.quantity}, supplier_id)
                 inventory_item.quantity = new_quantity
                 
             db.session.commit()
@@ -89,10 +210,108 @@ class InventoryController:
             return None, str(e)
 
     @staticmethod
-    def get_supplier_inventory(supplier_id):
-        """Get all inventory items for a supplier"""
+    def get_supplier_inventory(supplier_id, filters):
+        """Get a supplier's inventory as a list response: one page, or every row streamed"""
         try:
-            inventory_items = Inventory.query.filter_by(supplier_id=supplier_id).all()
-            return [item.to_dict() for item in inventory_items], None
+            query = Inventory.query.options(*Inventory.graph_options()).filter_by(supplier_id=supplier_id)
+            query = apply_date_range(query, Inventory.created_at, filters)
+            return list_response(query, Inventory, filters, Inventory.to_dict), None
         except Exception as e:
             return None, str(e)
+
+    @staticmethod
+    def bulk_upsert(supplier_id, rows, chunk_size):
+        """
+        Apply (line, row, error) tuples from parse_bulk_rows in chunked transactions.
+
+        Each chunk costs one product lookup, one inventory lookup, at most three
+        executemany statements and one write each for the stock index and the
+        dashboard counters, whatever its size.
+        """
+        report = {'processed': 0, 'failed': 0, 'errors': []}
+        chunk = []
+        try:
+            for line, row, error in rows:
+                if error:
+                    report['failed'] += 1
+                    report['errors'].append({'line': line, 'error': error})
+                    continue
+                chunk.append((line, row))
+                if len(chunk) >= chunk_size:
+                    InventoryController._apply_bulk_chunk(supplier_id, chunk, report)
+                    chunk = []
+            if chunk:
+                InventoryController._apply_bulk_chunk(supplier_id, chunk, report)
+        except (UnicodeDecodeError, csv.Error) as e:
+            return None, f'Could not parse upload: {str(e)}'
+        report['errors'].sort(key=lambda e: e['line'])
+        return report, None
+
+    @staticmethod
+    def _apply_bulk_chunk(supplier_id, chunk, report):
+        query_tracker.count_unit('chunk')
+        product_ids = {row['product_id'] for _, row in chunk}
+        known_ids = {pid for (pid,) in db.session.query(Product.id).filter(Product.id.in_(product_ids))}
+
+        # Fold repeated products in file order: 'set' resets the running value, 'add' accumulates
+        folded = {}  # product_id -> [set value or None, delta]
+        applied_lines = []
+        for line, row in chunk:
+            if row['product_id'] not in known_ids:
+                report['failed'] += 1
+                report['errors'].append({'line': line, 'error': f'Product {row["product_id"]} not found'})
+                continue
+            entry = folded.setdefault(row['product_id'], [None, 0])
+            if row['mode'] == 'set':
+                entry[0], entry[1] = row['quantity'], 0
+            else:
+                entry[1] += row['quantity']
+            applied_lines.append(line)
+
+        if not folded:
+            return
+
+        existing = {product_id: (row_id, quantity) for product_id, row_id, quantity in db.session.query(
+            Inventory.product_id, Inventory.id, Inventory.quantity
+        ).filter(
+            Inventory.supplier_id == supplier_id,
+            Inventory.product_id.in_(folded)
+        )}
+
+        sets, adds, inserts = [], [], []
+        changes = []  # (product_id, old quantity, new quantity)
+        for product_id, (value, delta) in folded.items():
+            if product_id not in existing:
+                inserts.append({'supplier_id': supplier_id, 'product_id': product_id, 'quantity': (value or 0) + delta})
+                changes.append((product_id, 0, (value or 0) + delta))
+            elif value is None:
+                adds.append({'row_id': existing[product_id][0], 'delta': delta})
+                changes.append((product_id, existing[product_id][1], existing[product_id][1] + delta))
+            else:
+                sets.append({'row_id': existing[product_id][0], 'new_quantity': value + delta})
+                changes.append((product_id, existing[product_id][1], value + delta))
+        units = sum(new - old for _, old, new in changes)
+
+        table = Inventory.__table__
+        try:
+            if sets:
+                db.session.execute(
+                    table.update().where(table.c.id == bindparam('row_id')).values(quantity=bindparam('new_quantity')),
+                    sets
+                )
+            if adds:
+                db.session.execute(
+                    table.update().where(table.c.id == bindparam('row_id')).values(quantity=table.c.quantity + bindparam('delta')),
+                    adds
+                )
+            if inserts:
+                db.session.execute(table.insert(), inserts)
+            stock_index.record(changes)
+            counters.bump({counters.STOCK_UNITS: units, counters.STOCK_LINES: len(inserts)}, supplier_id)
+            db.session.commit()
+            report['processed'] += len(applied_lines)
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f'Bulk inventory chunk failed: {str(e)}')
+            report['failed'] += len(applied_lines)
+            report['errors'].extend({'line': line, 'error': 'Database error occurred'} for line in applied_lines)
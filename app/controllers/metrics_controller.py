@@ -0,0 +1,10 @@
+from flask import jsonify, current_app
+from app.utils.auth import admin_required
+
+@admin_required
+def get_metrics(current_user):
+    metrics = current_app.extensions['request_metrics']
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics are not enabled'}), 404
+    body, content_type = metrics.render()
+    return current_app.response_class(body, content_type=content_type), 200
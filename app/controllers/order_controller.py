@@ -3,27 +3,49 @@ from app.models.order import Order, OrderItem, OrderStatus
 from app.models.quotation import Quotation, QuotationStatus
 from app.models.user import UserRole
 from app import db
+from app.utils import counters, change_feed
 from app.utils.auth import auth_required, admin_required  # Only use JWT auth decorators
 from app.controllers.inventory_controller import InventoryController
+from app.utils.pagination import parse_list_args, apply_date_range, list_response
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+def insert_order_items(order, quotation):
+    """Copy a quotation's line items onto an already-flushed order in one executemany"""
+    rows = [
+        {'order_id': order.id, 'product_id': q_item.product_id, 'qty': q_item.qty, 'price': q_item.price}
+        for q_item in quotation.items
+    ]
+    if rows:
+        db.session.execute(insert(OrderItem), rows)
 
 @auth_required
 def get_orders(current_user):  # current_user is injected by auth_required decorator
+    filters, error = parse_list_args(OrderStatus)
+    if error:
+        return jsonify({'error': error}), 400
+    
     try:
+        query = Order.query.options(*Order.graph_options())
         if current_user.role == UserRole.ADMIN:
-            orders = Order.query.all()
+            supplier_user_id = filters['supplier_user_id']
         else:  # Supplier
-            orders = Order.query.join(Quotation).filter(
-                Quotation.supplier_user_id == current_user.id
-            ).all()
+            supplier_user_id = current_user.id
+        
+        if supplier_user_id is not None:
+            query = query.join(Quotation).filter(Quotation.supplier_user_id == supplier_user_id)
+        if filters['status'] is not None:
+            query = query.filter(Order.status == filters['status'])
+        query = apply_date_range(query, Order.created_at, filters)
         
-        return jsonify([order.to_dict() for order in orders]), 200
+        return list_response(query, Order, filters, Order.to_dict), 200
     except Exception as e:
         current_app.logger.error(f'Error getting orders: {str(e)}')
         return jsonify({'error': 'Failed to retrieve orders'}), 500
 
 @auth_required
 def get_order(current_user, order_id):
-    order = Order.query.get_or_404(order_id)
+    order = Order.query.options(*Order.graph_options(joinedload)).get_or_404(order_id)
     
     # Check if user has access to this order
     if (current_user.role != UserRole.ADMIN and 
@@ -50,20 +72,18 @@ def create_order(current_user):
         return jsonify({'error': 'Order already exists for this quotation'}), 400
     
     # Create order
-    order = Order(quotation_id=quotation.id)
+    order = Order(quotation_id=quotation.id, status=OrderStatus.PENDING)
     db.session.add(order)
+    db.session.flush()
+    order_id = order.id
     
     # Create order items from quotation items
-    for quotation_item in quotation.items:
-        order_item = OrderItem(
-            order=order,
-            product_id=quotation_item.product_id,
-            qty=quotation_item.qty,
-            price=quotation_item.price
-        )
-        db.session.add(order_item)
+    insert_order_items(order, quotation)
+    counters.bump({counters.order_key(OrderStatus.PENDING): 1}, quotation.supplier_user_id)
+    change_feed.record(change_feed.order_change(order, quotation.supplier_user_id, change_feed.CREATED))
     
     db.session.commit()
+    order = Order.query.options(*Order.graph_options(joinedload)).populate_existing().get(order_id)
     return jsonify(order.to_dict()), 201
 
 @auth_required
@@ -80,6 +100,8 @@ def update_order(current_user, order_id):
     if 'status' not in data:
         return jsonify({'error': 'Status is required'}), 400
     
+    old_status = order.status  # Before the shipped claim below updates it in the session
+    shipped_units = 0
     try:
         # Convert status to lowercase for comparison
         status_value = data['status'].lower()
@@ -108,16 +130,24 @@ def update_order(current_user, order_id):
                 if order.status.value != 'confirmed':
                     return jsonify({'error': 'Order must be confirmed before shipping'}), 400
                 
-                # Check and reduce inventory for each order item
-                for order_item in order.items:
-                    result, error = InventoryController.remove_from_inventory(
-                        supplier_id=order.quotation.supplier_user_id,
-                        product_id=order_item.product_id,
-                        quantity=order_item.qty
-                    )
-                    if error:
-                        db.session.rollback()
-                        return jsonify({'error': f'Inventory error: {error}'}), 400
+                # Claim the transition so a concurrent request can't ship (and decrement) twice
+                claimed = Order.query.filter_by(id=order.id, status=OrderStatus.CONFIRMED).update(
+                    {'status': OrderStatus.SHIPPED}, synchronize_session='evaluate'
+                )
+                if not claimed:
+                    db.session.rollback()
+                    return jsonify({'error': 'Order must be confirmed before shipping'}), 400
+                
+                # Reduce inventory for every item in one statement, committed with the status change
+                items = [(order_item.product_id, order_item.qty) for order_item in order.items]
+                error = InventoryController.decrement_for_shipment(
+                    supplier_id=order.quotation.supplier_user_id,
+                    items=items
+                )
+                if error:
+                    db.session.rollback()
+                    return jsonify({'error': f'Inventory error: {error}'}), 400
+                shipped_units = sum(qty for _, qty in items)
         
         else:  # Admin
             # Admin can update to completed if shipped
@@ -129,11 +159,17 @@ def update_order(current_user, order_id):
                 return jsonify({'error': 'Only supplier can mark order as confirmed or shipped'}), 400
         
         order.status = new_status
+        changes = {counters.STOCK_UNITS: -shipped_units}
+        if old_status != new_status:
+            changes.update({counters.order_key(old_status): -1, counters.order_key(new_status): 1})
+        counters.bump(changes, order.quotation.supplier_user_id)
+        change_feed.record(change_feed.order_change(order, order.quotation.supplier_user_id, change_feed.UPDATED))
         db.session.commit()
         
     except ValueError:
         return jsonify({'error': 'Invalid status'}), 400
     
+    order = Order.query.options(*Order.graph_options(joinedload)).populate_existing().get(order_id)
     return jsonify(order.to_dict()), 200
 
 @admin_required
@@ -144,6 +180,8 @@ def delete_order(current_user, order_id):
     if order.status.value != 'pending':
         return jsonify({'error': 'Can only delete pending orders'}), 400
     
+    counters.bump({counters.order_key(OrderStatus.PENDING): -1}, order.quotation.supplier_user_id)
+    change_feed.record(change_feed.order_change(order, order.quotation.supplier_user_id, change_feed.DELETED))
     db.session.delete(order)
     db.session.commit()
     
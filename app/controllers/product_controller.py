@@ -1,38 +1,125 @@
 import os
 import logging
-from datetime import datetime
-from werkzeug.utils import secure_filename
 from flask import jsonify, request, current_app
 from app.models.product import Product
 from app.models.user import UserRole
 from app.models.inventory import Inventory
+from app.models.product_stock import ProductStock
 from app import db
 from app.utils.auth import auth_required, admin_required  # Replace login_required
+from app.utils.pagination import Sort, parse_list_args, apply_date_range, list_response
+from app.utils import product_search, images, uploads, stock_index
+from sqlalchemy.orm import contains_eager
 
 import os.path
 from pathlib import Path
 
-# Get absolute path to the uploads folder
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif','webp'}
 
+# ?sort= values for get_products; 'id' is the default keyset order
+PRODUCT_SORTS = {
+    'id': None,
+    'availability': Sort(ProductStock.total_quantity, lambda product: product.stock.total_quantity,
+                         ProductStock.product_id)
+}
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def ensure_upload_folder():
     try:
-        logging.info(f"Creating upload folder at: {UPLOAD_FOLDER}")
-        Path(UPLOAD_FOLDER).mkdir(parents=True, exist_ok=True)
+        upload_folder = images.upload_root(current_app)
+        logging.info(f"Creating upload folder at: {upload_folder}")
+        Path(upload_folder).mkdir(parents=True, exist_ok=True)
         logging.info("Upload folder created/verified successfully")
     except Exception as e:
         logging.error(f"Error creating upload folder: {str(e)}")
         raise
 
+def save_upload(file):
+    """Store an uploaded image and return the path recorded in Product.image"""
+    ensure_upload_folder()
+    image = uploads.store(file)
+    logging.info(f"File stored as: {image}")
+    return image
+
+def _parse_stock_args():
+    """Read in_stock, min_qty and sort for get_products; returns (options, error)"""
+    args = request.args
+    options = {'in_stock': None, 'min_qty': None, 'sort': None}
+    
+    if args.get('in_stock'):
+        if args['in_stock'].lower() not in ('true', 'false'):
+            return None, "in_stock must be 'true' or 'false'"
+        options['in_stock'] = args['in_stock'].lower() == 'true'
+    
+    if args.get('min_qty'):
+        try:
+            options['min_qty'] = int(args['min_qty'])
+        except ValueError:
+            return None, 'min_qty must be an integer'
+        if options['min_qty'] < 0:
+            return None, 'min_qty cannot be negative'
+    
+    if args.get('sort'):
+        if args['sort'] not in PRODUCT_SORTS:
+            return None, f"sort must be one of: {', '.join(PRODUCT_SORTS)}"
+        options['sort'] = PRODUCT_SORTS[args['sort']]
+    
+    return options, None
+
+def _product_with_stock(product):
+    stock = product.stock.to_dict() if product.stock else {'total_quantity': 0, 'supplier_count': 0, 'in_stock': False}
+    return {**product.to_dict(), 'stock': stock}
+
 @auth_required
 def get_products(current_user):
-    # Return all products
-    products = Product.query.all()
-    return jsonify([product.to_dict() for product in products]), 200
+    filters, error = parse_list_args()
+    if error:
+        return jsonify({'error': error}), 400
+    options, error = _parse_stock_args()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # Availability comes from the product_stock index, never from scanning inventory
+    if options['in_stock'] is None and options['min_qty'] is None and options['sort'] is None:
+        query = Product.query.outerjoin(Product.stock)
+    else:
+        query = Product.query.join(Product.stock)
+        if options['in_stock'] is not None:
+            query = query.filter(ProductStock.total_quantity > 0 if options['in_stock'] else ProductStock.total_quantity == 0)
+        if options['min_qty'] is not None:
+            query = query.filter(ProductStock.total_quantity >= options['min_qty'])
+    query = query.options(contains_eager(Product.stock))
+    
+    if filters['supplier_user_id'] is not None:
+        # Only products the supplier stocks
+        query = query.filter(Product.inventory_items.any(Inventory.supplier_id == filters['supplier_user_id']))
+    query = apply_date_range(query, Product.created_at, filters)
+    
+    try:
+        return list_response(query, Product, filters, _product_with_stock, options['sort']), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@auth_required
+def search_products(current_user):
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Search query (q) is required'}), 400
+    
+    try:
+        limit = int(request.args.get('limit', current_app.config['PAGE_SIZE_DEFAULT']))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    limit = min(limit, current_app.config['PAGE_SIZE_MAX'])
+    
+    results = product_search.search_products(query, limit)
+    return jsonify([
+        {**product.to_dict(), 'snippet': snippet} for product, snippet in results
+    ]), 200
 
 def get_product(product_id):
     product = Product.query.get_or_404(product_id)
@@ -63,21 +150,17 @@ def create_product(current_user):
         logging.info(f"Received file: {file.filename if file else None}")
         if file and file.filename and allowed_file(file.filename):
             try:
-                ensure_upload_folder()
-                filename = secure_filename(file.filename)
-                timestamp = int(datetime.utcnow().timestamp())
-                filename = f"{timestamp}_{filename}"
-                file_path = os.path.join(UPLOAD_FOLDER, filename)
-                logging.info(f"Saving file to: {file_path}")
-                file.save(file_path)
-                logging.info("File saved successfully")
-                product.image = f"uploads/{filename}"
+                product.image = save_upload(file)
             except Exception as e:
                 logging.error(f"Error saving file: {str(e)}")
                 raise
     
     db.session.add(product)
+    db.session.flush()
+    product_search.index_product(product, new=True)
+    stock_index.add_product(product.id)
     db.session.commit()
+    images.schedule_variants(product)
     
     return jsonify(product.to_dict()), 201
 
@@ -109,37 +192,28 @@ def update_product(current_user, product_id):
             product.manufacturer = request.form['manufacturer']
         if 'category' in request.form:
             product.category = request.form['category']
-            
-            # Handle image upload
-            if 'image' in request.files:
-                file = request.files['image']
-                logging.info(f"Received file for update: {file.filename if file else None}")
-                if file and file.filename and allowed_file(file.filename):
-                    try:
-                        ensure_upload_folder()
-                        
-                        # Delete old image if it exists
-                        if product.image:
-                            old_file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-                                                       'static', product.image)
-                            logging.info(f"Attempting to delete old file: {old_file_path}")
-                            if os.path.exists(old_file_path):
-                                os.remove(old_file_path)
-                                logging.info("Old file deleted successfully")
-                        
-                        filename = secure_filename(file.filename)
-                        timestamp = int(datetime.utcnow().timestamp())
-                        filename = f"{timestamp}_{filename}"
-                        file_path = os.path.join(UPLOAD_FOLDER, filename)
-                        logging.info(f"Saving updated file to: {file_path}")
-                        file.save(file_path)
-                        logging.info("Updated file saved successfully")
-                        product.image = f"uploads/{filename}"
-                    except Exception as e:
-                        logging.error(f"Error in update: {str(e)}")
-                        raise
         
+        # Handle image upload
+        old_image = new_image = None
+        if 'image' in request.files:
+            file = request.files['image']
+            logging.info(f"Received file for update: {file.filename if file else None}")
+            if file and file.filename and allowed_file(file.filename):
+                try:
+                    # The old file is only deleted once no other product shares it
+                    old_image = product.image
+                    uploads.release(old_image)
+                    new_image = product.image = save_upload(file)
+                except Exception as e:
+                    logging.error(f"Error in update: {str(e)}")
+                    raise
+        
+        product_search.index_product(product)
         db.session.commit()
+        if old_image != new_image:
+            uploads.sweep(old_image)
+        if new_image:
+            images.schedule_variants(product)
         return jsonify({'message': 'Product updated successfully', 'product': product.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
@@ -156,14 +230,14 @@ def delete_product(current_user, product_id):
     if product.quotation_items.count() > 0 or product.order_items.count() > 0:
         return jsonify({'error': 'Cannot delete product as it is referenced in quotations or orders'}), 400
     
-    # Delete image if exists
-    if product.image:
-        file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-                                'static', product.image)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+    # Delete image if no other product shares it
+    image = product.image
+    uploads.release(image)
     
+    product_search.remove_product(product.id)
+    stock_index.remove_product(product.id)
     db.session.delete(product)
     db.session.commit()
+    uploads.sweep(image)
     
     return jsonify({'message': 'Product deleted successfully'}), 200
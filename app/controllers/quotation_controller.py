@@ -3,22 +3,90 @@ from flask import jsonify, request
 from app.models.quotation import Quotation, QuotationItem, QuotationStatus
 from app.models.user import UserRole
 from app.models.product import Product
-from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order import Order, OrderStatus
+from app.controllers.order_controller import insert_order_items
 from app.models.inventory import Inventory
 from app import db
+from app.utils import counters, change_feed
+from app.utils.pagination import parse_list_args, apply_date_range, list_response
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+def _validate_items(supplier_user_id, items_data):
+    """
+    Check every line item with one products lookup and one inventory lookup.
+
+    Returns (rows, errors): rows ready for _insert_items, and one entry per
+    invalid line so the whole list can be reported in a single response.
+    """
+    errors = []
+    candidates = []
+    for index, item_data in enumerate(items_data):
+        if not isinstance(item_data, dict) or not all(k in item_data for k in ['product_id', 'qty', 'price']):
+            errors.append({'index': index, 'error': 'Missing required fields in items'})
+            continue
+        try:
+            candidates.append((index, int(item_data['product_id']), int(item_data['qty']), float(item_data['price'])))
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'error': 'product_id, qty and price must be numbers'})
+    
+    product_ids = {product_id for _, product_id, _, _ in candidates}
+    known_ids = {pid for (pid,) in db.session.query(Product.id).filter(Product.id.in_(product_ids))}
+    stock = dict(db.session.query(Inventory.product_id, Inventory.quantity).filter(
+        Inventory.supplier_id == supplier_user_id,
+        Inventory.product_id.in_(product_ids)
+    ))
+    
+    rows = []
+    for index, product_id, qty, price in candidates:
+        if product_id not in known_ids:
+            error = f'Product {product_id} not found'
+        elif product_id not in stock:
+            error = f'Product {product_id} not found in supplier inventory'
+        elif stock[product_id] < qty:
+            error = f'Insufficient quantity for product {product_id} in inventory'
+        else:
+            rows.append({'product_id': product_id, 'qty': qty, 'price': price})
+            continue
+        errors.append({'index': index, 'product_id': product_id, 'error': error})
+    
+    errors.sort(key=lambda e: e['index'])
+    return rows, errors
+
+def _item_errors_response(errors):
+    return jsonify({
+        'error': '; '.join(f'Item {e["index"] + 1}: {e["error"]}' for e in errors),
+        'items': errors
+    }), 400
+
+def _insert_items(quotation, rows):
+    """Insert validated line items for an already-flushed quotation in one executemany"""
+    if rows:
+        db.session.execute(insert(QuotationItem), [{'quotation_id': quotation.id, **row} for row in rows])
+    db.session.expire(quotation, ['items'])
 
 @auth_required
 def get_quotations(current_user):
+    filters, error = parse_list_args(QuotationStatus)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    query = Quotation.query.options(*Quotation.graph_options())
     if current_user.role == UserRole.ADMIN:
-        quotations = Quotation.query.all()
+        if filters['supplier_user_id'] is not None:
+            query = query.filter_by(supplier_user_id=filters['supplier_user_id'])
     else:  # Supplier
-        quotations = Quotation.query.filter_by(supplier_user_id=current_user.id).all()
+        query = query.filter_by(supplier_user_id=current_user.id)
     
-    return jsonify([quotation.to_dict() for quotation in quotations]), 200
+    if filters['status'] is not None:
+        query = query.filter_by(status=filters['status'])
+    query = apply_date_range(query, Quotation.created_at, filters)
+    
+    return list_response(query, Quotation, filters, Quotation.to_dict), 200
 
 @auth_required
 def get_quotation(current_user, quotation_id):
-    quotation = Quotation.query.get_or_404(quotation_id)
+    quotation = Quotation.query.options(*Quotation.graph_options(joinedload)).get_or_404(quotation_id)
     
     if (current_user.role != UserRole.ADMIN and 
         current_user.id != quotation.supplier_user_id):
@@ -49,43 +117,19 @@ def create_quotation(current_user):
             supplier_user_id=data['supplier_user_id']
         )
     
-    db.session.add(quotation)
+    rows, errors = _validate_items(quotation.supplier_user_id, data['items'])
+    if errors:
+        return _item_errors_response(errors)
     
-    # Add quotation items
-    for item_data in data['items']:
-        if not all(k in item_data for k in ['product_id', 'qty', 'price']):
-            db.session.rollback()
-            return jsonify({'error': 'Missing required fields in items'}), 400
-        
-        # Verify product exists
-        product = Product.query.get(item_data['product_id'])
-        if not product:
-            db.session.rollback()
-            return jsonify({'error': f'Product {item_data["product_id"]} not found'}), 404
-        
-        # Check if product exists in supplier's inventory with sufficient quantity
-        inventory_item = Inventory.query.filter_by(
-            supplier_id=quotation.supplier_user_id,
-            product_id=item_data['product_id']
-        ).first()
-        
-        if not inventory_item:
-            db.session.rollback()
-            return jsonify({'error': f'Product {item_data["product_id"]} not found in supplier inventory'}), 400
-            
-        if inventory_item.quantity < item_data['qty']:
-            db.session.rollback()
-            return jsonify({'error': f'Insufficient quantity for product {item_data["product_id"]} in inventory'}), 400
-        
-        item = QuotationItem(
-            quotation=quotation,
-            product_id=item_data['product_id'],
-            qty=item_data['qty'],
-            price=item_data['price']
-        )
-        db.session.add(item)
+    db.session.add(quotation)
+    db.session.flush()
+    _insert_items(quotation, rows)
+    quotation_id = quotation.id
+    counters.bump({counters.quotation_key(QuotationStatus.PENDING): 1}, quotation.supplier_user_id)
+    change_feed.record(change_feed.quotation_change(quotation, change_feed.CREATED))
     
     db.session.commit()
+    quotation = Quotation.query.options(*Quotation.graph_options()).populate_existing().get(quotation_id)
     return jsonify(quotation.to_dict()), 201
 
 @auth_required
@@ -108,51 +152,26 @@ def update_quotation(current_user, quotation_id):
             if new_status not in [QuotationStatus.ACCEPTED, QuotationStatus.DECLINED]:
                 return jsonify({'error': 'Invalid status'}), 400
                 
+            counters.move(counters.quotation_key, quotation.status, new_status, quotation.supplier_user_id)
             quotation.status = new_status
+            change_feed.record(change_feed.quotation_change(quotation, change_feed.UPDATED))
             
         except ValueError:
             return jsonify({'error': 'Invalid status'}), 400
             
     else:  # Admin
         if 'items' in data:
-            # Remove existing items
-            QuotationItem.query.filter_by(quotation_id=quotation.id).delete()
+            rows, errors = _validate_items(quotation.supplier_user_id, data['items'])
+            if errors:
+                return _item_errors_response(errors)
             
-            # Add new items
-            for item_data in data['items']:
-                if not all(k in item_data for k in ['product_id', 'qty', 'price']):
-                    db.session.rollback()
-                    return jsonify({'error': 'Missing required fields in items'}), 400
-                
-                # Verify product exists
-                product = Product.query.get(item_data['product_id'])
-                if not product:
-                    db.session.rollback()
-                    return jsonify({'error': f'Product {item_data["product_id"]} not found'}), 404
-                
-                # Check if product exists in supplier's inventory with sufficient quantity
-                inventory_item = Inventory.query.filter_by(
-                    supplier_id=quotation.supplier_user_id,
-                    product_id=item_data['product_id']
-                ).first()
-                
-                if not inventory_item:
-                    db.session.rollback()
-                    return jsonify({'error': f'Product {item_data["product_id"]} not found in supplier inventory'}), 400
-                    
-                if inventory_item.quantity < item_data['qty']:
-                    db.session.rollback()
-                    return jsonify({'error': f'Insufficient quantity for product {item_data["product_id"]} in inventory'}), 400
-                
-                item = QuotationItem(
-                    quotation=quotation,
-                    product_id=item_data['product_id'],
-                    qty=item_data['qty'],
-                    price=item_data['price']
-                )
-                db.session.add(item)
+            # Replace existing items
+            QuotationItem.query.filter_by(quotation_id=quotation.id).delete()
+            _insert_items(quotation, rows)
+            change_feed.record(change_feed.quotation_change(quotation, change_feed.UPDATED))
     
     db.session.commit()
+    quotation = Quotation.query.options(*Quotation.graph_options()).populate_existing().get(quotation_id)
     return jsonify(quotation.to_dict()), 200
 
 @admin_required
@@ -163,6 +182,8 @@ def delete_quotation(current_user, quotation_id):
     if quotation.order:
         return jsonify({'error': 'Cannot delete quotation with associated orders'}), 400
     
+    counters.bump({counters.quotation_key(quotation.status): -1}, quotation.supplier_user_id)
+    change_feed.record(change_feed.quotation_change(quotation, change_feed.DELETED))
     db.session.delete(quotation)
     db.session.commit()
     
@@ -182,21 +203,26 @@ def approve_quotation(current_user, quotation_id):
             status=OrderStatus.PENDING
         )
         db.session.add(order)
+        db.session.flush()
+        order_id = order.id
         
         # Create order items from quotation items
-        for q_item in quotation.items:
-            order_item = OrderItem(
-                order=order,
-                product_id=q_item.product_id,
-                qty=q_item.qty,
-                price=q_item.price
-            )
-            db.session.add(order_item)
+        insert_order_items(order, quotation)
         
         # Update quotation status
         quotation.status = QuotationStatus.ACCEPTED
+        counters.bump({
+            counters.quotation_key(QuotationStatus.PENDING): -1,
+            counters.quotation_key(QuotationStatus.ACCEPTED): 1,
+            counters.order_key(OrderStatus.PENDING): 1
+        }, quotation.supplier_user_id)
+        change_feed.record(
+            change_feed.quotation_change(quotation, change_feed.UPDATED),
+            change_feed.order_change(order, quotation.supplier_user_id, change_feed.CREATED)
+        )
         
         db.session.commit()
+        order = Order.query.options(*Order.graph_options(joinedload)).populate_existing().get(order_id)
         return jsonify({
             'message': 'Quotation approved and order created successfully',
             'order': order.to_dict()
@@ -215,6 +241,9 @@ def reject_quotation(current_user, quotation_id):
         
     try:
         quotation.status = QuotationStatus.DECLINED
+        counters.move(counters.quotation_key, QuotationStatus.PENDING, QuotationStatus.DECLINED,
+                      quotation.supplier_user_id)
+        change_feed.record(change_feed.quotation_change(quotation, change_feed.UPDATED))
         db.session.commit()
         return jsonify({'message': 'Quotation rejected successfully'}), 200
         
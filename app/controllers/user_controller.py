@@ -1,7 +1,7 @@
 from flask import jsonify, request, current_app
-from werkzeug.security import generate_password_hash
 from app.models.user import User, UserRole, UserStatus, TokenBlacklist
 from app import db
+from app.utils import counters
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
@@ -10,6 +10,8 @@ from flask_jwt_extended import (
 )
 from datetime import datetime, timezone
 from app.utils.auth import auth_required, admin_required, get_current_user
+from app.utils.pagination import parse_list_args, list_response
+from app.utils.passwords import HashingBusy
 import logging
 
 def register_user():
@@ -35,6 +37,7 @@ def register_user():
     user.set_password(data['password'])
     
     db.session.add(user)
+    counters.bump({counters.supplier_key(UserStatus.ACTIVE): 1})
     db.session.commit()
     
     return jsonify(user.to_dict()), 201
@@ -65,31 +68,36 @@ def login():
             }), 403
         
         # Create tokens
-        access_token = create_access_token(identity=str(user.id))
-        refresh_token = create_refresh_token(identity=str(user.id))
+        claims = user.token_claims()
+        body = {
+            'user': user.to_dict(),
+            'access_token': create_access_token(identity=str(user.id), additional_claims=claims),
+            'refresh_token': create_refresh_token(identity=str(user.id), additional_claims=claims)
+        }
         
-        current_app.logger.info(f'Successful login for user: {user.email} (role: {user.role})')
+        # Built before committing, as the commit expires user and reading it again would reload the row
+        if db.session.is_modified(user):
+            db.session.commit()  # check_password upgraded the stored hash
         
-        return jsonify({
-            'user': user.to_dict(),
-            'access_token': access_token,
-            'refresh_token': refresh_token
-        }), 200
+        current_app.logger.info(f'Successful login for user: {body["user"]["email"]} (role: {claims["role"]})')
+        
+        return jsonify(body), 200
         
+    except HashingBusy:
+        raise  # Answered with 503 by the app's error handler
     except Exception as e:
         current_app.logger.error(f'Login error: {str(e)}')
         return jsonify({'error': 'An error occurred during login'}), 500
 
 @auth_required
 def logout(current_user):
-    jti = get_jwt()["jti"]
-    now = datetime.now(timezone.utc)
+    token = get_jwt()
     
-    # Add token to blocklist
+    # Add token to blocklist until it would have expired anyway
     current_user.revoke_token(
-        jti=jti,
+        jti=token["jti"],
         token_type="access",
-        expires_at=now
+        expires_at=datetime.fromtimestamp(token["exp"], timezone.utc)
     )
     
     return jsonify({'message': 'Successfully logged out'}), 200
@@ -106,8 +114,8 @@ def refresh(current_user):
             'blocked_at': current_user.blocked_at.isoformat() if current_user.blocked_at else None
         }), 403
 
-    # Create new access token
-    access_token = create_access_token(identity=current_user.id)
+    # Create new access token with claims read from the current row
+    access_token = create_access_token(identity=str(current_user.id), additional_claims=current_user.token_claims())
     
     return jsonify({
         'access_token': access_token
@@ -118,13 +126,12 @@ def revoke_refresh_token(current_user):
     """
     Endpoint for revoking the current user's refresh token
     """
-    jti = get_jwt()["jti"]
-    now = datetime.now(timezone.utc)
+    token = get_jwt()
     
     current_user.revoke_token(
-        jti=jti,
+        jti=token["jti"],
         token_type="refresh",
-        expires_at=now
+        expires_at=datetime.fromtimestamp(token["exp"], timezone.utc)
     )
     
     return jsonify({'message': 'Refresh token revoked'}), 200
@@ -181,11 +188,15 @@ def update_password(current_user):
     if not current_user.check_password(data['current_password']):
         return jsonify({'error': 'Current password is incorrect'}), 401
         
-    # Update password
+    # Update password; this invalidates every existing token, so hand back fresh ones
     current_user.set_password(data['new_password'])
     db.session.commit()
     
-    return jsonify({'message': 'Password updated successfully'}), 200
+    return jsonify({
+        'message': 'Password updated successfully',
+        'access_token': create_access_token(identity=str(current_user.id), additional_claims=current_user.token_claims()),
+        'refresh_token': create_refresh_token(identity=str(current_user.id), additional_claims=current_user.token_claims())
+    }), 200
 
 @admin_required
 def delete_user(current_user, user_id):
@@ -195,9 +206,11 @@ def delete_user(current_user, user_id):
     if current_user.id == user_id:
         return jsonify({'error': 'Cannot delete your own admin account'}), 400
     
-    # Revoke all tokens for the user being deleted
-    target_user.revoke_all_tokens()
+    # Revoke all tokens for the user being deleted, committed with the deletion and the counters
+    target_user.mark_deleted()
     
+    if target_user.role == UserRole.SUPPLIER:
+        counters.bump({counters.supplier_key(target_user.status): -1})
     db.session.delete(target_user)
     db.session.commit()
     
@@ -209,7 +222,9 @@ def block_user(current_user, user_id):
     target_user = User.query.get_or_404(user_id)
     
     try:
+        old_status = target_user.status
         target_user.block_user(current_user)
+        counters.move(counters.supplier_key, old_status, UserStatus.BLOCKED)
         db.session.commit()
         return jsonify({'message': 'User blocked successfully', 'user': target_user.to_dict()}), 200
     except ValueError as e:
@@ -224,6 +239,8 @@ def unblock_user(current_user, user_id):
         return jsonify({'error': 'User is not blocked'}), 400
     
     target_user.unblock_user()
+    if target_user.role == UserRole.SUPPLIER:
+        counters.move(counters.supplier_key, UserStatus.BLOCKED, UserStatus.ACTIVE)
     db.session.commit()
     return jsonify({'message': 'User unblocked successfully', 'user': target_user.to_dict()}), 200
 
@@ -244,6 +261,10 @@ def get_users(current_user):
     if current_user.role != UserRole.ADMIN:
         return jsonify({'error': 'Unauthorized'}), 403
 
+    filters, error = parse_list_args(UserStatus)
+    if error:
+        return jsonify({'error': error}), 400
+
     role = request.args.get('role')
     query = User.query
 
@@ -264,8 +285,10 @@ def get_users(current_user):
             print("Role filtering error:", str(e))
             return jsonify({'error': 'Error processing role filter'}), 400
 
-    users = query.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    if filters['status'] is not None:
+        query = query.filter_by(status=filters['status'])
+
+    return list_response(query, User, filters, User.to_dict), 200
 
 def verify_token():
     try:
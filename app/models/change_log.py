@@ -0,0 +1,37 @@
+from app import db
+from datetime import datetime
+
+class ChangeLog(db.Model):
+    """
+    One create, update or delete of an order or quotation, for the change feed.
+
+    Rows are appended by app.utils.change_feed in the same transaction as the
+    change and never updated; the id is the feed position. AUTOINCREMENT keeps
+    SQLite from reusing the ids of compacted rows.
+    """
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        db.Index('ix_change_log_supplier', 'supplier_id', 'id'),
+        {'sqlite_autoincrement': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(16), nullable=False)  # 'order' or 'quotation'
+    entity_id = db.Column(db.Integer, nullable=False)
+    supplier_id = db.Column(db.Integer, nullable=False)  # Whose feed the entry shows up in
+    action = db.Column(db.String(16), nullable=False)  # 'created', 'updated' or 'deleted'
+    status = db.Column(db.String(16))  # Status after the change; None for deletions
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        return {
+            'entity': self.entity,
+            'id': self.entity_id,
+            'supplier_user_id': self.supplier_id,
+            'action': self.action,
+            'status': self.status,
+            'changed_at': self.created_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<ChangeLog {self.id} {self.entity} {self.entity_id} {self.action}>'
@@ -0,0 +1,19 @@
+from app import db
+from datetime import datetime
+
+class DashboardCounter(db.Model):
+    """
+    One aggregate shown on the dashboards, e.g. ('orders.pending', supplier 7).
+
+    supplier_id 0 holds the totals across all suppliers. Rows are adjusted by
+    app.utils.counters in the same transaction as the change they count.
+    """
+    __tablename__ = 'dashboard_counters'
+    
+    supplier_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DashboardCounter {self.supplier_id} {self.name}={self.value}>'
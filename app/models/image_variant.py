@@ -0,0 +1,20 @@
+from app import db
+from datetime import datetime
+
+class ImageVariant(db.Model):
+    __tablename__ = 'image_variants'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(255), unique=True, nullable=False)  # Product.image the variants were built from
+    variants = db.Column(db.JSON, nullable=False)  # {size: {format: url}}
+    placeholder = db.Column(db.Text)  # Tiny blurred preview as a data: URI
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            **self.variants,
+            'placeholder': self.placeholder
+        }
+
+    def __repr__(self):
+        return f'<ImageVariant {self.source}>'
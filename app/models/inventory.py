@@ -1,11 +1,12 @@
 from app import db
 from datetime import datetime
+from sqlalchemy.orm import joinedload
 
 class Inventory(db.Model):
     __tablename__ = 'inventory'
     
     id = db.Column(db.Integer, primary_key=True)
-    supplier_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    supplier_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -14,6 +15,11 @@ class Inventory(db.Model):
     # Relationships
     supplier = db.relationship('User', backref=db.backref('inventory_items', lazy='dynamic'))
     product = db.relationship('Product', backref=db.backref('inventory_items', lazy='dynamic'))
+
+    @classmethod
+    def graph_options(cls):
+        """Loader options for the product each inventory row serializes"""
+        return (joinedload(cls.product),)
     
     def to_dict(self):
         return {
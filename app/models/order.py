@@ -1,5 +1,6 @@
 from app import db
 from datetime import datetime
+from sqlalchemy.orm import joinedload, selectinload
 import enum
 
 class OrderStatus(enum.Enum):
@@ -13,14 +14,27 @@ class Order(db.Model):
     __tablename__ = 'orders'
     
     id = db.Column(db.Integer, primary_key=True)
-    quotation_id = db.Column(db.Integer, db.ForeignKey('quotations.id'), nullable=False)
+    quotation_id = db.Column(db.Integer, db.ForeignKey('quotations.id'), nullable=False, index=True)
     order_date = db.Column(db.DateTime, default=datetime.utcnow)
-    status = db.Column(db.Enum(OrderStatus), default=OrderStatus.PENDING)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    status = db.Column(db.Enum(OrderStatus), default=OrderStatus.PENDING, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    items = db.relationship('OrderItem', backref='order', lazy='dynamic', cascade='all, delete-orphan')
+    items = db.relationship('OrderItem', backref='order', lazy='select', cascade='all, delete-orphan')
+
+    @classmethod
+    def graph_options(cls, loader=selectinload):
+        """Loader options that fetch everything to_dict() touches in a fixed number of queries.
+
+        List endpoints should keep the default selectinload; single-row lookups can pass
+        joinedload to get the whole graph in one statement.
+        """
+        from app.models.quotation import Quotation
+        return (
+            loader(cls.items).options(*OrderItem.graph_options()),
+            joinedload(cls.quotation).options(*Quotation.graph_options(loader)),
+        )
 
     def to_dict(self):
         return {
@@ -45,6 +59,11 @@ class OrderItem(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @classmethod
+    def graph_options(cls):
+        """Loader options for the product every item serializes"""
+        return (joinedload(cls.product),)
+
     def to_dict(self):
         return {
             'id': self.id,
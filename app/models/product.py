@@ -1,4 +1,6 @@
 from app import db
+from app.models.image_variant import ImageVariant
+from app.models.product_stock import ProductStock
 from datetime import datetime
 
 class Product(db.Model):
@@ -17,6 +19,14 @@ class Product(db.Model):
     # Relationships
     quotation_items = db.relationship('QuotationItem', backref='product', lazy='dynamic')
     order_items = db.relationship('OrderItem', backref='product', lazy='dynamic')
+    image_variants = db.relationship(
+        'ImageVariant',
+        primaryjoin='foreign(ImageVariant.source) == Product.image',
+        uselist=False,
+        viewonly=True,
+        lazy='selectin'
+    )
+    stock = db.relationship('ProductStock', uselist=False, viewonly=True)
     
     def to_dict(self):
         return {
@@ -27,6 +37,7 @@ class Product(db.Model):
             'part_number': self.part_number,
             'category': self.category,
             'image': self.image,
+            'image_variants': self.image_variants.to_dict() if self.image_variants else None,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
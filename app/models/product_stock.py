@@ -0,0 +1,30 @@
+from app import db
+from datetime import datetime
+
+class ProductStock(db.Model):
+    """
+    Stock of one product summed over every supplier's inventory.
+
+    supplier_count counts the suppliers holding at least one unit. Rows are
+    adjusted by app.utils.stock_index in the same transaction as the
+    inventory change, so availability filters never touch the inventory table.
+    """
+    __tablename__ = 'product_stock'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True, autoincrement=False)
+    total_quantity = db.Column(db.Integer, nullable=False, default=0)
+    supplier_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'total_quantity': self.total_quantity,
+            'supplier_count': self.supplier_count,
+            'in_stock': self.total_quantity > 0
+        }
+
+    def __repr__(self):
+        return f'<ProductStock product_id={self.product_id} total_quantity={self.total_quantity}>'
+
+# Most available first, in the order get_products sorts and pages by
+db.Index('ix_product_stock_availability', ProductStock.total_quantity.desc(), ProductStock.product_id)
@@ -1,5 +1,6 @@
 from app import db
 from datetime import datetime
+from sqlalchemy.orm import joinedload, selectinload
 import enum
 
 class QuotationStatus(enum.Enum):
@@ -12,16 +13,21 @@ class Quotation(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     admin_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    supplier_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    supplier_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     quotation_date = db.Column(db.DateTime, default=datetime.utcnow)
-    status = db.Column(db.Enum(QuotationStatus), default=QuotationStatus.PENDING)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    status = db.Column(db.Enum(QuotationStatus), default=QuotationStatus.PENDING, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    items = db.relationship('QuotationItem', backref='quotation', lazy='dynamic', cascade='all, delete-orphan')
+    items = db.relationship('QuotationItem', backref='quotation', lazy='select', cascade='all, delete-orphan')
     order = db.relationship('Order', backref='quotation', uselist=False)
 
+    @classmethod
+    def graph_options(cls, loader=selectinload):
+        """Loader options that fetch everything to_dict() touches in a fixed number of queries"""
+        return (loader(cls.items).options(*QuotationItem.graph_options()),)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -45,6 +51,11 @@ class QuotationItem(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @classmethod
+    def graph_options(cls):
+        """Loader options for the product every item serializes"""
+        return (joinedload(cls.product),)
+
     def to_dict(self):
         return {
             'id': self.id,
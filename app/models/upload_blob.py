@@ -0,0 +1,23 @@
+from app import db
+from datetime import datetime
+
+class UploadBlob(db.Model):
+    __tablename__ = 'upload_blobs'
+    
+    digest = db.Column(db.String(64), primary_key=True)  # sha256 of the file contents
+    path = db.Column(db.String(255), unique=True, nullable=False)  # Value stored in Product.image
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # Products currently pointing at path
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'digest': self.digest,
+            'path': self.path,
+            'size': self.size,
+            'ref_count': self.ref_count,
+            'created_at': self.created_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<UploadBlob {self.digest}>'
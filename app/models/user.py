@@ -1,5 +1,6 @@
-from app import db  # Remove login_manager import
-from werkzeug.security import generate_password_hash, check_password_hash
+from app import db, revoked_token_cache, password_hasher  # Remove login_manager import
+from flask import current_app
+from sqlalchemy import event
 import enum
 from datetime import datetime
 
@@ -25,6 +26,14 @@ class TokenBlacklist(db.Model):
     def is_token_revoked(cls, jti):
         return bool(cls.query.filter_by(jti=jti).first())
 
+class DeletedUser(db.Model):
+    """Tombstone rejecting a deleted user's tokens until the longest-lived of them would have expired"""
+    __tablename__ = 'deleted_users'
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    deleted_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
 class User(db.Model): 
     __tablename__ = 'users'
     
@@ -38,6 +47,7 @@ class User(db.Model):
     status = db.Column(db.Enum(UserStatus), nullable=False, default=UserStatus.ACTIVE)
     blocked_at = db.Column(db.DateTime, nullable=True)
     blocked_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    token_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     # Relationships
     created_quotations = db.relationship('Quotation', foreign_keys='Quotation.admin_user_id', backref='admin', lazy='dynamic')
@@ -48,13 +58,20 @@ class User(db.Model):
                                   foreign_keys='User.blocked_by')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
+        if self.id is not None:
+            self.invalidate_tokens()  # Sessions opened with the old password must log in again
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify password; on a match an outdated hash is replaced with the configured method's, for the caller to commit"""
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            self.password_hash = password_hasher.hash(password)  # Same password, so tokens stay valid
+        return True
 
     def block_user(self, admin_user):
-        """Block user by admin"""
+        """Block user by admin; the caller commits"""
         if self.role == UserRole.ADMIN:
             raise ValueError("Cannot block admin users")
         self.status = UserStatus.BLOCKED
@@ -72,6 +89,19 @@ class User(db.Model):
         """Check if user is blocked"""
         return self.status == UserStatus.BLOCKED
 
+    def token_claims(self):
+        """Claims embedded in every JWT so auth checks don't need to load this row"""
+        return {
+            'role': self.role.value,
+            'status': self.status.value,
+            'ver': self.token_version
+        }
+
+    def invalidate_tokens(self):
+        """Bump token_version so every token issued so far is rejected once this commits"""
+        self.token_version = (self.token_version or 1) + 1
+        revoked_token_cache.stage_version(db.session, self.id, self.token_version)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -95,8 +125,22 @@ class User(db.Model):
         )
         db.session.add(revoked_token)
         db.session.commit()
+        revoked_token_cache.add(jti, expires_at)
+
+    def mark_deleted(self):
+        """Keep every token issued so far rejected once this row is gone; the caller deletes and commits"""
+        now = datetime.utcnow()
+        # merge: SQLite may hand a deleted id out again, so the id can already have a tombstone
+        db.session.merge(DeletedUser(user_id=self.id, deleted_at=now,
+                                     expires_at=now + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']))
+        revoked_token_cache.stage_deletion(db.session, self.id, now)
 
     def revoke_all_tokens(self):
-        """Revoke all tokens for this user"""
-        self.revoked_tokens.delete()
-        db.session.commit()
+        """Revoke all tokens for this user once the caller commits"""
+        self.invalidate_tokens()
+
+@event.listens_for(User.role, 'set', active_history=True)
+def _invalidate_tokens_on_role_change(user, value, oldvalue, initiator):
+    # Tokens carry the role claim, so they must not outlive a role change
+    if user.id is not None and oldvalue is not value and isinstance(oldvalue, UserRole):
+        user.invalidate_tokens()
@@ -6,6 +6,9 @@ product_bp = Blueprint('product', __name__, url_prefix='/api/products')
 quotation_bp = Blueprint('quotation', __name__, url_prefix='/api/quotations')
 order_bp = Blueprint('order', __name__, url_prefix='/api/orders')
 inventory_bp = Blueprint('inventory', __name__, url_prefix='/api')
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
+change_bp = Blueprint('change', __name__, url_prefix='/api/changes')
 
 # Import routes
 from app.routes.user_routes import *
@@ -13,3 +16,6 @@ from app.routes.product_routes import *
 from app.routes.quotation_routes import *
 from app.routes.order_routes import *
 from app.routes.inventory_routes import *
+from app.routes.metrics_routes import *
+from app.routes.dashboard_routes import *
+from app.routes.change_routes import *
@@ -0,0 +1,6 @@
+from app.routes import change_bp
+from app.controllers.change_controller import get_changes
+from app.utils.query_tracker import query_budget
+
+# Incremental order and quotation changes for dashboards
+change_bp.route('', methods=['GET'])(query_budget(2)(get_changes))
@@ -0,0 +1,6 @@
+from app.routes import dashboard_bp
+from app.controllers.dashboard_controller import get_summary
+from app.utils.query_tracker import query_budget
+
+# Dashboard aggregates from the counters table
+dashboard_bp.route('/summary', methods=['GET'])(query_budget(1)(get_summary))
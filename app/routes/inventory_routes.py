@@ -1,12 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.controllers.inventory_controller import InventoryController
+from app.controllers.inventory_controller import InventoryController, parse_bulk_rows
 from app.models.user import UserRole
+from app.utils.pagination import parse_list_args
+from app.utils.query_tracker import query_budget
 
 # Change the blueprint definition to include the URL prefix
 inventory_bp = Blueprint('inventory', __name__, url_prefix='/api')
 
 @inventory_bp.route('/inventory/add', methods=['POST'])
+@query_budget(7)
 @jwt_required()
 def add_to_inventory():
     data = request.get_json()
@@ -30,6 +33,7 @@ def add_to_inventory():
     return jsonify(result), 200
 
 @inventory_bp.route('/inventory/remove', methods=['POST'])
+@query_budget(7)
 @jwt_required()
 def remove_from_inventory():
     data = request.get_json()
@@ -53,6 +57,7 @@ def remove_from_inventory():
     return jsonify(result), 200
 
 @inventory_bp.route('/inventory/update', methods=['PUT'])
+@query_budget(7)
 @jwt_required()
 def update_inventory():
     data = request.get_json()
@@ -73,11 +78,41 @@ def update_inventory():
     return jsonify(result), 200
 
 @inventory_bp.route('/inventory', methods=['GET'])
+@query_budget(2)
 @jwt_required()
 def get_inventory():
     supplier_id = get_jwt_identity()
     
-    result, error = InventoryController.get_supplier_inventory(supplier_id)
+    filters, error = parse_list_args()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    result, error = InventoryController.get_supplier_inventory(supplier_id, filters)
+    
+    if error:
+        return jsonify({'error': error}), 400
+    
+    return result, 200
+
+@inventory_bp.route('/inventory/bulk', methods=['POST'])
+@query_budget(7, per='chunk')
+@jwt_required()
+def bulk_update_inventory():
+    """Stream a CSV or NDJSON body of product_id, quantity, mode=set|add rows into inventory"""
+    supplier_id = int(get_jwt_identity())
+    
+    if request.mimetype == 'text/csv':
+        fmt = 'csv'
+    elif request.mimetype in ('application/x-ndjson', 'application/jsonl', 'application/json'):
+        fmt = 'ndjson'
+    else:
+        return jsonify({'error': 'Content-Type must be text/csv or application/x-ndjson'}), 415
+    
+    result, error = InventoryController.bulk_upsert(
+        supplier_id=supplier_id,
+        rows=parse_bulk_rows(request.stream, fmt),
+        chunk_size=current_app.config['BULK_INVENTORY_CHUNK_SIZE']
+    )
     
     if error:
         return jsonify({'error': error}), 400
@@ -0,0 +1,6 @@
+from app.routes import metrics_bp
+from app.controllers.metrics_controller import get_metrics
+from app.utils.query_tracker import query_budget
+
+# Prometheus scrape endpoint (admin only)
+metrics_bp.route('', methods=['GET'])(query_budget(0)(get_metrics))
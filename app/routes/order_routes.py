@@ -6,14 +6,15 @@ from app.controllers.order_controller import (
     update_order,
     delete_order
 )
+from app.utils.query_tracker import query_budget
 from app.utils.auth import auth_required, admin_required
 
 # Order listing and details
-order_bp.route('/', methods=['GET'])(get_orders) 
-order_bp.route('/supplier', methods=['GET'])(get_orders)  # Add supplier-specific route
-order_bp.route('/<int:order_id>', methods=['GET'])(get_order)
+order_bp.route('/', methods=['GET'])(query_budget(5)(get_orders)) 
+order_bp.route('/supplier', methods=['GET'])(query_budget(5)(get_orders))  # Add supplier-specific route
+order_bp.route('/<int:order_id>', methods=['GET'])(query_budget(3)(get_order))
 
 # Order management
-order_bp.route('/', methods=['POST'])(create_order)
-order_bp.route('/<int:order_id>', methods=['PUT'])(update_order)  # replaced methods['PUT'] with methods=['PUT']
-order_bp.route('/<int:order_id>', methods=['DELETE'])(delete_order)
+order_bp.route('/', methods=['POST'])(query_budget(10)(create_order))
+order_bp.route('/<int:order_id>', methods=['PUT'])(query_budget(11)(update_order))  # replaced methods['PUT'] with methods=['PUT']
+order_bp.route('/<int:order_id>', methods=['DELETE'])(query_budget(7)(delete_order))
@@ -1,17 +1,20 @@
 from app.routes import product_bp
 from app.controllers.product_controller import (
     get_products,
+    search_products,
     get_product,
     create_product,
     update_product,
     delete_product
 )
+from app.utils.query_tracker import query_budget
 
 # Product listing and details
-product_bp.route('/', methods=['GET'])(get_products)
-product_bp.route('/<int:product_id>', methods=['GET'])(get_product)
+product_bp.route('/', methods=['GET'])(query_budget(2)(get_products))
+product_bp.route('/search', methods=['GET'])(query_budget(3)(search_products))
+product_bp.route('/<int:product_id>', methods=['GET'])(query_budget(2)(get_product))
 
 # Product management (admin only)
-product_bp.route('/', methods=['POST'])(create_product)
-product_bp.route('/<int:product_id>', methods=['PUT'])(update_product)
-product_bp.route('/<int:product_id>', methods=['DELETE'])(delete_product)
+product_bp.route('/', methods=['POST'])(query_budget(10)(create_product))
+product_bp.route('/<int:product_id>', methods=['PUT'])(query_budget(14)(update_product))
+product_bp.route('/<int:product_id>', methods=['DELETE'])(query_budget(13)(delete_product))
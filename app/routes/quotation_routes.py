@@ -8,16 +8,17 @@ from app.controllers.quotation_controller import (
     approve_quotation,
     reject_quotation
 )
+from app.utils.query_tracker import query_budget
 
 # Quotation listing and details
-quotation_bp.route('/', methods=['GET'])(get_quotations)
-quotation_bp.route('/<int:quotation_id>', methods=['GET'])(get_quotation)
+quotation_bp.route('/', methods=['GET'])(query_budget(3)(get_quotations))
+quotation_bp.route('/<int:quotation_id>', methods=['GET'])(query_budget(2)(get_quotation))
 
 # Quotation management
-quotation_bp.route('/', methods=['POST'])(create_quotation)  # Admin only
-quotation_bp.route('/<int:quotation_id>', methods=['PUT'])(update_quotation)  # Admin can update details, supplier can update status
-quotation_bp.route('/<int:quotation_id>', methods=['DELETE'])(delete_quotation)  # Admin only
+quotation_bp.route('/', methods=['POST'])(query_budget(9)(create_quotation))  # Admin only
+quotation_bp.route('/<int:quotation_id>', methods=['PUT'])(query_budget(10)(update_quotation))  # Admin can update details, supplier can update status
+quotation_bp.route('/<int:quotation_id>', methods=['DELETE'])(query_budget(7)(delete_quotation))  # Admin only
 
 # Quotation approval/rejection
-quotation_bp.route('/<int:quotation_id>/approve', methods=['POST'])(approve_quotation)  # Admin only
-quotation_bp.route('/<int:quotation_id>/reject', methods=['POST'])(reject_quotation)  # Admin only
+quotation_bp.route('/<int:quotation_id>/approve', methods=['POST'])(query_budget(10)(approve_quotation))  # Admin only
+quotation_bp.route('/<int:quotation_id>/reject', methods=['POST'])(query_budget(4)(reject_quotation))  # Admin only
@@ -16,33 +16,34 @@ from app.controllers.user_controller import (
     get_users,
     verify_token
 )
+from app.utils.query_tracker import query_budget
 from app.utils.auth import auth_required
 from flask import jsonify
 
 # User registration and authentication
-user_bp.route('/register', methods=['POST'])(register_user)
-user_bp.route('/login', methods=['POST'])(login)
-user_bp.route('/logout', methods=['POST'])(logout)
+user_bp.route('/register', methods=['POST'])(query_budget(4)(register_user))
+user_bp.route('/login', methods=['POST'])(query_budget(2)(login))
+user_bp.route('/logout', methods=['POST'])(query_budget(2)(logout))
 
 
 # User management
-user_bp.route('/profile', methods=['GET'])(get_user)
-user_bp.route('/profile', methods=['PUT'])(update_user)
-user_bp.route('/password', methods=['PUT'])(update_password)
-user_bp.route('/user/<int:user_id>', methods=['GET'])(get_user_by_id)
-user_bp.route('/user/<int:user_id>', methods=['DELETE'])(delete_user)
+user_bp.route('/profile', methods=['GET'])(query_budget(1)(get_user))
+user_bp.route('/profile', methods=['PUT'])(query_budget(3)(update_user))
+user_bp.route('/password', methods=['PUT'])(query_budget(3)(update_password))
+user_bp.route('/user/<int:user_id>', methods=['GET'])(query_budget(1)(get_user_by_id))
+user_bp.route('/user/<int:user_id>', methods=['DELETE'])(query_budget(13)(delete_user))
 
 # User blocking management
-user_bp.route('/<int:user_id>/block', methods=['POST'])(block_user)
-user_bp.route('/<int:user_id>/unblock', methods=['POST'])(unblock_user)
-user_bp.route('/blocked', methods=['GET'])(get_blocked_users)
+user_bp.route('/<int:user_id>/block', methods=['POST'])(query_budget(4)(block_user))
+user_bp.route('/<int:user_id>/unblock', methods=['POST'])(query_budget(4)(unblock_user))
+user_bp.route('/blocked', methods=['GET'])(query_budget(1)(get_blocked_users))
 
 # Get users list (with optional role filter)
-user_bp.route('/', methods=['GET'])(get_users)
+user_bp.route('/', methods=['GET'])(query_budget(1)(get_users))
 
 # Update verify endpoint to use the controller function
-user_bp.route('/verify', methods=['GET'])(verify_token)
+user_bp.route('/verify', methods=['GET'])(query_budget(1)(verify_token))
 
 # Token management
-user_bp.route('/refresh', methods=['POST'])(refresh)
-user_bp.route('/revoke-refresh-token', methods=['POST'])(revoke_refresh_token)
+user_bp.route('/refresh', methods=['POST'])(query_budget(1)(refresh))
+user_bp.route('/revoke-refresh-token', methods=['POST'])(query_budget(2)(revoke_refresh_token))
@@ -0,0 +1,439 @@
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import posixpath
+
+try:
+    import brotli
+except ImportError:  # .br files are only written when the brotli package is installed
+    brotli = None
+
+ASSETS_DIR = 'assets'
+BUILD_MARKER = '.asset-build'
+FINGERPRINT_LENGTH = 12
+COMPRESSIBLE = ('.html', '.css', '.js', '.json', '.svg')
+
+_STYLESHEET_RE = re.compile(r'<link\b[^>]*\brel=["\']stylesheet["\'][^>]*>', re.I)
+_SCRIPT_RE = re.compile(r'<script\b([^>]*)\bsrc=["\']([^"\']+)["\']([^>]*)>\s*</script>', re.I)
+_HREF_RE = re.compile(r'\bhref=["\']([^"\']+)["\']', re.I)
+_BETWEEN_TAGS_RE = re.compile(r'^(\s|<!--.*?-->)*$', re.S)
+_CSS_IMPORT_RE = re.compile(r'@import\s+(?:url\()?\s*["\']([^"\']+)["\']\s*\)?\s*;')
+_CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+_IMPORT_RE = re.compile(r'^\s*import\s*(?:\{([^}]*)\}\s*from\s*)?["\']([^"\']+)["\']\s*;?', re.M)
+_EXPORT_LIST_RE = re.compile(r'^\s*export\s*\{([^}]*)\}\s*;?', re.M)
+_EXPORT_DECL_RE = re.compile(r'^(\s*)export\s+((?:async\s+)?function\s*\*?|const|let|var|class)\s+([\w$]+)', re.M)
+_UNSUPPORTED_MODULE_RE = re.compile(r'^\s*(export\s+default|export\s*\*|import\s+[\w$*])', re.M)
+
+class AssetBuildError(Exception):
+    pass
+
+def _is_local(url):
+    return not re.match(r'^([a-z][a-z0-9+.-]*:|//|#|/)', url, re.I)
+
+def _fingerprint(content):
+    return hashlib.sha256(content.encode()).hexdigest()[:FINGERPRINT_LENGTH]
+
+# --- CSS ---
+
+def bundle_css(root, path, seen=None):
+    """Inline the @import chain of root/path, rebasing url()s onto the assets folder"""
+    seen = set() if seen is None else seen
+    if path in seen:
+        return ''
+    seen.add(path)
+    with open(os.path.join(root, path), encoding='utf-8') as f:
+        css = f.read()
+    base = posixpath.dirname(path)
+
+    def inline(match):
+        return bundle_css(root, posixpath.normpath(posixpath.join(base, match.group(1))), seen)
+
+    def rebase(match):
+        url = match.group(2)
+        if not _is_local(url):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(base, url))
+        return f"url('{posixpath.relpath(target, ASSETS_DIR)}')"
+
+    css = _CSS_URL_RE.sub(rebase, css)
+    return _CSS_IMPORT_RE.sub(inline, css)
+
+def minify_css(css):
+    """Drop comments and redundant whitespace; strings and selectors are left intact"""
+    out = []
+    space = False
+    i, n = 0, len(css)
+    while i < n:
+        c = css[i]
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c.isspace():
+            space = True
+            i += 1
+        elif c in '{};,':
+            if c == '}' and out and out[-1] == ';':
+                out.pop()
+            out.append(c)
+            space = False
+            i += 1
+        else:
+            if space and out and out[-1] not in '{};,':
+                out.append(' ')
+            space = False
+            if c in '"\'':
+                end = i + 1
+                while end < n and css[end] != c:
+                    end += 2 if css[end] == '\\' else 1
+                out.append(css[i:end + 1])
+                i = end + 1
+            else:
+                out.append(c)
+                i += 1
+    return ''.join(out)
+
+# --- JavaScript ---
+
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                   'void', 'throw', 'instanceof', 'yield', 'await'}
+
+def _is_word(c):
+    return c.isalnum() or c in '_$\\' or ord(c) > 127
+
+def minify_js(source):
+    """
+    Conservative JavaScript minifier.
+
+    Removes comments and indentation and collapses whitespace. Line breaks are
+    kept wherever automatic semicolon insertion could depend on them, and the
+    contents of strings, template literals and regex literals are copied
+    verbatim.
+    """
+    out = []
+    i, n = 0, len(source)
+    pending = None  # whitespace seen since the last token: None, ' ' or '\n'
+    templates = []  # open ${ } brace depth for each enclosing template literal
+
+    def last_char():
+        return out[-1][-1] if out else ''
+
+    def last_word():
+        match = re.search(r'[\w$]+$', out[-1]) if out else None
+        return match.group(0) if match else ''
+
+    def emit(token):
+        nonlocal pending
+        prev, nxt = last_char(), token[0]
+        if pending == '\n' and prev and prev not in '{;,(' and nxt not in '})],.:?':
+            out.append('\n')
+        elif pending and prev and ((_is_word(prev) and _is_word(nxt)) or (prev == nxt and prev in '+-/')):
+            out.append(' ')
+        pending = None
+        out.append(token)
+
+    def scan_template(start):
+        # From just after a backtick (or a closing } of ${}) to the closing backtick or next ${
+        j = start
+        while j < n:
+            if source[j] == '\\':
+                j += 2
+            elif source[j] == '`':
+                return j + 1, False
+            elif source.startswith('${', j):
+                return j + 2, True
+            else:
+                j += 1
+        raise AssetBuildError('Unterminated template literal')
+
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            if c == '\n' or (pending is None and c != '\n'):
+                pending = '\n' if c == '\n' or pending == '\n' else ' '
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end == -1:
+                raise AssetBuildError('Unterminated block comment')
+            if '\n' in source[i:end]:
+                pending = '\n'
+            elif pending is None:
+                pending = ' '
+            i = end + 2
+        elif c in '"\'':
+            j = i + 1
+            while j < n and source[j] != c:
+                j += 2 if source[j] == '\\' else 1
+            emit(source[i:j + 1])
+            i = j + 1
+        elif c == '`':
+            j, opened = scan_template(i + 1)
+            emit(source[i:j])
+            if opened:
+                templates.append(0)
+            i = j
+        elif c == '}' and templates and templates[-1] == 0:
+            templates.pop()
+            j, opened = scan_template(i + 1)
+            emit(source[i:j])
+            if opened:
+                templates.append(0)
+            i = j
+        elif c == '/' and (last_char() in _REGEX_PRECEDERS or last_char() == '' or last_word() in _REGEX_KEYWORDS):
+            j, in_class = i + 1, False
+            while j < n and (in_class or source[j] != '/'):
+                if source[j] == '\\':
+                    j += 1
+                elif source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                elif source[j] == '\n':
+                    raise AssetBuildError('Unterminated regular expression')
+                j += 1
+            j += 1
+            while j < n and source[j].isalpha():
+                j += 1
+            emit(source[i:j])
+            i = j
+        else:
+            if templates:
+                if c == '{':
+                    templates[-1] += 1
+                elif c == '}':
+                    templates[-1] -= 1
+            j = i + 1
+            if _is_word(c):
+                while j < n and _is_word(source[j]):
+                    j += 1
+            emit(source[i:j])
+            i = j
+    return ''.join(out).strip() + '\n'
+
+def _names(spec):
+    """Parse '{ a, b as c }' contents into (exported, local) pairs"""
+    pairs = []
+    for part in spec.split(','):
+        part = part.strip()
+        if part:
+            name, _, alias = part.partition(' as ')
+            pairs.append((name.strip(), (alias or name).strip()))
+    return pairs
+
+def bundle_modules(root, entry):
+    """
+    Bundle an ES module graph into one script.
+
+    Each module is evaluated in dependency order inside its own function
+    scope, and imports are bound by destructuring the exports object of the
+    dependency, so top-level names in different modules cannot collide.
+    Supports named imports/exports, which is all the dashboards use.
+    Returns (script, module paths in evaluation order).
+    """
+    order, ids, visiting = [], {}, set()
+
+    def visit(path):
+        if path in ids:
+            return
+        if path in visiting:
+            raise AssetBuildError(f'Circular import involving {path}')
+        visiting.add(path)
+        with open(os.path.join(root, path), encoding='utf-8') as f:
+            source = f.read()
+        unsupported = _UNSUPPORTED_MODULE_RE.search(source)
+        if unsupported:
+            raise AssetBuildError(f'{path}: unsupported module syntax "{unsupported.group(0).strip()}"')
+        deps = []
+        for match in _IMPORT_RE.finditer(source):
+            dep = posixpath.normpath(posixpath.join(posixpath.dirname(path), match.group(2)))
+            visit(dep)
+            deps.append((dep, _names(match.group(1) or '')))
+        visiting.discard(path)
+        ids[path] = f'__module{len(order)}'
+        order.append((path, source, deps))
+
+    visit(entry)
+    chunks = []
+    for path, source, deps in order:
+        exports = []
+        for match in _EXPORT_LIST_RE.finditer(source):
+            exports.extend(_names(match.group(1)))
+        exports.extend((m.group(3), m.group(3)) for m in _EXPORT_DECL_RE.finditer(source))
+        body = _IMPORT_RE.sub('', source)
+        body = _EXPORT_LIST_RE.sub('', body)
+        body = _EXPORT_DECL_RE.sub(r'\1\2 \3', body)
+        bindings = ''.join(
+            f"const {{ {', '.join(f'{name}: {local}' for name, local in names)} }} = {ids[dep]};\n"
+            for dep, names in deps if names
+        )
+        returned = ', '.join(f'{name}: {local}' for local, name in exports)
+        chunks.append(f"// {path}\nconst {ids[path]} = (() => {{\n{bindings}{body}\nreturn {{ {returned} }};\n}})();\n")
+    return '\n'.join(chunks), [path for path, _, _ in order]
+
+# --- Build ---
+
+def _script_runs(html):
+    """Group adjacent local <script src> tags of the same kind; inline scripts split runs"""
+    runs, current, last_end = [], None, None
+    for match in _SCRIPT_RE.finditer(html):
+        attrs = match.group(1) + match.group(3)
+        src = match.group(2)
+        if not _is_local(src):
+            current, last_end = None, match.end()
+            continue
+        is_module = bool(re.search(r'\btype=["\']module["\']', attrs, re.I))
+        contiguous = last_end is not None and _BETWEEN_TAGS_RE.match(html[last_end:match.start()])
+        if current and contiguous and not is_module and not current['module']:
+            current['tags'].append(match)
+        else:
+            current = {'module': is_module, 'tags': [match]}
+            runs.append(current)
+        last_end = match.end()
+    return runs
+
+def _write_asset(out_dir, name, ext, content, sources, bundles):
+    filename = f'{ASSETS_DIR}/{name}.{_fingerprint(content)}.{ext}'
+    if filename not in bundles:
+        with open(os.path.join(out_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(content)
+        bundles[filename] = {'name': f'{name}.{ext}', 'sources': sources}
+    return filename
+
+def _replace_tags(html, tags, replacement):
+    """Put replacement where the first tag was and drop the rest (with their leading whitespace)"""
+    for match in reversed(tags[1:]):
+        start = match.start()
+        while start > 0 and html[start - 1] in ' \t':
+            start -= 1
+        if start > 0 and html[start - 1] == '\n':
+            start -= 1
+        html = html[:start] + html[match.end():]
+    first = tags[0]
+    return html[:first.start()] + replacement + html[first.end():]
+
+def _build_page(source_dir, out_dir, page, bundles):
+    with open(os.path.join(source_dir, page), encoding='utf-8') as f:
+        html = f.read()
+    page_dir = posixpath.dirname(page)
+    page_name = posixpath.splitext(posixpath.basename(page))[0]
+
+    def resolve(url):
+        return posixpath.normpath(posixpath.join(page_dir, url))
+
+    def relative(filename):
+        return posixpath.relpath(filename, page_dir or '.')
+
+    # Scripts first: their match offsets are computed against the untouched html
+    for run in reversed(_script_runs(html)):
+        sources = [resolve(tag.group(2)) for tag in run['tags']]
+        if run['module']:
+            name = posixpath.splitext(posixpath.basename(sources[0]))[0]
+            script, sources = bundle_modules(source_dir, sources[0])
+            content = minify_js(script)
+            tag = '<script type="module" src="{}"></script>'
+        else:
+            parts = []
+            for source in sources:
+                with open(os.path.join(source_dir, source), encoding='utf-8') as f:
+                    parts.append(f'// {source}\n{f.read()}\n;')
+            content = minify_js('\n'.join(parts))
+            name = page_name if len(sources) > 1 else posixpath.splitext(posixpath.basename(sources[0]))[0]
+            tag = '<script src="{}"></script>'
+        filename = _write_asset(out_dir, name, 'js', content, sources, bundles)
+        html = _replace_tags(html, run['tags'], tag.format(relative(filename)))
+
+    links = [m for m in _STYLESHEET_RE.finditer(html)
+             if _HREF_RE.search(m.group(0)) and _is_local(_HREF_RE.search(m.group(0)).group(1))]
+    if links:
+        sources = [resolve(_HREF_RE.search(m.group(0)).group(1)) for m in links]
+        seen = set()
+        content = minify_css('\n'.join(bundle_css(source_dir, source, seen) for source in sources))
+        name = posixpath.splitext(posixpath.basename(sources[0]))[0]
+        sources = sorted(seen)
+        filename = _write_asset(out_dir, name, 'css', content, sources, bundles)
+        html = _replace_tags(html, links, f'<link rel="stylesheet" href="{relative(filename)}">')
+
+    with open(os.path.join(out_dir, page), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+def _compress(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    variants = [('gzip', '.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('br', '.br', lambda d: brotli.compress(d, quality=11)))
+    for _, suffix, compress in variants:
+        compressed = compress(data)
+        if len(compressed) < len(data):
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+
+def _prepare_out_dir(out_dir):
+    if os.path.isdir(out_dir) and os.listdir(out_dir):
+        if not os.path.exists(os.path.join(out_dir, BUILD_MARKER)):
+            raise AssetBuildError(f'{out_dir} is not empty and was not created by the asset build')
+        shutil.rmtree(out_dir)
+
+def build(source_dir, out_dir):
+    """
+    Build a deployable copy of source_dir into out_dir.
+
+    Every HTML page's local stylesheets are bundled into one fingerprinted CSS
+    file, each run of adjacent classic scripts into one JS file and each module
+    entry point into one module bundle, all under assets/. Pages are rewritten
+    to reference the bundles, and text files get precompressed .gz (and .br)
+    siblings. Returns the size report.
+    """
+    _prepare_out_dir(out_dir)
+    shutil.copytree(source_dir, out_dir)
+    open(os.path.join(out_dir, BUILD_MARKER), 'w').close()
+    os.makedirs(os.path.join(out_dir, ASSETS_DIR), exist_ok=True)
+
+    bundles = {}
+    pages = sorted(os.path.relpath(os.path.join(d, f), source_dir).replace(os.sep, '/')
+                   for d, _, files in os.walk(source_dir) for f in files if f.endswith('.html'))
+    for page in pages:
+        _build_page(source_dir, out_dir, page, bundles)
+
+    for dirpath, _, filenames in os.walk(out_dir):
+        for filename in filenames:
+            if filename.endswith(COMPRESSIBLE):
+                _compress(os.path.join(dirpath, filename))
+
+    report = {}
+    for filename, bundle in sorted(bundles.items()):
+        source_bytes = sum(os.path.getsize(os.path.join(source_dir, s)) for s in bundle['sources'])
+        size, compressed = _compress_sizes(os.path.join(out_dir, filename))
+        report[bundle['name']] = {
+            'file': filename,
+            'sources': len(bundle['sources']),
+            'source_bytes': source_bytes,
+            'bytes': size,
+            **compressed
+        }
+    return report
+
+def _compress_sizes(path):
+    sizes = {}
+    for encoding, suffix in (('gzip', '.gz'), ('br', '.br')):
+        sizes[encoding] = os.path.getsize(path + suffix) if os.path.exists(path + suffix) else None
+    return os.path.getsize(path), sizes
+
+def load_report(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_report(path, report):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
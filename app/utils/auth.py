@@ -1,7 +1,51 @@
 from functools import wraps
 from flask import jsonify, current_app
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from app.models.user import User, UserRole
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from app.models.user import User, UserRole, UserStatus
+
+class LazyUser:
+    """
+    Stand-in for the authenticated User built from the JWT claims.
+
+    id, role, status and token_version come straight from the token, so the
+    authorization checks never touch the database. Reading or writing any other
+    attribute loads the users row on first use and delegates to it.
+    """
+
+    def __init__(self, user_id, role, status, token_version):
+        object.__setattr__(self, 'id', user_id)
+        object.__setattr__(self, 'role', role)
+        object.__setattr__(self, 'status', status)
+        object.__setattr__(self, 'token_version', token_version)
+        object.__setattr__(self, '_user', None)
+
+    @classmethod
+    def from_jwt(cls):
+        claims = get_jwt()
+        return cls(
+            int(get_jwt_identity()),
+            UserRole(claims['role']),
+            UserStatus(claims['status']),
+            claims['ver']
+        )
+
+    def is_blocked(self):
+        return self.status == UserStatus.BLOCKED
+
+    def _load(self):
+        user = object.__getattribute__(self, '_user')
+        if user is None:
+            user = User.query.get(self.id)
+            if user is None:
+                raise LookupError(f'No user found for ID: {self.id}')
+            object.__setattr__(self, '_user', user)
+        return user
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
 
 def get_current_user():
     """
@@ -9,7 +53,6 @@ def get_current_user():
     """
     verify_jwt_in_request()
     user_id = get_jwt_identity()
-    print("JWT identity (user_id):", user_id)  # Debug log
     return User.query.get(int(user_id))  # Convert string ID to integer
 
 def auth_required(fn):
@@ -20,12 +63,10 @@ def auth_required(fn):
     def wrapper(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            current_user = User.query.get(int(user_id))
+            current_user = LazyUser.from_jwt()
             
-            if not current_user:
-                current_app.logger.error(f'No user found for ID: {user_id}')
-                return jsonify({'error': 'User not found'}), 401
+            if current_user.is_blocked():
+                return jsonify({'error': 'Account is blocked'}), 403
                 
             return fn(current_user, *args, **kwargs)
             
@@ -43,20 +84,16 @@ def admin_required(fn):
     def wrapper(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            print("Admin check - JWT User ID:", user_id)
-            
-            current_user = User.query.get(int(user_id))
-            print("Admin check - Found User:", current_user.email if current_user else None)
+            current_user = LazyUser.from_jwt()
             
-            if not current_user:
-                return jsonify({'error': 'User not found'}), 401
+            if current_user.is_blocked():
+                return jsonify({'error': 'Account is blocked'}), 403
             if current_user.role != UserRole.ADMIN:
-                print(f"User {current_user.email} is not an admin, role: {current_user.role}")
+                current_app.logger.warning(f'User {current_user.id} is not an admin, role: {current_user.role}')
                 return jsonify({'error': 'Admin access required'}), 403
             return fn(current_user, *args, **kwargs)
         except Exception as e:
-            print("Admin Auth Error:", str(e))
+            current_app.logger.error(f'Admin auth error: {str(e)}')
             return jsonify({'error': str(e)}), 401
     return wrapper
 
@@ -68,19 +105,15 @@ def supplier_required(fn):
     def wrapper(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            print("Supplier check - JWT User ID:", user_id)
-            
-            current_user = User.query.get(int(user_id))
-            print("Supplier check - Found User:", current_user.email if current_user else None)
+            current_user = LazyUser.from_jwt()
             
-            if not current_user:
-                return jsonify({'error': 'User not found'}), 401
+            if current_user.is_blocked():
+                return jsonify({'error': 'Account is blocked'}), 403
             if current_user.role != UserRole.SUPPLIER:
-                print(f"User {current_user.email} is not a supplier, role: {current_user.role}")
+                current_app.logger.warning(f'User {current_user.id} is not a supplier, role: {current_user.role}')
                 return jsonify({'error': 'Supplier access required'}), 403
             return fn(current_user, *args, **kwargs)
         except Exception as e:
-            print("Supplier Auth Error:", str(e))
+            current_app.logger.error(f'Supplier auth error: {str(e)}')
             return jsonify({'error': str(e)}), 401
     return wrapper
@@ -0,0 +1,83 @@
+import logging
+from flask import current_app
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from app import db, revoked_token_cache
+from app.models.user import User, UserRole
+from app.models.dashboard_counter import DashboardCounter
+from app.models.product_stock import ProductStock
+from app.utils import counters, product_search, stock_index
+
+class SchemaError(Exception):
+    """Raised when the database schema is behind the models in a way create_all cannot fix"""
+
+def _addable(column):
+    """Whether ALTER TABLE ADD COLUMN can give existing rows a value for column"""
+    return not (column.primary_key or column.unique) and (column.nullable or column.server_default is not None)
+
+def check_schema():
+    """
+    Create tables the models define but the database lacks; needs an app context.
+
+    Columns missing from an existing table are added when existing rows can
+    take NULL or the column's server default, and missing indexes are created.
+    Returns the names of the tables created. Raises SchemaError for any other
+    missing column, since those need a migration.
+    """
+    inspector = inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    missing = []
+    added = []
+    unindexed = []
+    outdated = []
+    for name, table in db.metadata.tables.items():
+        if name not in existing:
+            missing.append(table)
+            continue
+        columns = {column['name'] for column in inspector.get_columns(name)}
+        absent = [column for column in table.columns if column.name not in columns]
+        if not all(_addable(column) for column in absent):
+            outdated.append(f"{name} ({', '.join(column.name for column in absent)})")
+            continue
+        added.extend(absent)
+        indexes = {index['name'] for index in inspector.get_indexes(name)}
+        unindexed.extend(index for index in table.indexes if index.name not in indexes)
+    if outdated:
+        raise SchemaError(f"Database is missing columns: {'; '.join(outdated)}")
+    if added:
+        dialect = db.engine.dialect
+        with db.engine.begin() as conn:
+            for column in added:
+                conn.exec_driver_sql(f'ALTER TABLE {dialect.identifier_preparer.format_table(column.table)} '
+                                     f'ADD COLUMN {CreateColumn(column).compile(dialect=dialect)}')
+        logging.info(f"Added columns: {', '.join(f'{c.table.name}.{c.name}' for c in added)}")
+    if unindexed:
+        # After the columns, which a new index may cover
+        with db.engine.begin() as conn:
+            for index in unindexed:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+        logging.info(f"Created indexes: {', '.join(index.name for index in unindexed)}")
+    if missing:
+        db.metadata.create_all(db.engine, tables=missing)
+    created = [table.name for table in missing]
+    if DashboardCounter.__tablename__ in created:
+        counters.rebuild()  # A new counters table starts empty; fill it from the existing data
+    if ProductStock.__tablename__ in created:
+        stock_index.rebuild()
+    return created
+
+def ensure_admin():
+    """Create the configured admin account if it does not exist; returns whether it was created"""
+    config = current_app.config
+    if User.query.filter_by(name=config['ADMIN_NAME']).first():
+        return False
+    admin = User(name=config['ADMIN_NAME'], email=config['ADMIN_EMAIL'], role=UserRole.ADMIN)
+    admin.set_password(config['ADMIN_PASSWORD'])
+    db.session.add(admin)
+    db.session.commit()
+    return True
+
+def warm_caches():
+    """Load the revoked token cache and make sure the product search index exists"""
+    revoked_token_cache.reload()
+    product_search.ensure_index()
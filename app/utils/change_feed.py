@@ -0,0 +1,108 @@
+import logging
+import itertools
+from datetime import datetime, timedelta
+from flask import current_app, g, has_request_context
+from sqlalchemy import delete, func, insert, or_
+from app import db
+from app.models.change_log import ChangeLog
+
+ORDER = 'order'
+QUOTATION = 'quotation'
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+_writes = itertools.count(1)
+
+class ResyncRequired(Exception):
+    """The cursor is older than the compacted log, or from a log that no longer exists"""
+
+    def __init__(self, head):
+        super().__init__('Cursor is too old; reload the collections, then follow the changes from the cursor given')
+        self.head = head
+
+def _entry(entity, entity_id, supplier_id, action, status):
+    return {
+        'entity': entity,
+        'entity_id': entity_id,
+        'supplier_id': int(supplier_id),
+        'action': action,
+        'status': None if action == DELETED else status.value
+    }
+
+def quotation_change(quotation, action):
+    return _entry(QUOTATION, quotation.id, quotation.supplier_user_id, action, quotation.status)
+
+def order_change(order, supplier_id, action):
+    return _entry(ORDER, order.id, supplier_id, action, order.status)
+
+def record(*entries):
+    """
+    Append entries from quotation_change/order_change in the caller's transaction.
+
+    One executemany however many entries. Every CHANGE_FEED_COMPACT_EVERY
+    calls the log is compacted once the request has finished.
+    """
+    now = datetime.utcnow()
+    db.session.execute(insert(ChangeLog), [{**entry, 'created_at': now} for entry in entries])
+    every = current_app.config.get('CHANGE_FEED_COMPACT_EVERY', 0)
+    if every and next(_writes) % every == 0 and has_request_context():
+        g.compact_change_log = True
+
+def changes_since(since, supplier_id=None, limit=100):
+    """
+    Up to limit entries after position since, only supplier_id's unless it is None.
+
+    Returns (entries, position to continue from, has_more). With since None
+    nothing is returned and the position is the head of the log. Raises
+    ResyncRequired when entries after since may have been compacted away.
+    """
+    oldest, head = db.session.query(func.min(ChangeLog.id), func.max(ChangeLog.id)).one()
+    head = head or 0
+    if since is None:
+        return [], head, False
+    # Compaction always keeps the newest entry, so a position past it means the log was reset
+    if since > head or (oldest is not None and since < oldest - 1):
+        raise ResyncRequired(head)
+
+    query = ChangeLog.query.filter(ChangeLog.id > since)
+    if supplier_id is not None:
+        query = query.filter(ChangeLog.supplier_id == supplier_id)
+    entries = query.order_by(ChangeLog.id).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if has_more:
+        return entries, entries[-1].id, True
+    # An entry committed after head was read can still be in the page
+    return entries, max(head, entries[-1].id) if entries else head, False
+
+def compact():
+    """
+    Delete entries older than CHANGE_FEED_RETENTION_HOURS or beyond the newest
+    CHANGE_FEED_MAX_ROWS, always keeping the newest one, and commit. Returns
+    the number of entries removed.
+    """
+    config = current_app.config
+    head = db.session.query(func.max(ChangeLog.id)).scalar()
+    if head is None:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(hours=config['CHANGE_FEED_RETENTION_HOURS'])
+    result = db.session.execute(delete(ChangeLog).where(
+        ChangeLog.id < head,
+        or_(ChangeLog.id <= head - config['CHANGE_FEED_MAX_ROWS'], ChangeLog.created_at < cutoff)
+    ))
+    db.session.commit()
+    return result.rowcount
+
+def _compact_if_due(exc):
+    if g.pop('compact_change_log', False):
+        try:
+            removed = compact()
+            logging.info(f'Compacted the change log, removed {removed} entries')
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f'Change log compaction failed: {str(e)}')
+
+def init_app(app):
+    """Compact after the response, so the request's own statements and query budget are unaffected"""
+    app.teardown_request(_compact_if_due)
@@ -0,0 +1,104 @@
+from datetime import datetime
+from sqlalchemy import func, insert
+from app import db
+from app.models.dashboard_counter import DashboardCounter
+from app.models.inventory import Inventory
+from app.models.order import Order, OrderStatus
+from app.models.quotation import Quotation, QuotationStatus
+from app.models.user import User, UserRole, UserStatus
+from app.utils.database import increment_upsert
+
+GLOBAL = 0  # supplier_id of the totals across all suppliers
+STOCK_UNITS = 'stock.units'
+STOCK_LINES = 'stock.lines'
+
+def quotation_key(status):
+    return f'quotations.{status.value}'
+
+def order_key(status):
+    return f'orders.{status.value}'
+
+def supplier_key(status):
+    return f'suppliers.{status.value}'
+
+def bump(changes, supplier_id=None):
+    """
+    Add {name: delta} to the global counters and, given supplier_id, to that supplier's.
+
+    Runs in the session's transaction, so the counts commit or roll back with
+    the change they describe. One executemany whatever the number of counters.
+    """
+    now = datetime.utcnow()
+    scopes = (GLOBAL,) if supplier_id is None else (GLOBAL, int(supplier_id))
+    rows = [{'supplier_id': scope, 'name': name, 'value': delta, 'updated_at': now}
+            for name, delta in changes.items() if delta for scope in scopes]
+    if rows:
+        db.session.execute(increment_upsert(DashboardCounter, ['supplier_id', 'name'], ['value']), rows)
+
+def move(key, old_status, new_status, supplier_id=None):
+    """Count one row moving between statuses, e.g. move(order_key, PENDING, CONFIRMED, supplier_id)"""
+    if old_status != new_status:
+        bump({key(old_status): -1, key(new_status): 1}, supplier_id)
+
+def read(supplier_id=GLOBAL):
+    """{name: value} for one scope"""
+    return dict(db.session.query(DashboardCounter.name, DashboardCounter.value)
+                .filter(DashboardCounter.supplier_id == supplier_id))
+
+def summary(supplier_id=None):
+    """The dashboard aggregates for one supplier, or across all of them with the supplier counts"""
+    values = read(GLOBAL if supplier_id is None else supplier_id)
+
+    def group(key, statuses):
+        counts = {status.value: values.get(key(status), 0) for status in statuses}
+        return {**counts, 'total': sum(counts.values())}
+
+    result = {
+        'quotations': group(quotation_key, QuotationStatus),
+        'orders': group(order_key, OrderStatus),
+        'stock': {'units': values.get(STOCK_UNITS, 0), 'lines': values.get(STOCK_LINES, 0)}
+    }
+    if supplier_id is None:
+        result['suppliers'] = group(supplier_key, UserStatus)
+    return result
+
+def rebuild():
+    """
+    Recompute every counter from the source tables and commit.
+
+    The old rows are deleted first, so on SQLite the write lock is held while
+    the aggregates are read and no concurrent bump can be lost. Returns
+    {(supplier_id, name): (old, new)} for the counters that had drifted.
+    """
+    old = {(row.supplier_id, row.name): row.value for row in DashboardCounter.query}
+    DashboardCounter.query.delete()
+
+    new = {}
+    def add(supplier_id, name, value):
+        for scope in (GLOBAL,) if supplier_id is None else (GLOBAL, supplier_id):
+            new[(scope, name)] = new.get((scope, name), 0) + (value or 0)
+
+    for supplier_id, status, count in (db.session.query(Quotation.supplier_user_id, Quotation.status, func.count())
+                                       .group_by(Quotation.supplier_user_id, Quotation.status)):
+        add(supplier_id, quotation_key(status), count)
+    for supplier_id, status, count in (db.session.query(Quotation.supplier_user_id, Order.status, func.count())
+                                       .join(Quotation, Order.quotation_id == Quotation.id)
+                                       .group_by(Quotation.supplier_user_id, Order.status)):
+        add(supplier_id, order_key(status), count)
+    for supplier_id, units, lines in (db.session.query(Inventory.supplier_id, func.sum(Inventory.quantity), func.count())
+                                      .group_by(Inventory.supplier_id)):
+        add(supplier_id, STOCK_UNITS, units)
+        add(supplier_id, STOCK_LINES, lines)
+    for status, count in (db.session.query(User.status, func.count())
+                          .filter(User.role == UserRole.SUPPLIER).group_by(User.status)):
+        add(None, supplier_key(status), count)
+
+    now = datetime.utcnow()
+    if new:
+        db.session.execute(insert(DashboardCounter), [
+            {'supplier_id': supplier_id, 'name': name, 'value': value, 'updated_at': now}
+            for (supplier_id, name), value in new.items()
+        ])
+    db.session.commit()
+    return {key: (old.get(key, 0), new.get(key, 0))
+            for key in old.keys() | new.keys() if old.get(key, 0) != new.get(key, 0)}
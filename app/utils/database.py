@@ -0,0 +1,108 @@
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from config import DB_PROFILES
+
+# Config keys that override one setting of the selected profile when not None
+POOL_OVERRIDES = {
+    'pool_size': 'DB_POOL_SIZE',
+    'max_overflow': 'DB_MAX_OVERFLOW',
+    'pool_timeout': 'DB_POOL_TIMEOUT',
+    'pool_pre_ping': 'DB_POOL_PRE_PING',
+    'pool_recycle': 'DB_POOL_RECYCLE'
+}
+PRAGMA_OVERRIDES = {
+    'busy_timeout': 'SQLITE_BUSY_TIMEOUT',
+    'mmap_size': 'SQLITE_MMAP_SIZE',
+    'cache_size': 'SQLITE_CACHE_SIZE'
+}
+
+def resolve_profile(config):
+    """
+    Return (name, pool options, pragmas) for the configured DB_PROFILE with
+    any per-setting overrides applied. Raises ValueError for an unknown
+    profile or one meant for a different database than SQLALCHEMY_DATABASE_URI.
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    name = config.get('DB_PROFILE') or ('postgres' if url.get_backend_name() == 'postgresql' else 'dev-sqlite')
+    if name not in DB_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{name}', expected one of: {', '.join(DB_PROFILES)}")
+    profile = DB_PROFILES[name]
+    if profile['dialect'] != url.get_backend_name():
+        raise ValueError(f"DB_PROFILE '{name}' is for {profile['dialect']} but the database URI is "
+                         f"{url.get_backend_name()}")
+
+    pool = dict(profile['pool'])
+    for option, key in POOL_OVERRIDES.items():
+        if config.get(key) is not None:
+            pool[option] = config[key]
+    pragmas = dict(profile['pragmas'])
+    for pragma, key in PRAGMA_OVERRIDES.items():
+        if config.get(key) is not None:
+            pragmas[pragma] = config[key]
+    return name, pool, pragmas
+
+def _is_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def configure_engine(app):
+    """
+    Put the profile's pool settings into SQLALCHEMY_ENGINE_OPTIONS; call before db.init_app.
+
+    Options already set in SQLALCHEMY_ENGINE_OPTIONS win. In-memory SQLite
+    keeps Flask-SQLAlchemy's single shared connection, so no pool settings apply.
+    """
+    name, pool, pragmas = resolve_profile(app.config)
+    if _is_memory(make_url(app.config['SQLALCHEMY_DATABASE_URI'])):
+        pool = {}
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**pool, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+    app.extensions['db_profile'] = {'name': name, 'pool': pool, 'pragmas': pragmas}
+
+_configured_engines = set()
+
+def _pragma_listener(pragmas):
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas.items():
+                cursor.execute(f'PRAGMA {pragma}={value}')
+        finally:
+            cursor.close()
+    return apply_pragmas
+
+def init_app(app):
+    """Run the profile's PRAGMAs on every new connection and log the settings in effect"""
+    from app import db
+    settings = app.extensions['db_profile']
+    pragmas = settings['pragmas']
+    with app.app_context():
+        engine = db.engine
+    if pragmas and engine not in _configured_engines:
+        event.listen(engine, 'connect', _pragma_listener(pragmas))
+        _configured_engines.add(engine)
+
+    # Read the PRAGMAs back from a connection, so the log shows what SQLite accepted
+    effective = []
+    if pragmas:
+        with engine.connect() as conn:
+            for pragma in pragmas:
+                value = conn.exec_driver_sql(f'PRAGMA {pragma}').scalar()
+                effective.append(f'{pragma}={value}')
+    pool = [f'{option}={value}' for option, value in settings['pool'].items()]
+    app.logger.info(f"Database profile {settings['name']} on {engine.url.render_as_string(hide_password=True)}: "
+                    f"{' '.join([type(engine.pool).__name__] + pool + effective)}")
+
+def increment_upsert(model, index_elements, columns):
+    """
+    INSERT ... ON CONFLICT DO UPDATE that adds each inserted value of columns
+    to the stored one and takes the new updated_at; SQLite and PostgreSQL.
+    Execute it with a list of rows to apply any number of deltas at once.
+    """
+    from app import db
+    dialect = {'sqlite': sqlite, 'postgresql': postgresql}[db.engine.dialect.name]
+    stmt = dialect.insert(model)
+    increments = {column: getattr(model, column) + stmt.excluded[column] for column in columns}
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={**increments, 'updated_at': stmt.excluded.updated_at}
+    )
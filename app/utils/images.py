@@ -0,0 +1,147 @@
+import io
+import os
+import base64
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.image_variant import ImageVariant
+
+try:
+    from PIL import Image, ImageFilter, ImageOps, features
+except ImportError:  # Without Pillow products simply keep serving the original upload
+    Image = None
+
+SIZES = {'thumb': 160, 'card': 480, 'full': 1280}
+PLACEHOLDER_WIDTH = 16
+QUALITY = {'jpeg': 82, 'webp': 80, 'avif': 60}
+EXTENSIONS = {'jpeg': 'jpg', 'png': 'png', 'webp': 'webp', 'avif': 'avif'}
+VARIANTS_DIR = 'variants'
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+def upload_root(app):
+    """UPLOAD_ROOT, by default the uploads folder next to the app package"""
+    return app.config.get('UPLOAD_ROOT') or os.path.join(os.path.dirname(app.root_path), 'uploads')
+
+def _relative(image):
+    """Turn a stored Product.image ('uploads/...') into a path under the uploads folder"""
+    return image.split('/', 1)[1] if image.startswith('uploads/') else image
+
+def _variant_dir(app, image):
+    return os.path.join(upload_root(app), VARIANTS_DIR, os.path.splitext(_relative(image))[0])
+
+def _modern_formats():
+    return [fmt for fmt in ('webp', 'avif') if features.check(fmt)]
+
+def build_variants(source_path, out_dir):
+    """
+    Write every size and format of source_path into out_dir.
+
+    Returns ({size: {format: filename}}, placeholder data URI).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with Image.open(source_path) as original:
+        img = ImageOps.exif_transpose(original)
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+
+    formats = ['png' if has_alpha else 'jpeg'] + _modern_formats()
+    variants = {}
+    for size, width in SIZES.items():
+        resized = img.copy()
+        resized.thumbnail((width, width), Image.LANCZOS)
+        variants[size] = {}
+        for fmt in formats:
+            filename = f'{size}.{EXTENSIONS[fmt]}'
+            resized.save(os.path.join(out_dir, filename), format=fmt.upper(),
+                         quality=QUALITY.get(fmt, 80), optimize=True)
+            variants[size][fmt] = filename
+
+    tiny = img.convert('RGB')
+    tiny.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    placeholder_format = 'webp' if 'webp' in formats else 'jpeg'
+    buffer = io.BytesIO()
+    tiny.save(buffer, format=placeholder_format.upper(), quality=40)
+    placeholder = f'data:image/{placeholder_format};base64,{base64.b64encode(buffer.getvalue()).decode()}'
+
+    return variants, placeholder
+
+def generate_variants(image):
+    """Build and record the derivatives of one stored upload; needs an app context"""
+    app = current_app._get_current_object()
+    source_path = os.path.join(upload_root(app), _relative(image))
+    out_dir = _variant_dir(app, image)
+    url_prefix = f'/uploads/{VARIANTS_DIR}/{os.path.splitext(_relative(image))[0]}'
+
+    files, placeholder = build_variants(source_path, out_dir)
+    urls = {size: {fmt: f'{url_prefix}/{name}' for fmt, name in by_format.items()}
+            for size, by_format in files.items()}
+
+    row = ImageVariant.query.filter_by(source=image).first() or ImageVariant(source=image)
+    row.variants = urls
+    row.placeholder = placeholder
+    db.session.add(row)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # Another worker recorded the same source first
+
+def _get_executor(app):
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'],
+                                           thread_name_prefix='image-variants')
+            _slots = threading.BoundedSemaphore(app.config['IMAGE_QUEUE_LIMIT'])
+    return _executor, _slots
+
+def schedule_variants(product):
+    """
+    Queue derivative generation for a product's committed upload without blocking the request.
+
+    When the queue is full the job is dropped; the product keeps serving its
+    original image until 'flask build-image-variants' fills the gap.
+    """
+    image = product.image
+    if Image is None or not image:
+        return
+    if product.image_variants is not None:
+        return  # Same bytes were uploaded before and already have variants, loaded with the product
+    app = current_app._get_current_object()
+    executor, slots = _get_executor(app)
+    if not slots.acquire(blocking=False):
+        logging.warning(f'Image worker queue full, skipping variants for {image}')
+        return
+
+    def run():
+        try:
+            with app.app_context():
+                generate_variants(image)
+        except Exception as e:
+            logging.error(f'Error building variants for {image}: {str(e)}')
+        finally:
+            slots.release()
+
+    executor.submit(run)
+
+def discard_variants(image):
+    """Drop the variant row (in the caller's transaction) and the derivative files"""
+    if not image:
+        return
+    ImageVariant.query.filter_by(source=image).delete()
+    shutil.rmtree(_variant_dir(current_app, image), ignore_errors=True)
+
+def shutdown(wait=True):
+    """Stop the worker pool, by default after the queued jobs finish; the next upload starts a new one"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
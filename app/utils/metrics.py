@@ -0,0 +1,117 @@
+import os
+import time
+import logging
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+try:
+    from prometheus_client import (Counter, Histogram, CollectorRegistry, REGISTRY,
+                                   CONTENT_TYPE_LATEST, generate_latest, multiprocess)
+except ImportError:  # Without prometheus_client requests are simply not measured
+    Counter = None
+
+# Set PROMETHEUS_MULTIPROC_DIR before the app is imported to aggregate across worker processes
+MULTIPROC_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+UNMATCHED_ENDPOINT = 'unmatched'
+
+if Counter is not None:
+    REQUEST_LATENCY = Histogram('techfix_request_duration_seconds', 'Request latency',
+                                ['endpoint', 'method'], buckets=LATENCY_BUCKETS)
+    REQUESTS = Counter('techfix_requests_total', 'Requests by response status',
+                       ['endpoint', 'method', 'status'])
+    RESPONSE_BYTES = Counter('techfix_response_bytes_total', 'Response body bytes', ['endpoint'])
+    SQL_STATEMENTS = Histogram('techfix_request_sql_statements', 'SQL statements executed per request',
+                               ['endpoint'], buckets=STATEMENT_BUCKETS)
+    SQL_SECONDS = Counter('techfix_sql_seconds_total', 'Time spent executing SQL', ['endpoint'])
+    PASSWORD_HASH_SECONDS = Histogram('techfix_password_hash_seconds', 'Time spent hashing or verifying a password',
+                                      ['operation'], buckets=LATENCY_BUCKETS)
+    PASSWORD_HASH_WAIT = Histogram('techfix_password_hash_wait_seconds', 'Time a password hash waited for a worker',
+                                   ['operation'], buckets=LATENCY_BUCKETS)
+    PASSWORD_HASH_REJECTED = Counter('techfix_password_hash_rejected_total',
+                                     'Password hashes refused because the queue was full', ['operation'])
+
+class RequestMetrics:
+    """
+    Per-endpoint request and SQL metrics in Prometheus format.
+
+    SQL statements are tallied on flask.g by engine events and every metric is
+    updated once, when the response is finalised. With PROMETHEUS_MULTIPROC_DIR
+    set each worker writes its own memory-mapped files and render() merges them,
+    so no state is shared between processes.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = Counter is not None and app.config.get('METRICS_ENABLED', True)
+        app.extensions['request_metrics'] = self
+        if not self.enabled:
+            return
+
+        from app import db
+        with app.app_context():
+            engine = db.engine
+        if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+        app.before_request(_start_request)
+        app.after_request(_record_response)
+
+    def render(self):
+        """Return (body, content_type) for the metrics endpoint"""
+        if MULTIPROC_ENV in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_process_dead(pid):
+    """Drop an exited worker's live gauges from the multiprocess files; call from the server master"""
+    if Counter is not None and MULTIPROC_ENV in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+def record_password_hash(operation, waited, seconds):
+    if Counter is not None:
+        PASSWORD_HASH_WAIT.labels(operation).observe(waited)
+        PASSWORD_HASH_SECONDS.labels(operation).observe(seconds)
+
+def record_password_hash_rejected(operation):
+    if Counter is not None:
+        PASSWORD_HASH_REJECTED.labels(operation).inc()
+
+def _start_request():
+    g.metrics_start = time.perf_counter()
+    g.sql_statements = 0
+    g.sql_seconds = 0.0
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_statements += 1
+        g.sql_seconds += elapsed
+
+def _record_response(response):
+    if 'metrics_start' not in g:
+        return response
+    try:
+        endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        elapsed = time.perf_counter() - g.metrics_start
+        REQUEST_LATENCY.labels(endpoint, request.method).observe(elapsed)
+        REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        if not response.is_streamed and response.content_length:
+            RESPONSE_BYTES.labels(endpoint).inc(response.content_length)
+        SQL_STATEMENTS.labels(endpoint).observe(g.sql_statements)
+        SQL_SECONDS.labels(endpoint).inc(g.sql_seconds)
+    except Exception as e:
+        logging.error(f'Error recording request metrics: {str(e)}')
+    return response
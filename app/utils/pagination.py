@@ -0,0 +1,217 @@
+import base64
+import binascii
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import jsonify, request, current_app, Response, stream_with_context
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Order a list by column descending with ties broken by tiebreak, a column equal to model.id
+# (model.id when None) that lets an index on (column DESC, tiebreak) serve the whole order.
+# key(row) gives a row's column value for the cursor.
+Sort = namedtuple('Sort', ['column', 'key', 'tiebreak'], defaults=[None])
+
+def encode_cursor(*values):
+    """Encode the sort values of the last row on a page, ending with its id, as an opaque cursor"""
+    return base64.urlsafe_b64encode(':'.join(str(v) for v in values).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor back into its list of integers"""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        return [int(v) for v in base64.urlsafe_b64decode(padded.encode()).decode().split(':')]
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+def _parse_datetime(value, end_of_range=False):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    # A bare date as the upper bound covers that whole day
+    if end_of_range and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def parse_list_args(status_enum=None):
+    """
+    Read the shared list parameters from the query string.
+
+    Supports limit, cursor, status (validated against status_enum),
+    supplier_user_id and a created_from/created_to date range.
+    limit=all, or asking for NDJSON (format=ndjson or an Accept header)
+    without a limit, selects every remaining row and the response is
+    streamed; filters['limit'] is then None.
+    Returns (filters, error) in the same style as the controllers.
+    """
+    args = request.args
+    default_limit = current_app.config['PAGE_SIZE_DEFAULT']
+    max_limit = current_app.config['PAGE_SIZE_MAX']
+
+    fmt = (args.get('format') or '').lower()
+    if not fmt:
+        best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+        fmt = 'ndjson' if best == NDJSON_MIMETYPE else 'json'
+    if fmt not in ('json', 'ndjson'):
+        return None, "format must be 'json' or 'ndjson'"
+
+    limit_arg = args.get('limit')
+    if (limit_arg or '').lower() == 'all' or (limit_arg is None and fmt == 'ndjson'):
+        limit = None
+    else:
+        try:
+            limit = int(limit_arg or default_limit)
+        except ValueError:
+            return None, "limit must be an integer or 'all'"
+        if limit < 1:
+            return None, 'limit must be positive'
+        limit = min(limit, max_limit)
+
+    filters = {
+        'limit': limit,
+        'format': fmt,
+        'after_id': None,
+        'after_key': (),
+        'status': None,
+        'supplier_user_id': None,
+        'created_from': None,
+        'created_to': None
+    }
+
+    if args.get('cursor'):
+        try:
+            *after_key, filters['after_id'] = decode_cursor(args['cursor'])
+        except ValueError as e:
+            return None, str(e)
+        filters['after_key'] = tuple(after_key)
+
+    if args.get('status') and args['status'].lower() != 'all':
+        if status_enum is None:
+            return None, 'status filter is not supported here'
+        try:
+            filters['status'] = status_enum(args['status'].lower())
+        except ValueError:
+            return None, f'Invalid status. Must be one of: {[s.value for s in status_enum]}'
+
+    if args.get('supplier_user_id'):
+        try:
+            filters['supplier_user_id'] = int(args['supplier_user_id'])
+        except ValueError:
+            return None, 'supplier_user_id must be an integer'
+
+    try:
+        if args.get('created_from'):
+            filters['created_from'] = _parse_datetime(args['created_from'])
+        if args.get('created_to'):
+            filters['created_to'] = _parse_datetime(args['created_to'], end_of_range=True)
+    except ValueError:
+        return None, 'created_from/created_to must be ISO 8601 dates'
+
+    return filters, None
+
+def apply_date_range(query, column, filters):
+    """Restrict query to rows whose column falls inside the requested range"""
+    if filters['created_from'] is not None:
+        query = query.filter(column >= filters['created_from'])
+    if filters['created_to'] is not None:
+        query = query.filter(column < filters['created_to'])
+    return query
+
+def _order_by(model, sort):
+    return (model.id,) if sort is None else (sort.column.desc(), _tiebreak(model, sort))
+
+def _tiebreak(model, sort):
+    return model.id if sort.tiebreak is None else sort.tiebreak
+
+def _after_cursor(query, model, filters, sort):
+    """Skip the rows up to and including the one the cursor points at"""
+    if filters['after_id'] is None:
+        return query
+    if sort is None:
+        return query.filter(model.id > filters['after_id'])
+    if len(filters['after_key']) != 1:
+        raise ValueError('Invalid cursor')
+    (value,) = filters['after_key']
+    tiebreak = _tiebreak(model, sort)
+    return query.filter(or_(sort.column < value, and_(sort.column == value, tiebreak > filters['after_id'])))
+
+def paginate(query, model, filters, sort=None):
+    """
+    Fetch one page of query using keyset pagination on model.id, or on sort.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page. Raises
+    ValueError for a cursor taken from a list with a different order.
+    """
+    limit = filters['limit']
+    rows = _after_cursor(query, model, filters, sort).order_by(*_order_by(model, sort)).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(last.id) if sort is None else encode_cursor(sort.key(last), last.id)
+    return rows, None
+
+def page_response(items, next_cursor):
+    """JSON array response carrying the next cursor in a header"""
+    response = jsonify(items)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+def stream_response(query, model, serialize, fmt='json', sort=None):
+    """
+    Stream every row of query as a JSON array, or as NDJSON when fmt is 'ndjson'.
+
+    Rows are fetched STREAM_BATCH_SIZE at a time with yield_per and written out
+    batch by batch, so memory stays flat however many rows match. The request
+    context (and with it the database session) lives until the last batch is sent.
+    """
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+    dumps = current_app.json.dumps
+    rows = query.order_by(*_order_by(model, sort)).yield_per(batch_size)
+
+    def generate():
+        if fmt == 'json':
+            yield '['
+        separator = ''
+        batch = []
+        try:
+            for row in rows:
+                batch.append(dumps(serialize(row)))
+                if len(batch) >= batch_size:
+                    yield _join_batch(batch, separator, fmt)
+                    separator = ','
+                    batch = []
+            if batch:
+                yield _join_batch(batch, separator, fmt)
+        except Exception as e:
+            # Headers are already sent; the truncated body is how the client finds out
+            current_app.logger.error(f'Error streaming {model.__tablename__}: {str(e)}')
+            raise
+        if fmt == 'json':
+            yield ']'
+
+    mimetype = NDJSON_MIMETYPE if fmt == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+def _join_batch(batch, separator, fmt):
+    if fmt == 'ndjson':
+        return '\n'.join(batch) + '\n'
+    return separator + ','.join(batch)
+
+def list_response(query, model, filters, serialize, sort=None):
+    """
+    One keyset page with its cursor header, or the whole remaining result streamed.
+
+    Raises ValueError, like paginate, for a cursor that does not fit sort.
+    """
+    if filters['limit'] is None:
+        query = _after_cursor(query, model, filters, sort)
+        return stream_response(query, model, serialize, filters['format'], sort)
+    rows, next_cursor = paginate(query, model, filters, sort)
+    items = [serialize(row) for row in rows]
+    if filters['format'] == 'ndjson':
+        response = Response(''.join(current_app.json.dumps(item) + '\n' for item in items), mimetype=NDJSON_MIMETYPE)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return response
+    return page_response(items, next_cursor)
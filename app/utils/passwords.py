@@ -0,0 +1,85 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.metrics import record_password_hash, record_password_hash_rejected
+
+RETRY_AFTER_SECONDS = 1
+
+class HashingBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+class PasswordHasher:
+    """
+    Password hashing and verification on a small dedicated thread pool.
+
+    scrypt and pbkdf2 release the GIL, so the pool caps how many cores hashing
+    can take in each process while request threads wait on the result. Calls
+    beyond PASSWORD_HASH_QUEUE_LIMIT (running or waiting) raise HashingBusy
+    at once, which the app answers with 503, so a burst of logins cannot hold
+    every request thread.
+    """
+
+    def __init__(self, app=None):
+        self.method = None
+        self.workers = 2
+        self.queue_limit = 16
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Werkzeug's full form of the method ('scrypt' -> 'scrypt:32768:8:1'); an invalid one fails here
+        self.method = generate_password_hash('', app.config.get('PASSWORD_HASH_METHOD', 'scrypt')).split('$', 1)[0]
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.queue_limit = app.config.get('PASSWORD_HASH_QUEUE_LIMIT', 16)
+        app.extensions['password_hasher'] = self
+        app.register_error_handler(HashingBusy, _busy_response)
+
+    def hash(self, password):
+        return self._run('hash', generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run('verify', check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """Whether pwhash was made with a method or cost other than the configured one"""
+        return pwhash.split('$', 1)[0] != self.method
+
+    def _pool(self):
+        with self._lock:
+            # A pool inherited through fork has no threads, so each process starts its own
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                self._slots = threading.BoundedSemaphore(self.queue_limit)
+                self._pid = os.getpid()
+            return self._executor, self._slots
+
+    def _run(self, operation, fn, *args):
+        executor, slots = self._pool()
+        if not slots.acquire(blocking=False):
+            record_password_hash_rejected(operation)
+            raise HashingBusy()
+        queued = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                record_password_hash(operation, started - queued, time.perf_counter() - started)
+
+        try:
+            return executor.submit(timed).result()
+        finally:
+            slots.release()
+
+def _busy_response(error):
+    response = jsonify({'error': 'Server is busy, please retry shortly'})
+    response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response, 503
@@ -0,0 +1,143 @@
+import re
+import html
+import logging
+from sqlalchemy import text, or_, case
+from app import db
+from app.models.product import Product
+from app.utils.query_tracker import untracked
+
+FTS_TABLE = 'products_fts'
+INDEXED_COLUMNS = ['name', 'description', 'manufacturer', 'part_number', 'category']
+# bm25 weights, in INDEXED_COLUMNS order: a hit in the name or part number outranks one in the description
+COLUMN_WEIGHTS = [10.0, 1.0, 3.0, 8.0, 2.0]
+SNIPPET_TOKENS = 12
+# snippet() marks matches with these, so the product text can be escaped before they become <mark> tags
+_MARK_OPEN, _MARK_CLOSE = '\x02', '\x03'
+
+_fts_ready = {}  # engine url -> whether products_fts exists and can be used
+
+def _fts_supported():
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    return bool(db.session.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+def _table_exists():
+    return db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': FTS_TABLE}
+    ).first() is not None
+
+def uses_fts():
+    """Whether search is served from products_fts; otherwise the LIKE fallback is used"""
+    url = str(db.engine.url)
+    if url not in _fts_ready:
+        with untracked():
+            _fts_ready[url] = _fts_supported() and _table_exists()
+    return _fts_ready[url]
+
+def forget_index_state():
+    """Drop the cached FTS availability, after the database was replaced or reset underneath the app"""
+    _fts_ready.clear()
+
+def ensure_index():
+    """
+    Create and fill products_fts if the engine supports FTS5 and it is missing.
+
+    Run at startup rather than from a request so the DDL never shares a
+    transaction with application writes.
+    """
+    if not _fts_supported():
+        logging.info('FTS5 not available, product search will use LIKE matching')
+        return False
+    if not _table_exists():
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"{', '.join(INDEXED_COLUMNS)}, tokenize = 'unicode61', prefix = '2 3')"
+        ))
+        _populate()
+        db.session.commit()
+        logging.info(f'Created {FTS_TABLE} and indexed existing products')
+    _fts_ready[str(db.engine.url)] = True
+    return True
+
+def _populate():
+    columns = ', '.join(INDEXED_COLUMNS)
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {columns} FROM products"))
+
+def index_product(product, new=False):
+    """Add or refresh one product in the index, new=True when it was never indexed; runs in the caller's transaction"""
+    if not uses_fts():
+        return
+    if not new:
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {'id': product.id})
+    db.session.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(INDEXED_COLUMNS)}) "
+             f"VALUES (:id, {', '.join(':' + c for c in INDEXED_COLUMNS)})"),
+        {'id': product.id, **{c: getattr(product, c) for c in INDEXED_COLUMNS}}
+    )
+
+def remove_product(product_id):
+    """Drop one product from the index; runs in the caller's transaction"""
+    if not uses_fts():
+        return
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {'id': product_id})
+
+def rebuild_index():
+    """Re-index every product from scratch. Returns the number of rows indexed"""
+    if not ensure_index():
+        return 0
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    _populate()
+    db.session.commit()
+    return Product.query.count()
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())
+
+def search_products(query, limit):
+    """
+    Ranked product search with prefix matching.
+
+    Returns a list of (product, snippet) pairs, best match first. The snippet
+    is HTML: escaped product text with matched terms wrapped in <mark> tags.
+    It is None on the LIKE fallback.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    if uses_fts():
+        return _search_fts(terms, limit)
+    return _search_like(terms, limit)
+
+def _search_fts(terms, limit):
+    # Quote every term so FTS5 operators in user input are treated as text
+    match = ' '.join(f'"{term}"*' for term in terms)
+    weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+    rows = db.session.execute(
+        text(f"SELECT rowid, snippet({FTS_TABLE}, -1, :mark_open, :mark_close, '…', {SNIPPET_TOKENS}) "
+             f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+             f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT :limit"),
+        {'match': match, 'limit': limit, 'mark_open': _MARK_OPEN, 'mark_close': _MARK_CLOSE}
+    ).all()
+    products = {p.id: p for p in Product.query.filter(Product.id.in_([r[0] for r in rows]))}
+    return [(products[rowid], _highlight(snippet)) for rowid, snippet in rows if rowid in products]
+
+def _highlight(snippet):
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>')
+
+def _search_like(terms, limit):
+    columns = [getattr(Product, c) for c in INDEXED_COLUMNS]
+    query = Product.query
+    for term in terms:
+        query = query.filter(or_(*[column.ilike(f'%{term}%') for column in columns]))
+    # Without a ranking function, surface name and part number prefix hits first
+    first = terms[0]
+    rank = case(
+        (Product.name.ilike(f'{first}%'), 0),
+        (Product.part_number.ilike(f'{first}%'), 1),
+        else_=2
+    )
+    products = query.order_by(rank, Product.name, Product.id).limit(limit).all()
+    return [(product, None) for product in products]
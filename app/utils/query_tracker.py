@@ -0,0 +1,166 @@
+import re
+import logging
+from contextvars import ContextVar
+from contextlib import contextmanager
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+
+QUERY_COUNT_HEADER = 'X-Query-Count'
+
+_active_trackers = ContextVar('active_query_trackers', default=())
+_instrumented_engines = set()
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code or an endpoint runs more statements than allowed"""
+
+def fingerprint(statement):
+    """
+    Reduce a SQL statement to its shape.
+
+    Literals become ?, IN lists and multi-row VALUES collapse to a single
+    entry and whitespace is normalised, so statements that differ only by
+    their parameters share a fingerprint.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', statement)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(?)', sql)
+    sql = re.sub(r'(VALUES \([^)]*\))(?:\s*,\s*\([^)]*\))+', r'\1', sql, flags=re.I)
+    return sql
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    for tracker in _active_trackers.get():
+        tracker.statements.append((fingerprint(statement), statement, parameters))
+
+def _instrument(engine):
+    if engine not in _instrumented_engines:
+        event.listen(engine, 'after_cursor_execute', _record)
+        _instrumented_engines.add(engine)
+
+class QueryTracker:
+    """
+    Context manager recording every SQL statement run on the current context.
+
+    Usage in tests:
+
+        with QueryTracker() as queries:
+            client.get('/api/orders/')
+        queries.assert_budget(5)
+        queries.assert_no_repeats()
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.statements = []  # (fingerprint, statement, parameters)
+        self._token = None
+
+    def __enter__(self):
+        if self.engine is None:
+            from app import db
+            self.engine = db.engine
+        _instrument(self.engine)
+        self._token = _active_trackers.set(_active_trackers.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _active_trackers.reset(self._token)
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self, threshold=2):
+        """Fingerprints run at least threshold times, most frequent first"""
+        counts = {}
+        for fp, _, _ in self.statements:
+            counts[fp] = counts.get(fp, 0) + 1
+        return sorted(((fp, n) for fp, n in counts.items() if n >= threshold), key=lambda item: -item[1])
+
+    def report(self, threshold=2):
+        lines = [f'{self.count} statements']
+        for fp, n in self.repeated(threshold):
+            lines.append(f'  repeated {n}x: {fp}')
+        lines.extend(f'  {i + 1}. {statement}' for i, (_, statement, _) in enumerate(self.statements))
+        return '\n'.join(lines)
+
+    def assert_budget(self, max_queries, label='block'):
+        if self.count > max_queries:
+            raise QueryBudgetExceeded(f'{label} ran {self.count} SQL statements, budget is {max_queries}\n{self.report()}')
+
+    def assert_no_repeats(self, threshold=2, label='block'):
+        repeats = self.repeated(threshold)
+        if repeats:
+            raise QueryBudgetExceeded(f'{label} repeated statements that differ only by parameters\n{self.report(threshold)}')
+
+@contextmanager
+def untracked():
+    """Hide statements from active trackers, for one-off cache warm-ups a request merely triggers"""
+    token = _active_trackers.set(())
+    try:
+        yield
+    finally:
+        _active_trackers.reset(token)
+
+def query_budget(max_queries, per=None):
+    """
+    Declare how many statements a view may run; checked when QUERY_TRACKING is on.
+
+    With per, the budget is max_queries for each unit of work the view reports
+    through count_unit(per), e.g. query_budget(7, per='chunk') for a bulk upload
+    applied in chunks. A request that reports no units gets one unit's budget.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        view.query_budget_per = per
+        return view
+    return decorator
+
+def count_unit(per):
+    """Report one unit of work for the current request's per-unit query budget"""
+    if has_request_context() and 'query_tracker' in g:
+        units = g.setdefault('query_budget_units', {})
+        units[per] = units.get(per, 0) + 1
+
+def init_app(app):
+    """
+    Track the statements of every request when QUERY_TRACKING is enabled.
+
+    Responses carry X-Query-Count. Statements repeated QUERY_REPEAT_THRESHOLD
+    times (the N+1 shape) are logged, and a view exceeding its query_budget is
+    logged or, with QUERY_BUDGET_STRICT, raises QueryBudgetExceeded so tests fail.
+    """
+    if not app.config.get('QUERY_TRACKING'):
+        return
+    app.before_request(_start_tracking)
+    app.after_request(_check_request)
+
+def _start_tracking():
+    tracker = QueryTracker()
+    tracker.__enter__()
+    g.query_tracker = tracker
+
+def _check_request(response):
+    tracker = g.pop('query_tracker', None)
+    if tracker is None:
+        return response
+    tracker.__exit__(None, None, None)
+    response.headers[QUERY_COUNT_HEADER] = str(tracker.count)
+
+    label = f'{request.method} {request.path} ({request.endpoint})'
+    threshold = current_app.config.get('QUERY_REPEAT_THRESHOLD', 3)
+    for fp, n in tracker.repeated(threshold):
+        logging.warning(f'Possible N+1 in {label}: ran {n}x {fp}')
+
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'query_budget', None)
+    per = getattr(view, 'query_budget_per', None)
+    if budget is not None and per is not None:
+        units = max(g.pop('query_budget_units', {}).get(per, 0), 1)
+        label = f'{label} over {units} {per}(s)'
+        budget *= units
+    if budget is not None and tracker.count > budget:
+        if current_app.config.get('QUERY_BUDGET_STRICT'):
+            tracker.assert_budget(budget, label)
+        logging.warning(f'{label} ran {tracker.count} SQL statements, budget is {budget}')
+    return response
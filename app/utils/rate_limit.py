@@ -0,0 +1,235 @@
+import os
+import re
+import math
+import time
+import logging
+import sqlite3
+import threading
+from flask import g, request, jsonify
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+PRUNE_EVERY = 1000  # takes between sweeps of idle buckets
+OFF = 'off'
+
+class Rate:
+    """A token bucket shape: capacity requests as a burst, refilled at capacity per period"""
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        self.per_second = capacity / period
+
+    def __repr__(self):
+        return f'Rate({self.capacity}/{self.period}s)'
+
+def parse_rate(text):
+    """'10/minute', '100/5minutes' or '2/second' -> Rate; 'off' -> None"""
+    text = text.strip().lower()
+    if text == OFF:
+        return None
+    match = re.fullmatch(r'(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?', text)
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid rate limit '{text}', expected e.g. '10/minute' or 'off'")
+    return Rate(int(match.group(1)), int(match.group(2) or 1) * PERIODS[match.group(3)])
+
+def parse_rules(rules):
+    """
+    Rules keyed by endpoint ('user.login') or blueprint ('order'), as a dict or
+    as the 'user.login=10/minute,order=120/minute' form used in the environment.
+    """
+    if isinstance(rules, str):
+        pairs = [part.split('=', 1) for part in rules.split(',') if part.strip()]
+        if any(len(pair) != 2 for pair in pairs):
+            raise ValueError(f"Invalid RATE_LIMITS '{rules}', expected name=rate pairs")
+        rules = {name.strip(): rate for name, rate in pairs}
+    return {name: parse_rate(rate) for name, rate in (rules or {}).items()}
+
+class MemoryBackend:
+    """Buckets in this process only; each worker enforces the limits on its own"""
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated, seconds to refill completely)
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def take(self, key, rate, now):
+        """Take one token from key's bucket; returns (allowed, tokens left)"""
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (rate.capacity, now, 0))
+            tokens = min(rate.capacity, tokens + (now - updated) * rate.per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, rate.period)
+            self._takes += 1
+            if self._takes % PRUNE_EVERY == 0:
+                # A bucket idle for a whole period is full again, the same as no entry
+                self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < v[2]}
+            return allowed, tokens
+
+class SQLiteBackend:
+    """
+    Buckets in a SQLite file shared by every worker on the host.
+
+    Each take is one short BEGIN IMMEDIATE transaction, so workers see each
+    other's requests. The data is disposable, so it is written without fsync.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_limit_buckets '
+                         '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, expires REAL NOT NULL)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, rate, now):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (rate.capacity, now)
+            tokens = min(rate.capacity, tokens + (now - updated) * rate.per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute('INSERT INTO rate_limit_buckets (key, tokens, updated, expires) VALUES (?, ?, ?, ?) '
+                         'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, '
+                         'expires = excluded.expires', (key, tokens, now, now + rate.period))
+            self._takes += 1
+            if self._takes % PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM rate_limit_buckets WHERE expires < ?', (now,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, tokens
+
+def create_backend(storage, app):
+    """'memory', 'sqlite' (instance/rate_limits.db) or 'sqlite:///path/to/file.db'"""
+    if storage == 'memory':
+        return MemoryBackend()
+    if storage == 'sqlite':
+        os.makedirs(app.instance_path, exist_ok=True)
+        return SQLiteBackend(os.path.join(app.instance_path, 'rate_limits.db'))
+    if storage.startswith('sqlite:///'):
+        return SQLiteBackend(storage[len('sqlite:///'):])
+    raise ValueError(f"Unknown RATE_LIMIT_STORAGE '{storage}'")
+
+class RateLimiter:
+    """
+    Token-bucket rate limits per client and a cap on requests in flight.
+
+    A client is the user id from a valid JWT, else the remote address. The
+    rule for a request is the first of its endpoint's, its blueprint's and
+    RATE_LIMIT_DEFAULT; 'off' exempts it. Limited responses carry
+    RateLimit-Limit/-Remaining/-Reset and rejections also Retry-After.
+
+    The in-flight cap (RATE_LIMIT_MAX_CONCURRENT, by default the database
+    pool size plus overflow) answers 503 at once rather than letting requests
+    queue for a connection. Any backend with take(key, rate, now) can be
+    assigned to .backend.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.backend = None
+        self.default = None
+        self.rules = {}
+        self.max_concurrent = 0
+        self._slots = None
+        self._resolved = {}  # endpoint -> (scope, Rate or None)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['rate_limiter'] = self
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        if not self.enabled:
+            return
+        self.default = parse_rate(app.config.get('RATE_LIMIT_DEFAULT', OFF))
+        self.rules = parse_rules(app.config.get('RATE_LIMITS'))
+        self.backend = create_backend(app.config.get('RATE_LIMIT_STORAGE', 'memory'), app)
+        self._resolved = {}
+
+        self.max_concurrent = app.config.get('RATE_LIMIT_MAX_CONCURRENT')
+        if self.max_concurrent is None:
+            pool = app.extensions.get('db_profile', {}).get('pool', {})
+            self.max_concurrent = pool.get('pool_size', 0) + max(pool.get('max_overflow', 0), 0)
+        self._slots = threading.BoundedSemaphore(self.max_concurrent) if self.max_concurrent > 0 else None
+
+        app.before_request(self._admit)
+        app.after_request(self._add_headers)
+        app.teardown_request(self._release)
+
+    def rule_for(self, endpoint):
+        """(bucket scope, Rate or None) for an endpoint"""
+        if endpoint not in self._resolved:
+            blueprint = endpoint.rsplit('.', 1)[0] if endpoint and '.' in endpoint else None
+            if endpoint in self.rules:
+                self._resolved[endpoint] = (endpoint, self.rules[endpoint])
+            elif blueprint in self.rules:
+                self._resolved[endpoint] = (blueprint, self.rules[blueprint])
+            else:
+                self._resolved[endpoint] = ('default', self.default)
+        return self._resolved[endpoint]
+
+    @staticmethod
+    def client_key():
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            identity = None  # Invalid or expired tokens are rejected by the view itself
+        return f'user:{identity}' if identity is not None else f'ip:{request.remote_addr}'
+
+    def _admit(self):
+        if request.method == 'OPTIONS':
+            return None
+        scope, rate = self.rule_for(request.endpoint)
+        if rate is None:
+            return None
+
+        if self._slots is not None:
+            if not self._slots.acquire(blocking=False):
+                response = jsonify({'error': 'Server is busy, please retry shortly'})
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            g.rate_limit_slot = True
+
+        now = time.time()
+        try:
+            allowed, tokens = self.backend.take(f'{scope}|{self.client_key()}', rate, now)
+        except Exception as e:
+            logging.error(f'Rate limit backend error, letting the request through: {str(e)}')
+            return None
+        g.rate_limit = (rate, tokens)
+        if not allowed:
+            retry_after = math.ceil((1 - tokens) / rate.per_second)
+            response = jsonify({'error': f'Too many requests, retry in {retry_after} seconds'})
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 429
+        return None
+
+    @staticmethod
+    def _add_headers(response):
+        if 'rate_limit' in g:
+            rate, tokens = g.rate_limit
+            response.headers['RateLimit-Limit'] = str(rate.capacity)
+            response.headers['RateLimit-Remaining'] = str(int(tokens))
+            response.headers['RateLimit-Reset'] = str(math.ceil((rate.capacity - tokens) / rate.per_second))
+        return response
+
+    def _release(self, exc):
+        if g.pop('rate_limit_slot', False):
+            self._slots.release()
@@ -0,0 +1,317 @@
+import math
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert, bindparam, func, select, text
+from app import db, password_hasher
+from app.models.user import User, UserRole, UserStatus
+from app.models.product import Product
+from app.models.inventory import Inventory
+from app.models.quotation import Quotation, QuotationItem, QuotationStatus
+from app.models.order import Order, OrderItem, OrderStatus
+from app.utils import counters, product_search, stock_index
+
+BATCH_SIZE = 20000
+HISTORY_DAYS = 365
+SUPPLIER_PASSWORD = 'password123'
+EMAIL_DOMAIN = 'seed.techfix.test'
+
+# Category -> (product types, median unit price)
+CATALOG = {
+    'Laptops': (['Ultrabook', 'Workstation', 'Chromebook', 'Gaming Laptop'], 950.0),
+    'Storage': (['NVMe SSD', 'SATA SSD', 'Hard Drive', 'USB Flash Drive'], 90.0),
+    'Memory': (['DDR4 Module', 'DDR5 Module', 'SO-DIMM Kit'], 70.0),
+    'Networking': (['Router', 'Switch', 'Access Point', 'Network Card'], 120.0),
+    'Peripherals': (['Keyboard', 'Mouse', 'Webcam', 'Headset'], 45.0),
+    'Displays': (['Monitor', 'Portable Display', 'Projector'], 260.0),
+    'Power': (['Power Supply', 'UPS', 'Laptop Charger', 'Surge Protector'], 80.0),
+    'Components': (['Motherboard', 'Graphics Card', 'CPU Cooler', 'Case Fan'], 150.0)
+}
+MANUFACTURERS = ['Asus', 'Dell', 'HP', 'Lenovo', 'Samsung', 'Kingston', 'Corsair', 'Logitech',
+                 'Netgear', 'TP-Link', 'Seagate', 'Western Digital', 'Crucial', 'MSI', 'APC', 'Acer']
+SERIES = ['Pro', 'Elite', 'Core', 'Max', 'Lite', 'Plus', 'Prime', 'Edge', 'Flex', 'Ultra']
+CITIES = ['Colombo', 'Kandy', 'Galle', 'Jaffna', 'Negombo', 'Matara', 'Kurunegala', 'Batticaloa']
+COMPANY_WORDS = ['Tech', 'Micro', 'Data', 'Net', 'Digital', 'Circuit', 'Systems', 'Parts', 'Supply', 'Link']
+
+QUOTATION_STATUS_WEIGHTS = {
+    QuotationStatus.PENDING: 0.15,
+    QuotationStatus.ACCEPTED: 0.65,
+    QuotationStatus.DECLINED: 0.20
+}
+# Orders exist for accepted quotations only, as approve_quotation creates them
+ORDER_STATUS_WEIGHTS = {
+    OrderStatus.PENDING: 0.08,
+    OrderStatus.CONFIRMED: 0.10,
+    OrderStatus.SHIPPED: 0.15,
+    OrderStatus.COMPLETED: 0.57,
+    OrderStatus.CANCELLED: 0.10
+}
+
+class SnapshotError(Exception):
+    """Raised when snapshots are requested for a database that is not SQLite"""
+
+# Column order of the row tuples each _seed_* helper produces. Column defaults
+# are not applied on the bulk path, so every column with one is listed.
+COLUMNS = {
+    User: ('id', 'name', 'email', 'contact_number', 'address', 'password_hash', 'role', 'status', 'token_version'),
+    Product: ('id', 'name', 'description', 'manufacturer', 'part_number', 'category', 'image',
+              'created_at', 'updated_at'),
+    Inventory: ('supplier_id', 'product_id', 'quantity', 'created_at', 'updated_at'),
+    Quotation: ('id', 'admin_user_id', 'supplier_user_id', 'quotation_date', 'status', 'created_at', 'updated_at'),
+    QuotationItem: ('quotation_id', 'product_id', 'qty', 'price', 'created_at', 'updated_at'),
+    Order: ('id', 'quotation_id', 'order_date', 'status', 'created_at', 'updated_at'),
+    OrderItem: ('order_id', 'product_id', 'qty', 'price', 'created_at', 'updated_at')
+}
+
+class _Writer:
+    """
+    Buffers row tuples per model and writes them as DBAPI executemany batches on one connection.
+
+    Each INSERT is compiled once and only columns whose type needs a bind
+    processor (dates, enums, floats) are converted, column by column.
+    Going through Connection.execute instead spends more time building
+    parameters than SQLite spends storing the rows.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.pending = {}
+        self.statements = {}
+        self.counts = {}
+
+    def add(self, model, row):
+        rows = self.pending.setdefault(model, [])
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        # Models flush in the order they were first added, so parents land before children
+        for model, rows in self.pending.items():
+            if rows:
+                self._execute(model, rows)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+                self.pending[model] = []
+
+    def _statement(self, model):
+        if model not in self.statements:
+            dialect = self.conn.dialect
+            table = model.__table__
+            keys = COLUMNS[model]
+            compiled = insert(table).values({key: bindparam(key) for key in keys}).compile(dialect=dialect)
+            names = compiled.positiontup if compiled.positional else list(compiled.params)
+            missing = set(names) - set(keys)
+            if missing:
+                raise ValueError(f'COLUMNS[{model.__name__}] must include {", ".join(sorted(missing))}')
+            processors = [(index, process) for index, process in (
+                (index, table.c[key].type.dialect_impl(dialect).bind_processor(dialect))
+                for index, key in enumerate(keys)) if process is not None]
+            order = [keys.index(name) for name in names] if compiled.positional else None
+            self.statements[model] = (str(compiled), keys, order, processors)
+        return self.statements[model]
+
+    def _execute(self, model, rows):
+        sql, keys, order, processors = self._statement(model)
+        columns = list(zip(*rows))
+        for index, process in processors:
+            columns[index] = _convert(columns[index], process)
+        if order is None:
+            params = [dict(zip(keys, row)) for row in zip(*columns)]
+        else:
+            params = list(zip(*(columns[index] for index in order)))
+        cursor = self.conn.connection.cursor()
+        try:
+            cursor.executemany(sql, params)
+        finally:
+            cursor.close()
+
+def _convert(values, process):
+    # Line items share their parent's datetime objects, so consecutive repeats are converted once
+    result, last, converted = [], object(), None
+    for value in values:
+        if value is not last:
+            last = value
+            converted = None if value is None else process(value)
+        result.append(converted)
+    return result
+
+def _next_id(conn, model):
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _cumulative(weights):
+    total, running, result = sum(weights), 0.0, []
+    for weight in weights:
+        running += weight
+        result.append(running / total)
+    return result
+
+def _past(rng, now):
+    # Triangular with its mode at now: recent months are busier than last year
+    return now - timedelta(seconds=int(HISTORY_DAYS * 86400 * (1 - rng.triangular(0, 1, 1))))
+
+def _pick(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _seed_users(rng, writer, conn, suppliers):
+    admin_id = conn.execute(select(User.id).where(User.role == UserRole.ADMIN).order_by(User.id)).scalar()
+    next_id = _next_id(conn, User)
+    if admin_id is None:
+        admin_id, next_id = next_id, next_id + 1
+        config = current_app.config
+        writer.add(User, (admin_id, config['ADMIN_NAME'], config['ADMIN_EMAIL'], None, None,
+                          password_hasher.hash(config['ADMIN_PASSWORD']), UserRole.ADMIN, UserStatus.ACTIVE, 1))
+
+    password_hash = password_hasher.hash(SUPPLIER_PASSWORD)  # Hashing once keeps large runs fast
+    supplier_ids = list(range(next_id, next_id + suppliers))
+    for user_id in supplier_ids:
+        writer.add(User, (
+            user_id,
+            f'{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_WORDS).lower()} {user_id}',
+            f'supplier{user_id}@{EMAIL_DOMAIN}',
+            f'07{rng.randrange(10)}{rng.randrange(1000000, 9999999)}',
+            f'{rng.randrange(1, 500)} Main Street, {rng.choice(CITIES)}',
+            password_hash,
+            UserRole.SUPPLIER,
+            UserStatus.BLOCKED if rng.random() < 0.03 else UserStatus.ACTIVE,
+            1
+        ))
+    writer.flush()
+    return admin_id, supplier_ids
+
+def _seed_products(rng, writer, conn, products, now):
+    first_id = _next_id(conn, Product)
+    product_ids, base_prices = [], []
+    categories = list(CATALOG)
+    for product_id in range(first_id, first_id + products):
+        category = rng.choice(categories)
+        kinds, median_price = CATALOG[category]
+        kind, manufacturer, series = rng.choice(kinds), rng.choice(MANUFACTURERS), rng.choice(SERIES)
+        model_number = rng.randrange(100, 9999)
+        created = _past(rng, now) - timedelta(days=HISTORY_DAYS)
+        writer.add(Product, (
+            product_id,
+            f'{manufacturer} {series} {kind} {model_number}',
+            f'{kind} from the {manufacturer} {series} range, model {model_number}.',
+            manufacturer,
+            f'SEED-{product_id:08d}',
+            category,
+            None,
+            created,
+            created
+        ))
+        product_ids.append(product_id)
+        base_prices.append(round(rng.lognormvariate(math.log(median_price), 0.6), 2))
+    writer.flush()
+    return product_ids, base_prices
+
+def _seed_inventory(rng, writer, supplier_ids, product_ids, now):
+    for supplier_id in supplier_ids:
+        # Most suppliers carry a narrow range, a few carry a large share of the catalogue
+        stocked = min(len(product_ids), max(1, int(rng.lognormvariate(math.log(40), 1.0))))
+        for product_id in rng.sample(product_ids, stocked):
+            created = _past(rng, now)
+            quantity = 0 if rng.random() < 0.08 else int(rng.lognormvariate(math.log(25), 1.1)) + 1
+            writer.add(Inventory, (supplier_id, product_id, quantity, created, created))
+    writer.flush()
+
+def _seed_quotations(rng, writer, conn, admin_id, supplier_ids, product_ids, base_prices,
+                     quotations, items_per_quotation, now):
+    # Product demand is Zipf-like and supplier activity Pareto-like: a few of each dominate
+    product_weights = _cumulative([1 / rank ** 1.1 for rank in range(1, len(product_ids) + 1)])
+    ranked = list(range(len(product_ids)))
+    rng.shuffle(ranked)
+    supplier_weights = _cumulative([rng.paretovariate(1.2) for _ in supplier_ids])
+    quotation_id = _next_id(conn, Quotation)
+    order_id = _next_id(conn, Order)
+    items_mu, qty_mu = math.log(items_per_quotation), math.log(4)
+
+    for _ in range(quotations):
+        supplier_id = rng.choices(supplier_ids, cum_weights=supplier_weights)[0]
+        created = _past(rng, now)
+        status = _pick(rng, QUOTATION_STATUS_WEIGHTS)
+        decided = created if status == QuotationStatus.PENDING else \
+            min(now, created + timedelta(seconds=int(rng.expovariate(1 / 30) * 3600)))
+        writer.add(Quotation, (quotation_id, admin_id, supplier_id, created, status, created, decided))
+
+        count = max(1, round(rng.lognormvariate(items_mu, 0.5)))
+        lines = []
+        for index in sorted(set(rng.choices(ranked, cum_weights=product_weights, k=count))):
+            line = (product_ids[index], max(1, int(rng.lognormvariate(qty_mu, 0.9))),
+                    round(base_prices[index] * rng.uniform(0.85, 1.15), 2))
+            lines.append(line)
+            writer.add(QuotationItem, (quotation_id, *line, created, created))
+
+        if status == QuotationStatus.ACCEPTED:
+            order_status = _pick(rng, ORDER_STATUS_WEIGHTS)
+            updated = decided if order_status == OrderStatus.PENDING else \
+                min(now, decided + timedelta(seconds=int(rng.expovariate(1 / 4) * 86400)))
+            writer.add(Order, (order_id, quotation_id, decided, order_status, decided, updated))
+            for line in lines:
+                writer.add(OrderItem, (order_id, *line, decided, decided))
+            order_id += 1
+        quotation_id += 1
+
+def reset_database():
+    """Drop and recreate every table, including the search index"""
+    db.session.execute(text(f'DROP TABLE IF EXISTS {product_search.FTS_TABLE}'))
+    db.session.commit()
+    product_search.forget_index_state()
+    db.drop_all()
+    db.create_all()
+
+def generate(suppliers=50, products=2000, quotations=20000, items_per_quotation=4, seed=42):
+    """
+    Bulk-insert a synthetic dataset on top of whatever the database holds.
+
+    The same seed and sizes always produce the same rows on a given day
+    (timestamps count back from midnight UTC), password salts aside.
+    Suppliers share the password SUPPLIER_PASSWORD; an admin is created from
+    the config if none exists. Returns the number of rows inserted per table.
+    """
+    rng = random.Random(seed)
+    # Timestamps are relative to midnight today so the history always ends now
+    now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    with db.engine.begin() as conn:
+        writer = _Writer(conn)
+        admin_id, supplier_ids = _seed_users(rng, writer, conn, suppliers)
+        product_ids, base_prices = _seed_products(rng, writer, conn, products, now)
+        _seed_inventory(rng, writer, supplier_ids, product_ids, now)
+        _seed_quotations(rng, writer, conn, admin_id, supplier_ids, product_ids, base_prices,
+                         quotations, items_per_quotation, now)
+        writer.flush()
+
+    product_search.rebuild_index()
+    counters.rebuild()  # The bulk inserts above bypass the dashboard counters and the stock index
+    stock_index.rebuild()
+    return writer.counts
+
+def _sqlite_connection():
+    if db.engine.dialect.name != 'sqlite':
+        raise SnapshotError('Snapshots are only supported for SQLite databases')
+    return db.engine.raw_connection()
+
+def save_snapshot(path):
+    """Copy the whole database to path with SQLite's online backup API"""
+    db.session.commit()
+    raw = _sqlite_connection()
+    target = sqlite3.connect(path)
+    try:
+        raw.driver_connection.backup(target)
+    finally:
+        target.close()
+        raw.close()
+
+def load_snapshot(path):
+    """Replace the database contents with a file written by save_snapshot"""
+    db.session.remove()
+    raw = _sqlite_connection()
+    source = sqlite3.connect(path)
+    try:
+        source.backup(raw.driver_connection)
+    finally:
+        source.close()
+        raw.close()
+    db.engine.dispose()
+    product_search.forget_index_state()
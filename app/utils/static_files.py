@@ -0,0 +1,151 @@
+import os
+import re
+import hashlib
+import logging
+import mimetypes
+import threading
+from flask import request, send_file, abort
+
+# Encodings we look for next to each file, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# name.<hex digest>.ext, as written by the asset build
+FINGERPRINT_RE = re.compile(r'\.[0-9a-f]{8,}\.\w+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+INDEX_FILE = 'index.html'
+NOT_FOUND_FILE = '404.html'
+
+class StaticManifest:
+    """
+    Map of every file under the static folder, built once at startup.
+
+    Each entry records the file's strong ETag (a content hash), its mimetype
+    and any precompressed .br/.gz siblings, so serving a request is a dict
+    lookup plus send_file. Unknown paths fall back to index.html (or 404.html
+    for .html and api/ paths) without touching the filesystem.
+
+    With auto_reload, an edited file is re-hashed when next requested and the
+    folder is rescanned once a directory's mtime shows files added or removed.
+    """
+
+    def __init__(self, app=None):
+        self.root = None
+        self.auto_reload = False
+        self._entries = {}
+        self._dir_mtimes = {}  # directory -> st_mtime_ns when last scanned; changes when files are added or removed
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.root = app.config.get('STATIC_ROOT') or os.path.join(os.path.dirname(app.root_path), 'static')
+        self.auto_reload = app.config.get('STATIC_AUTO_RELOAD', app.debug)
+        app.extensions['static_manifest'] = self
+        self.build()
+
+    def build(self):
+        """Scan the static folder and replace the manifest"""
+        with self._lock:
+            self._build()
+
+    def _build(self):
+        entries = {}
+        dir_mtimes = {self.root: self._dir_mtime(self.root)}
+        for dirpath, _, filenames in os.walk(self.root):
+            dir_mtimes[dirpath] = self._dir_mtime(dirpath)
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                if path.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                    continue
+                entries[path] = self._entry(path, full_path)
+        # Replaced, never mutated, so lookups without the lock always see a complete manifest
+        self._entries = entries
+        self._dir_mtimes = dir_mtimes
+        logging.info(f'Static manifest built with {len(entries)} files from {self.root}')
+
+    @staticmethod
+    def _dir_mtime(dirpath):
+        try:
+            return os.stat(dirpath).st_mtime_ns
+        except OSError:
+            return None
+
+    def _tree_changed(self):
+        return any(self._dir_mtime(dirpath) != mtime for dirpath, mtime in self._dir_mtimes.items())
+
+    def _entry(self, path, full_path):
+        digest = hashlib.sha256()
+        with open(full_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        return {
+            'path': full_path,
+            'etag': digest.hexdigest()[:32],
+            'mtime': os.path.getmtime(full_path),
+            'mimetype': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            'fingerprinted': bool(FINGERPRINT_RE.search(path)),
+            'encoded': {encoding: full_path + suffix for encoding, suffix in ENCODINGS
+                        if os.path.exists(full_path + suffix)}
+        }
+
+    def lookup(self, path):
+        """Manifest entry for path, or None if the file is not in the static folder"""
+        entry = self._entries.get(path)
+        if not self.auto_reload:
+            return entry
+        # An unknown path (SPA route, 404 probe) only rescans once a directory shows a file added or removed
+        if entry is None and not self._tree_changed() or entry is not None and self._is_current(entry):
+            return entry
+        return self._reload(path)
+
+    def _reload(self, path):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and self._is_current(entry):
+                return entry  # Another request reloaded it while this one waited
+            if entry is not None and os.path.exists(entry['path']):
+                entry = self._entry(path, entry['path'])
+                self._entries = {**self._entries, path: entry}
+                return entry
+            if self._tree_changed():
+                self._build()
+            return self._entries.get(path)
+
+    @staticmethod
+    def _is_current(entry):
+        try:
+            return os.path.getmtime(entry['path']) == entry['mtime']
+        except OSError:
+            return False
+
+    def serve(self, path):
+        """Serve path from the manifest, falling back to the SPA entry points"""
+        entry = self.lookup(path or INDEX_FILE)
+        if entry is not None:
+            return self._send(entry)
+        if path.endswith('.html') or path.startswith('api/'):
+            not_found = self.lookup(NOT_FOUND_FILE)
+            if not_found is None:
+                abort(404)
+            return self._send(not_found), 404
+        index = self.lookup(INDEX_FILE)
+        if index is None:
+            abort(404)
+        return self._send(index)
+
+    def _send(self, entry):
+        encoding = next((e for e in entry['encoded'] if request.accept_encodings[e] > 0), None)
+        file_path = entry['encoded'][encoding] if encoding else entry['path']
+        etag = f"{entry['etag']}-{encoding}" if encoding else entry['etag']
+
+        if entry['fingerprinted']:
+            response = send_file(file_path, mimetype=entry['mimetype'], etag=etag, max_age=IMMUTABLE_MAX_AGE)
+            response.cache_control.immutable = True
+        else:
+            # Unversioned names must be revalidated, which the strong ETag makes cheap
+            response = send_file(file_path, mimetype=entry['mimetype'], etag=etag)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if entry['encoded']:
+            response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,54 @@
+from datetime import datetime
+from sqlalchemy import delete, func, insert, literal, select
+from app import db
+from app.models.inventory import Inventory
+from app.models.product import Product
+from app.models.product_stock import ProductStock
+from app.utils.database import increment_upsert
+
+def record(changes):
+    """
+    Apply (product_id, old_quantity, new_quantity) inventory row changes.
+
+    old_quantity is 0 for a new row. Runs in the caller's transaction as one
+    executemany, however many products changed.
+    """
+    deltas = {}
+    for product_id, old, new in changes:
+        quantity, suppliers = deltas.get(product_id, (0, 0))
+        deltas[product_id] = (quantity + new - old, suppliers + (new > 0) - (old > 0))
+    now = datetime.utcnow()
+    rows = [{'product_id': product_id, 'total_quantity': quantity, 'supplier_count': suppliers, 'updated_at': now}
+            for product_id, (quantity, suppliers) in deltas.items() if quantity or suppliers]
+    if rows:
+        db.session.execute(increment_upsert(ProductStock, ['product_id'], ['total_quantity', 'supplier_count']), rows)
+
+def add_product(product_id):
+    """Give a new product its empty row; runs in the caller's transaction"""
+    db.session.execute(insert(ProductStock).values(
+        product_id=product_id, total_quantity=0, supplier_count=0, updated_at=datetime.utcnow()
+    ))
+
+def remove_product(product_id):
+    """Drop one product's row; runs in the caller's transaction"""
+    db.session.execute(delete(ProductStock).where(ProductStock.product_id == product_id))
+
+def rebuild():
+    """Recompute every product's row from the inventory table and commit. Returns the number of products"""
+    db.session.execute(delete(ProductStock))
+    stock = (select(Inventory.product_id,
+                    func.sum(Inventory.quantity).label('total_quantity'),
+                    func.count().label('supplier_count'))
+             .where(Inventory.quantity > 0)
+             .group_by(Inventory.product_id)
+             .subquery())
+    result = db.session.execute(insert(ProductStock).from_select(
+        ['product_id', 'total_quantity', 'supplier_count', 'updated_at'],
+        select(Product.id,
+               func.coalesce(stock.c.total_quantity, 0),
+               func.coalesce(stock.c.supplier_count, 0),
+               literal(datetime.utcnow(), db.DateTime))
+        .outerjoin(stock, stock.c.product_id == Product.id)
+    ))
+    db.session.commit()
+    return result.rowcount
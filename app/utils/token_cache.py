@@ -0,0 +1,144 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from sqlalchemy import event
+
+DEFAULT_TOKEN_VERSION = 1
+PENDING_VERSIONS_KEY = 'pending_token_versions'
+PENDING_DELETIONS_KEY = 'pending_user_deletions'
+
+class RevokedTokenCache:
+    """
+    Process-local copy of the revoked JWT ids in token_blacklist, of
+    users.token_version for every user whose tokens have been invalidated and
+    of the deleted_users tombstones.
+
+    Lookups are dict membership tests. Other workers learn about revocations
+    through a signal file that is replaced on every change; its inode/mtime is
+    stat()ed at most once per sync interval, and only a change triggers a reload
+    from the database.
+    """
+
+    def __init__(self, app=None):
+        self._jtis = {}  # jti -> expires_at
+        self._versions = {}  # user_id -> token_version, only for users above the default
+        self._deleted = {}  # user_id -> deletion time as a UTC timestamp, comparable with a JWT's iat
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._signal_state = None
+        self._next_check = 0.0
+        self.signal_file = None
+        self.sync_interval = 1.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.signal_file = (app.config.get('REVOKED_TOKEN_SIGNAL_FILE') or
+                            os.path.join(app.instance_path, 'revoked_tokens.signal'))
+        self.sync_interval = app.config.get('REVOKED_TOKEN_SYNC_INTERVAL', 1.0)
+        # Entries from an app initialised earlier in this process belong to another database
+        self._loaded = False
+        app.extensions['revoked_token_cache'] = self
+
+        from app import db
+        if not event.contains(db.session, 'after_commit', self._apply_committed_versions):
+            event.listen(db.session, 'after_commit', self._apply_committed_versions)
+            event.listen(db.session, 'after_rollback', self._drop_pending_versions)
+
+    def is_revoked(self, jti):
+        """Check a jti against the cache, reloading first if another worker changed it"""
+        self._sync()
+        return jti in self._jtis
+
+    def is_stale(self, user_id, token_version, issued_at):
+        """Check whether a token was issued before the user's tokens were last invalidated or the user was deleted"""
+        self._sync()
+        deleted_at = self._deleted.get(user_id)
+        if deleted_at is not None and issued_at <= deleted_at:
+            return True
+        return token_version < self._versions.get(user_id, DEFAULT_TOKEN_VERSION)
+
+    def reload(self):
+        """Replace the cache with every unexpired row in token_blacklist and deleted_users and every bumped token_version"""
+        from app import db
+        from app.models.user import DeletedUser, TokenBlacklist, User
+        from app.utils.query_tracker import untracked
+
+        with self._lock, untracked():
+            state = self._read_signal()
+            rows = db.session.query(TokenBlacklist.jti, TokenBlacklist.expires_at).filter(
+                TokenBlacklist.expires_at > datetime.utcnow()
+            ).all()
+            versions = db.session.query(User.id, User.token_version).filter(
+                User.token_version > DEFAULT_TOKEN_VERSION
+            ).all()
+            deleted = db.session.query(DeletedUser.user_id, DeletedUser.deleted_at).filter(
+                DeletedUser.expires_at > datetime.utcnow()
+            ).all()
+            self._jtis = dict(rows)
+            self._versions = dict(versions)
+            self._deleted = {user_id: _timestamp(deleted_at) for user_id, deleted_at in deleted}
+            self._signal_state = state
+            self._loaded = True
+            self._next_check = time.monotonic() + self.sync_interval
+        logging.info(f'Revoked token cache loaded with {len(rows)} entries')
+
+    def add(self, jti, expires_at):
+        """Record a newly revoked token; call after the blacklist row is committed"""
+        self._jtis[jti] = expires_at
+        self._signal()
+
+    @staticmethod
+    def stage_version(session, user_id, token_version):
+        """Remember a token_version bump until the session commits"""
+        session.info.setdefault(PENDING_VERSIONS_KEY, {})[user_id] = token_version
+
+    @staticmethod
+    def stage_deletion(session, user_id, deleted_at):
+        """Remember a user's deletion (a naive UTC datetime) until the session commits"""
+        session.info.setdefault(PENDING_DELETIONS_KEY, {})[user_id] = _timestamp(deleted_at)
+
+    def _apply_committed_versions(self, session):
+        versions = session.info.pop(PENDING_VERSIONS_KEY, None)
+        deletions = session.info.pop(PENDING_DELETIONS_KEY, None)
+        if versions:
+            self._versions.update(versions)
+        if deletions:
+            self._deleted.update(deletions)
+        if versions or deletions:
+            self._signal()
+
+    def _drop_pending_versions(self, session):
+        session.info.pop(PENDING_VERSIONS_KEY, None)
+        session.info.pop(PENDING_DELETIONS_KEY, None)
+
+    def _sync(self):
+        now = time.monotonic()
+        if self._loaded and now < self._next_check:
+            return
+        self._next_check = now + self.sync_interval
+        if not self._loaded or self._read_signal() != self._signal_state:
+            self.reload()
+
+    def _read_signal(self):
+        try:
+            st = os.stat(self.signal_file)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _signal(self):
+        # Replace rather than rewrite so the inode changes even on coarse-mtime filesystems
+        tmp_path = f'{self.signal_file}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.signal_file), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                f.write(str(time.time_ns()))
+            os.replace(tmp_path, self.signal_file)
+        except OSError as e:
+            logging.error(f'Could not write revoked token signal file: {str(e)}')
+
+def _timestamp(utc_datetime):
+    return utc_datetime.replace(tzinfo=timezone.utc).timestamp()
@@ -0,0 +1,166 @@
+import os
+import re
+import hashlib
+import logging
+import tempfile
+from flask import current_app, send_from_directory
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.product import Product
+from app.models.upload_blob import UploadBlob
+from app.utils import images
+
+OBJECTS_DIR = 'objects'
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# objects/ab/cd/<sha256>.<ext> and the variants derived from it
+_BLOB_RE = re.compile(r'^objects/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.\w+$')
+_VARIANT_RE = re.compile(r'^variants/objects/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})/(\w+)\.\w+$')
+
+def blob_path(digest, ext):
+    """Product.image value for a blob; the digest is sharded two levels deep"""
+    return f'uploads/{OBJECTS_DIR}/{digest[:2]}/{digest[2:4]}/{digest}.{ext}'
+
+def _absolute(image):
+    return os.path.join(images.upload_root(current_app), images._relative(image))
+
+def store(file):
+    """
+    Hash an uploaded file into content-addressed storage and take a reference to it.
+
+    Identical bytes are written once; a repeat upload only bumps ref_count.
+    The reference is taken in the caller's transaction. Returns the path to
+    record in Product.image.
+    """
+    root = images.upload_root(current_app)
+    os.makedirs(root, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=root, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+                out.write(chunk)
+        digest = digest.hexdigest()
+
+        blob = _acquire(digest, file.filename, size)
+        target = _absolute(blob.path)
+        if os.path.exists(target):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+            logging.info(f'Stored new upload blob {blob.path}')
+        return blob.path
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _acquire(digest, filename, size):
+    blob = UploadBlob.query.get(digest)
+    if blob is None:
+        ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else 'bin'
+        try:
+            # Savepoint so a concurrent insert of the same digest doesn't undo the caller's work
+            with db.session.begin_nested():
+                blob = UploadBlob(digest=digest, path=blob_path(digest, ext), size=size, ref_count=1)
+                db.session.add(blob)
+            return blob
+        except IntegrityError:
+            blob = UploadBlob.query.get(digest)
+    UploadBlob.query.filter_by(digest=digest).update(
+        {'ref_count': UploadBlob.ref_count + 1}, synchronize_session='fetch'
+    )
+    return blob
+
+def release(image):
+    """Drop one reference to image in the caller's transaction; call sweep() after commit"""
+    if not image:
+        return
+    UploadBlob.query.filter(UploadBlob.path == image, UploadBlob.ref_count > 0).update(
+        {'ref_count': UploadBlob.ref_count - 1}, synchronize_session=False
+    )
+
+def sweep(image):
+    """
+    Delete image and its variants once nothing references it any more.
+
+    Pre-hashing uploads have no blob row; those are removed when no product
+    points at them.
+    """
+    if not image:
+        return
+    if _BLOB_RE.match(images._relative(image)):
+        deleted = UploadBlob.query.filter_by(path=image, ref_count=0).delete(synchronize_session=False)
+    else:
+        deleted = int(Product.query.filter_by(image=image).first() is None)
+    if not deleted:
+        return
+    images.discard_variants(image)
+    db.session.commit()
+    try:
+        os.remove(_absolute(image))
+        logging.info(f'Removed unreferenced upload {image}')
+    except FileNotFoundError:
+        pass
+
+def send_upload(filename):
+    """
+    Serve a file from the uploads folder.
+
+    Content-addressed blobs and their variants never change, so they get a
+    strong digest ETag and a year-long immutable Cache-Control. Range and
+    conditional requests are handled by send_file.
+    """
+    root = images.upload_root(current_app)
+    blob = _BLOB_RE.match(filename)
+    variant = _VARIANT_RE.match(filename)
+    if blob:
+        etag = blob.group(1)
+    elif variant:
+        etag = f'{variant.group(1)}-{os.path.basename(filename)}'
+    else:
+        return send_from_directory(root, filename)
+
+    response = send_from_directory(root, filename, etag=etag, max_age=IMMUTABLE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+def migrate_legacy():
+    """
+    Move every product image stored under its upload name into content-addressed storage.
+
+    Returns (migrated, missing): the number of distinct files moved and the
+    image paths whose files could not be found.
+    """
+    legacy = [image for (image,) in db.session.query(Product.image).filter(Product.image.isnot(None)).distinct()
+              if not _BLOB_RE.match(images._relative(image))]
+    migrated, missing = 0, []
+    for image in legacy:
+        source = _absolute(image)
+        if not os.path.exists(source):
+            missing.append(image)
+            continue
+        references = Product.query.filter_by(image=image).count()
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        blob = _acquire(digest, image, os.path.getsize(source))
+        blob.ref_count += references - 1
+        target = _absolute(blob.path)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(source, target)
+        Product.query.filter_by(image=image).update({'image': blob.path}, synchronize_session=False)
+        images.discard_variants(image)
+        db.session.commit()
+        if os.path.exists(source):
+            os.remove(source)  # Duplicate bytes already stored under another upload
+        migrated += 1
+    return migrated, missing
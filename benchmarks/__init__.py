@@ -0,0 +1,28 @@
+"""
+Microbenchmarks for the API's hot paths, timed in isolation.
+
+Each case runs against fresh in-memory databases built by app.utils.seed at
+increasing sizes. Results are JSON (see harness.run) and are compared by
+median against a stored baseline:
+
+    flask bench                        # run, save build/benchmarks.json, compare with the baseline
+    flask bench -k serialize           # only cases whose name contains 'serialize'
+    flask bench --save-baseline        # record benchmarks/baseline.json to commit
+
+Timings only compare meaningfully on the same machine; record the baseline
+where the comparison will run.
+
+benchmarks.load drives a running server over HTTP instead. Virtual users
+(threads with keep-alive connections) replay the admin and supplier
+dashboard workflows while the user count follows a ramp schedule, so the
+per-stage throughput and latency show where the server saturates:
+
+    flask seed --reset && RATE_LIMIT_ENABLED=false python start.py   # in one shell
+    flask loadtest --stages 5:30,20:60,50:60                          # in another, same config
+
+Every virtual user logs in from the same address, so run the server with
+rate limiting off or the login limit turns most of the run into 429s.
+"""
+from benchmarks import cases
+from benchmarks.datasets import seeded_dataset
+from benchmarks.harness import run, compare, load_results, save_results, registered_cases
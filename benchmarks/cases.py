@@ -0,0 +1,115 @@
+from sqlalchemy import insert
+from app import db
+from app.models.order import Order
+from app.models.quotation import Quotation, QuotationItem, QuotationStatus
+from app.controllers.inventory_controller import InventoryController
+from app.controllers.quotation_controller import _validate_items, create_quotation, approve_quotation
+from app.utils.auth import auth_required, admin_required
+from benchmarks.harness import case
+
+PAGE_SIZE = 50
+APPROVE_ROUNDS = 30
+
+def _expect(result, status, name):
+    """Fail loudly instead of timing an error path"""
+    body, code = result
+    if code != status:
+        raise RuntimeError(f'{name} returned {code}: {body.get_json()}')
+
+def _line_items(dataset):
+    return [{'product_id': product_id, 'qty': 1, 'price': 10.0} for product_id in dataset.product_ids]
+
+# Serialization of one list page, with the graph already loaded
+
+@case('serialize')
+def order_to_dict(benchmark, dataset):
+    orders = Order.query.options(*Order.graph_options()).order_by(Order.id).limit(PAGE_SIZE).all()
+    benchmark(lambda: [order.to_dict() for order in orders])
+
+@case('serialize')
+def quotation_to_dict(benchmark, dataset):
+    quotations = Quotation.query.options(*Quotation.graph_options()).order_by(Quotation.id).limit(PAGE_SIZE).all()
+    benchmark(lambda: [quotation.to_dict() for quotation in quotations])
+
+# Decorator overhead is the difference from request_context, which only builds the context
+
+def _current_user_id(current_user):
+    return current_user.id
+
+@case('auth')
+def request_context(benchmark, dataset):
+    def call():
+        with dataset.request(dataset.admin_headers):
+            return dataset.admin_id
+    benchmark(call)
+
+@case('auth')
+def auth_required_view(benchmark, dataset):
+    view = auth_required(_current_user_id)
+    def call():
+        with dataset.request(dataset.supplier_headers):
+            return view()
+    if benchmark(call) != dataset.supplier_id:
+        raise RuntimeError('auth_required rejected the supplier token')
+
+@case('auth')
+def admin_required_view(benchmark, dataset):
+    view = admin_required(_current_user_id)
+    def call():
+        with dataset.request(dataset.admin_headers):
+            return view()
+    if benchmark(call) != dataset.admin_id:
+        raise RuntimeError('admin_required rejected the admin token')
+
+# InventoryController, called directly as the routes do
+
+@case('inventory')
+def get_supplier_inventory(benchmark, dataset):
+    filters = {'limit': PAGE_SIZE, 'format': 'json', 'after_id': None, 'created_from': None, 'created_to': None}
+    benchmark(InventoryController.get_supplier_inventory, dataset.supplier_id, filters)
+
+@case('inventory')
+def add_product_to_inventory(benchmark, dataset):
+    benchmark(InventoryController.add_product_to_inventory, dataset.supplier_id, dataset.product_ids[0], 1)
+
+@case('inventory')
+def remove_from_inventory(benchmark, dataset):
+    benchmark(InventoryController.remove_from_inventory, dataset.supplier_id, dataset.product_ids[0], 1)
+
+@case('inventory')
+def update_inventory_quantity(benchmark, dataset):
+    benchmark(InventoryController.update_inventory_quantity, dataset.supplier_id, dataset.product_ids[1], 500)
+
+# Quotation workflow
+
+@case('quotation')
+def validate_items(benchmark, dataset):
+    items = _line_items(dataset)
+    rows, errors = benchmark(_validate_items, dataset.supplier_id, items)
+    if errors:
+        raise RuntimeError(f'Line items failed validation: {errors}')
+
+@case('quotation')
+def create_quotation_request(benchmark, dataset):
+    payload = {'supplier_user_id': dataset.supplier_id, 'items': _line_items(dataset)}
+    def call():
+        with dataset.request(dataset.admin_headers, json=payload):
+            return create_quotation()
+    _expect(benchmark(call), 201, 'create_quotation')
+
+@case('quotation')
+def approve_quotation_request(benchmark, dataset):
+    def pending_quotation():
+        quotation = Quotation(admin_user_id=dataset.admin_id, supplier_user_id=dataset.supplier_id,
+                              status=QuotationStatus.PENDING)
+        db.session.add(quotation)
+        db.session.flush()
+        db.session.execute(insert(QuotationItem), [{'quotation_id': quotation.id, **item}
+                                                   for item in _line_items(dataset)])
+        db.session.commit()
+        return (quotation.id,)
+
+    def call(quotation_id):
+        with dataset.request(dataset.admin_headers):
+            return approve_quotation(quotation_id)
+    _expect(benchmark.pedantic(call, setup=pending_quotation, rounds=APPROVE_ROUNDS), 200, 'approve_quotation')
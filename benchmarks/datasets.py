@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+from app import create_app, db, revoked_token_cache
+from app.models.user import User, UserRole
+from app.models.inventory import Inventory
+from app.utils import seed
+from config import Config
+
+DATASET_SEED = 1
+STOCKED_ITEMS = 10
+STOCK_LEVEL = 10 ** 9  # Large enough that no run of remove/create calls can exhaust it
+
+class Dataset:
+    """What the cases need from one seeded database; its app context is active while cases run"""
+
+    def __init__(self, app, size):
+        self.app = app
+        self.size = size
+        self.admin_id = db.session.query(User.id).filter(User.role == UserRole.ADMIN).order_by(User.id).scalar()
+        # The supplier with the widest range, so quotations can pick STOCKED_ITEMS products
+        self.supplier_id = db.session.query(Inventory.supplier_id).group_by(Inventory.supplier_id) \
+            .order_by(func.count().desc(), Inventory.supplier_id).limit(1).scalar()
+        stocked = Inventory.query.filter_by(supplier_id=self.supplier_id).order_by(Inventory.id) \
+            .limit(STOCKED_ITEMS).all()
+        for item in stocked:
+            item.quantity = STOCK_LEVEL
+        self.product_ids = [item.product_id for item in stocked]
+        db.session.commit()
+
+        self.admin_headers = self._auth_headers(self.admin_id)
+        self.supplier_headers = self._auth_headers(self.supplier_id)
+
+    @staticmethod
+    def _auth_headers(user_id):
+        user = db.session.get(User, user_id)
+        token = create_access_token(identity=str(user.id), additional_claims=user.token_claims())
+        return {'Authorization': f'Bearer {token}'}
+
+    def request(self, headers, json=None):
+        """A request context carrying headers (and a JSON body), for calling controllers directly"""
+        return self.app.test_request_context(method='POST' if json is not None else 'GET',
+                                             headers=headers, json=json)
+
+@contextmanager
+def seeded_dataset(size):
+    """
+    A fresh in-memory database seeded with size quotations, pushed as the app context.
+
+    Catalogue and supplier counts grow with size, so larger datasets also
+    mean larger tables behind every lookup.
+    """
+    signal_dir = tempfile.mkdtemp(prefix='techfix-bench-')
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        TESTING = True
+        METRICS_ENABLED = False
+        QUERY_TRACKING = False
+        REVOKED_TOKEN_SIGNAL_FILE = os.path.join(signal_dir, 'revoked_tokens.signal')
+
+    app = create_app(BenchmarkConfig)
+    try:
+        with app.app_context():
+            db.create_all()
+            seed.generate(suppliers=max(5, size // 100), products=max(50, size // 5),
+                          quotations=size, seed=DATASET_SEED)
+            revoked_token_cache.reload()
+            try:
+                yield Dataset(app, size)
+            finally:
+                db.session.remove()
+                db.engine.dispose()
+    finally:
+        shutil.rmtree(signal_dir, ignore_errors=True)
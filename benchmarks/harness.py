@@ -0,0 +1,167 @@
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+
+# Calibrated so one round lasts at least MIN_ROUND_TIME; a case then runs
+# rounds until it has used MAX_TIME, within [MIN_ROUNDS, MAX_ROUNDS]
+MIN_ROUND_TIME = 0.002
+MAX_TIME = 0.5
+MIN_ROUNDS = 5
+MAX_ROUNDS = 10000
+
+_cases = []
+
+def case(group):
+    """Register a benchmark function taking (benchmark, dataset)"""
+    def decorator(fn):
+        _cases.append((f'{group}.{fn.__name__}', group, fn))
+        return fn
+    return decorator
+
+def registered_cases():
+    return list(_cases)
+
+class Benchmark:
+    """
+    The fixture handed to each case, modelled on pytest-benchmark's.
+
+    benchmark(fn, *args) calibrates an iteration count and times fn repeatedly.
+    benchmark.pedantic(fn, setup=...) runs a fixed number of single-call rounds
+    with an untimed setup before each, for operations that consume their input.
+    """
+
+    def __init__(self):
+        self.stats = None
+
+    def __call__(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)  # Warm-up, also used to size the rounds
+        single = max(time.perf_counter() - started, 1e-7)
+        iterations = max(1, math.ceil(MIN_ROUND_TIME / single))
+
+        timings = []
+        deadline = time.perf_counter() + MAX_TIME
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            while len(timings) < MIN_ROUNDS or (time.perf_counter() < deadline and len(timings) < MAX_ROUNDS):
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    fn(*args, **kwargs)
+                timings.append((time.perf_counter() - started) / iterations)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        self.stats = _summarize(timings, iterations)
+        return result
+
+    def pedantic(self, fn, setup=None, rounds=20, warmup_rounds=1):
+        """Time rounds single calls of fn(*args), args coming from setup() outside the timer"""
+        timings = []
+        result = None
+        for index in range(warmup_rounds + rounds):
+            args = setup() if setup else ()
+            started = time.perf_counter()
+            result = fn(*args)
+            elapsed = time.perf_counter() - started
+            if index >= warmup_rounds:
+                timings.append(elapsed)
+        self.stats = _summarize(timings, 1)
+        return result
+
+def _summarize(timings, iterations):
+    ordered = sorted(timings)
+    quartiles = statistics.quantiles(ordered, n=4) if len(ordered) > 1 else [ordered[0]] * 3
+    mean = statistics.fmean(ordered)
+    return {
+        'min': ordered[0],
+        'max': ordered[-1],
+        'mean': mean,
+        'stddev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'median': statistics.median(ordered),
+        'iqr': quartiles[2] - quartiles[0],
+        'ops': 1 / mean if mean else 0.0,
+        'rounds': len(ordered),
+        'iterations': iterations
+    }
+
+def machine_info():
+    return {
+        'node': platform.node(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'python_version': platform.python_version(),
+        'system': platform.system(),
+        'cpu_count': os.cpu_count()
+    }
+
+def run(sizes, make_dataset, keyword=None, report=None):
+    """
+    Run every registered case (optionally only those whose name contains
+    keyword) against a dataset of each size, smallest first.
+
+    make_dataset(size) must return a context manager yielding the dataset.
+    report(entry) is called after each measurement. Returns the results
+    document that save_results writes.
+    """
+    selected = [c for c in _cases if not keyword or keyword in c[0]]
+    results = []
+    for size in sorted(sizes):
+        with make_dataset(size) as dataset:
+            for name, group, fn in selected:
+                benchmark = Benchmark()
+                fn(benchmark, dataset)
+                if benchmark.stats is None:
+                    raise RuntimeError(f'{name} never called its benchmark fixture')
+                entry = {
+                    'name': name,
+                    'group': group,
+                    'size': size,
+                    'fullname': f'{name}[{size}]',
+                    'stats': benchmark.stats
+                }
+                results.append(entry)
+                if report:
+                    report(entry)
+    return {
+        'machine_info': machine_info(),
+        'datetime': datetime.utcnow().isoformat(),
+        'benchmarks': results
+    }
+
+def save_results(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+def load_results(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def compare(results, baseline, threshold):
+    """
+    Pair each benchmark with its baseline entry by fullname and compare medians.
+
+    Returns (fullname, baseline median, current median, change, verdict)
+    rows; verdict is 'regressed' or 'improved' when the change is beyond
+    threshold (0.2 = 20%), else 'ok', and 'new' without a baseline entry.
+    """
+    previous = {entry['fullname']: entry['stats'] for entry in baseline.get('benchmarks', [])}
+    rows = []
+    for entry in results['benchmarks']:
+        before = previous.get(entry['fullname'])
+        now = entry['stats']['median']
+        if before is None:
+            rows.append((entry['fullname'], None, now, None, 'new'))
+            continue
+        change = now / before['median'] - 1 if before['median'] else 0.0
+        verdict = 'regressed' if change > threshold else 'improved' if change < -threshold else 'ok'
+        rows.append((entry['fullname'], before['median'], now, change, verdict))
+    return rows
@@ -0,0 +1,315 @@
+import json
+import math
+import random
+import threading
+import time
+import http.client
+from urllib.parse import urlsplit, urlencode
+
+SEARCH_TERMS = ['ssd', 'lenovo', 'monitor', 'router', 'ddr5', 'keyboard', 'power', 'asus pro']
+QUOTATION_LINES = 3
+SCHEDULER_TICK = 0.2
+
+class LoadTestError(Exception):
+    """Raised when a load test cannot be set up"""
+
+class StepFailed(Exception):
+    """Ends the current scenario after a failed request; the failure is already recorded"""
+
+class Account:
+    def __init__(self, email, password, user_id=None, product_ids=()):
+        self.email = email
+        self.password = password
+        self.user_id = user_id
+        self.product_ids = list(product_ids)
+
+class Recorder:
+    """Thread-safe list of (finished at, endpoint, seconds, ok) samples"""
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.samples.append((time.monotonic(), endpoint, seconds, ok))
+
+class Session:
+    """One logged-in dashboard user on a virtual user's connection"""
+
+    def __init__(self, user, account):
+        self.user = user
+        self.account = account
+        self.token = None
+        body = self.request('POST', '/api/users/login', 'POST /api/users/login',
+                            {'email': account.email, 'password': account.password})
+        self.token = body['access_token']
+
+    def request(self, method, path, endpoint, payload=None, query=None):
+        if query:
+            path = f'{path}?{urlencode(query)}'
+        return self.user.request(method, path, endpoint, payload, self.token)
+
+    def get(self, path, endpoint, **query):
+        return self.request('GET', path, endpoint, query=query)
+
+class VirtualUser(threading.Thread):
+    def __init__(self, number, runner):
+        super().__init__(name=f'vu-{number}', daemon=True)
+        self.runner = runner
+        self.rng = random.Random(number)
+        self.supplier = runner.suppliers[number % len(runner.suppliers)]
+        self.retired = threading.Event()
+        self._connection = None
+
+    def run(self):
+        names = list(self.runner.weights)
+        weights = list(self.runner.weights.values())
+        while not self.retired.is_set():
+            scenario = SCENARIOS[self.rng.choices(names, weights=weights)[0]]
+            try:
+                scenario(self)
+            except StepFailed:
+                self.think()
+        if self._connection is not None:
+            self._connection.close()
+
+    def think(self):
+        if self.runner.think:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.runner.think)
+
+    def session(self, account):
+        return Session(self, account)
+
+    def request(self, method, path, endpoint, payload, token):
+        headers = {'Accept': 'application/json'}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload)
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+
+        runner = self.runner
+        started = time.perf_counter()
+        try:
+            if self._connection is None:
+                self._connection = runner.connect()
+            self._connection.request(method, runner.base_path + path, body=body, headers=headers)
+            response = self._connection.getresponse()
+            data = response.read()
+            if response.will_close:
+                self._connection.close()
+                self._connection = None
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            runner.recorder.record(endpoint, time.perf_counter() - started, False)
+            raise StepFailed()
+        runner.recorder.record(endpoint, time.perf_counter() - started, ok)
+        if not ok:
+            raise StepFailed()
+        self.think()
+        return json.loads(data) if data else None
+
+# Scenarios: each runs one dashboard session from login to its last step
+
+def procurement(user):
+    """Admin quotes a supplier and approves; supplier confirms and ships; admin completes"""
+    admin = user.session(user.runner.admin)
+    supplier = user.session(user.supplier)
+    admin.get('/api/products/', 'GET /api/products/', limit=20)
+
+    products = user.rng.sample(user.supplier.product_ids, min(QUOTATION_LINES, len(user.supplier.product_ids)))
+    quotation = admin.request('POST', '/api/quotations/', 'POST /api/quotations/', {
+        'supplier_user_id': user.supplier.user_id,
+        'items': [{'product_id': product_id, 'qty': 1, 'price': round(user.rng.uniform(10, 500), 2)}
+                  for product_id in products]
+    })
+    approved = admin.request('POST', f"/api/quotations/{quotation['id']}/approve",
+                             'POST /api/quotations/<id>/approve')
+    order_path = f"/api/orders/{approved['order']['id']}"
+    supplier.request('PUT', order_path, 'PUT /api/orders/<id> confirmed', {'status': 'confirmed'})
+    supplier.request('PUT', order_path, 'PUT /api/orders/<id> shipped', {'status': 'shipped'})
+    admin.request('PUT', order_path, 'PUT /api/orders/<id> completed', {'status': 'completed'})
+
+def supplier_dashboard(user):
+    """Supplier checks stock, the catalogue and their quotations and orders"""
+    supplier = user.session(user.supplier)
+    supplier.get('/api/inventory', 'GET /api/inventory', limit=20)
+    supplier.get('/api/products/', 'GET /api/products/', limit=20)
+    supplier.get('/api/products/search', 'GET /api/products/search', q=user.rng.choice(SEARCH_TERMS), limit=20)
+    supplier.get('/api/quotations/', 'GET /api/quotations/', limit=20)
+    supplier.get('/api/orders/', 'GET /api/orders/', limit=20)
+
+def admin_dashboard(user):
+    """Admin reviews pending quotations, recent orders, the catalogue and users"""
+    admin = user.session(user.runner.admin)
+    admin.get('/api/quotations/', 'GET /api/quotations/', status='pending', limit=20)
+    admin.get('/api/orders/', 'GET /api/orders/', limit=20)
+    admin.get('/api/products/', 'GET /api/products/', limit=20)
+    admin.get('/api/users/', 'GET /api/users/')
+
+SCENARIOS = {
+    'procurement': procurement,
+    'supplier_dashboard': supplier_dashboard,
+    'admin_dashboard': admin_dashboard
+}
+DEFAULT_WEIGHTS = {'procurement': 1, 'supplier_dashboard': 3, 'admin_dashboard': 1}
+
+def parse_stages(text):
+    """'5:30,20:60' -> [(5, 30.0), (20, 60.0)]: ramp to 5 users over 30s, then to 20 over 60s"""
+    stages = []
+    for part in text.split(','):
+        users, _, seconds = part.partition(':')
+        try:
+            stages.append((int(users), float(seconds)))
+        except ValueError:
+            raise LoadTestError(f'Invalid stage {part!r}, expected users:seconds')
+        if stages[-1][0] < 0 or stages[-1][1] <= 0:
+            raise LoadTestError(f'Invalid stage {part!r}, users must be >= 0 and seconds > 0')
+    return stages
+
+def target_users(stages, elapsed):
+    """Users wanted at elapsed seconds, interpolating linearly from the previous stage's level"""
+    previous = 0
+    for users, seconds in stages:
+        if elapsed < seconds:
+            return math.ceil(previous + (users - previous) * elapsed / seconds)
+        elapsed -= seconds
+        previous = users
+    return previous
+
+class LoadRunner:
+    def __init__(self, base_url, admin, suppliers, weights=None, think=0.0, timeout=30.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise LoadTestError(f'Unsupported URL {base_url}')
+        if not suppliers:
+            raise LoadTestError('No supplier accounts to run scenarios with')
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.base_path = parts.path.rstrip('/')
+        self.admin = admin
+        self.suppliers = suppliers
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.think = think
+        self.timeout = timeout
+        self.recorder = Recorder()
+
+    def connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.netloc, timeout=self.timeout)
+
+    def run(self, stages, on_tick=None):
+        """
+        Drive virtual users through stages and return per-stage windows
+        (start, end, users) in recorder time. on_tick(elapsed, users, samples)
+        is called about once a second.
+        """
+        active = []
+        windows = []
+        started = time.monotonic()
+        stage_end = started
+        for users, seconds in stages:
+            windows.append((stage_end, stage_end + seconds, users))
+            stage_end += seconds
+
+        next_tick = started + 1
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= stage_end:
+                    break
+                wanted = target_users(stages, now - started)
+                while len(active) < wanted:
+                    user = VirtualUser(len(active), self)
+                    active.append(user)
+                    user.start()
+                while len(active) > wanted:
+                    active.pop().retired.set()
+                if on_tick and now >= next_tick:
+                    on_tick(now - started, len(active), len(self.recorder.samples))
+                    next_tick += 1
+                time.sleep(SCHEDULER_TICK)
+        finally:
+            for user in active:
+                user.retired.set()
+            for user in active:
+                user.join(self.timeout)
+        return windows
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def _summary(samples, seconds):
+    latencies = sorted(sample[2] for sample in samples)
+    errors = sum(1 for sample in samples if not sample[3])
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'rps': len(samples) / seconds if seconds else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else None
+    }
+
+def summarize(samples, windows):
+    """Per-endpoint and per-stage summaries of a run"""
+    started, finished = windows[0][0], windows[-1][1]
+    by_endpoint = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample[1], []).append(sample)
+    return {
+        'total': _summary(samples, finished - started),
+        'endpoints': {endpoint: _summary(rows, finished - started) for endpoint, rows in sorted(by_endpoint.items())},
+        'stages': [
+            {'users': users, 'seconds': end - start,
+             **_summary([s for s in samples if start <= s[0] < end], end - start)}
+            for start, end, users in windows
+        ]
+    }
+
+def prepare_accounts(admin_email, admin_password, supplier_count, stock_level=10 ** 6):
+    """
+    Pick seeded suppliers and top up the stock the procurement scenario ships from.
+
+    Needs an app context on the same database the server uses. Scenarios write
+    quotations and orders, so point this at a seeded copy, not real data.
+    """
+    from app import db
+    from app.models.inventory import Inventory
+    from app.models.user import User, UserRole, UserStatus
+    from app.utils import counters, seed, stock_index
+
+    suppliers = User.query.filter(
+        User.role == UserRole.SUPPLIER,
+        User.status == UserStatus.ACTIVE,
+        User.email.like(f'%@{seed.EMAIL_DOMAIN}')
+    ).order_by(User.id).limit(supplier_count).all()
+
+    accounts = []
+    for supplier in suppliers:
+        stocked = Inventory.query.filter_by(supplier_id=supplier.id).order_by(Inventory.id) \
+            .limit(QUOTATION_LINES * 2).all()
+        if len(stocked) < QUOTATION_LINES:
+            continue
+        # Through the stock index and dashboard counters, as the inventory endpoints do
+        changes = [(item.product_id, item.quantity, stock_level) for item in stocked if item.quantity < stock_level]
+        stock_index.record(changes)
+        counters.bump({counters.STOCK_UNITS: sum(new - old for _, old, new in changes)}, supplier.id)
+        for item in stocked:
+            item.quantity = max(item.quantity, stock_level)
+        accounts.append(Account(supplier.email, seed.SUPPLIER_PASSWORD, supplier.id,
+                                [item.product_id for item in stocked]))
+    db.session.commit()
+    if not accounts:
+        raise LoadTestError('No seeded suppliers with stock found; run flask seed first')
+    return Account(admin_email, admin_password), accounts
@@ -5,6 +5,37 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Named database engine profiles, selected with DB_PROFILE. 'pool' holds the
+# SQLAlchemy pool settings and 'pragmas' the SQLite PRAGMAs run on every new
+# connection; both can be overridden one setting at a time from the environment
+DB_PROFILES = {
+    'dev-sqlite': {
+        'dialect': 'sqlite',
+        'pool': {'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 30, 'pool_pre_ping': False, 'pool_recycle': -1},
+        'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 5000,
+                    'mmap_size': 64 * 1024 * 1024, 'cache_size': -16000}
+    },
+    'prod-sqlite': {
+        'dialect': 'sqlite',
+        'pool': {'pool_size': 10, 'max_overflow': 20, 'pool_timeout': 30, 'pool_pre_ping': False, 'pool_recycle': 3600},
+        'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 15000,
+                    'mmap_size': 256 * 1024 * 1024, 'cache_size': -64000}
+    },
+    'postgres': {
+        'dialect': 'postgresql',
+        'pool': {'pool_size': 10, 'max_overflow': 20, 'pool_timeout': 30, 'pool_pre_ping': True, 'pool_recycle': 1800},
+        'pragmas': {}
+    }
+}
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else None
+
+def _env_bool(name):
+    value = os.environ.get(name)
+    return value.lower() == 'true' if value not in (None, '') else None
+
 class Config:
     # Flask configuration
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
@@ -13,6 +44,18 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI') or 'sqlite:///techfix.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = os.environ.get('SQLALCHEMY_TRACK_MODIFICATIONS', 'False').lower() == 'true'
     
+    # Engine profile from DB_PROFILES; defaults to postgres for a postgresql URI, else dev-sqlite.
+    # Each setting below left as None keeps the profile's value
+    DB_PROFILE = os.environ.get('DB_PROFILE')
+    DB_POOL_SIZE = _env_int('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = _env_int('DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT = _env_int('DB_POOL_TIMEOUT')
+    DB_POOL_PRE_PING = _env_bool('DB_POOL_PRE_PING')
+    DB_POOL_RECYCLE = _env_int('DB_POOL_RECYCLE')
+    SQLITE_BUSY_TIMEOUT = _env_int('SQLITE_BUSY_TIMEOUT')  # milliseconds
+    SQLITE_MMAP_SIZE = _env_int('SQLITE_MMAP_SIZE')  # bytes
+    SQLITE_CACHE_SIZE = _env_int('SQLITE_CACHE_SIZE')  # pages, or KiB when negative
+    
     # Security
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     
@@ -23,6 +66,76 @@ class Config:
     JWT_BLACKLIST_ENABLED = True
     JWT_BLACKLIST_TOKEN_CHECKS = ['access', 'refresh']
     
+    # Revoked token cache: seconds between checks of the cross-worker signal file
+    REVOKED_TOKEN_SYNC_INTERVAL = float(os.environ.get('REVOKED_TOKEN_SYNC_INTERVAL', '1.0'))
+    REVOKED_TOKEN_SIGNAL_FILE = os.environ.get('REVOKED_TOKEN_SIGNAL_FILE')
+    
+    # Pagination for list endpoints
+    PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', '50'))
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', '200'))
+    # Rows fetched and written per chunk when a list is streamed (limit=all or NDJSON)
+    STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', '500'))
+    
+    # Rows per transaction for POST /api/inventory/bulk
+    BULK_INVENTORY_CHUNK_SIZE = int(os.environ.get('BULK_INVENTORY_CHUNK_SIZE', '1000'))
+    
+    # Change feed behind GET /api/changes. Entries older than the retention or beyond the newest
+    # CHANGE_FEED_MAX_ROWS are compacted away after every CHANGE_FEED_COMPACT_EVERY writes per
+    # process (or by 'flask compact-changes'); clients holding an older cursor are told to resync
+    CHANGE_FEED_RETENTION_HOURS = int(os.environ.get('CHANGE_FEED_RETENTION_HOURS', '72'))
+    CHANGE_FEED_MAX_ROWS = int(os.environ.get('CHANGE_FEED_MAX_ROWS', '100000'))
+    CHANGE_FEED_COMPACT_EVERY = int(os.environ.get('CHANGE_FEED_COMPACT_EVERY', '500'))
+    
+    # Static file serving; point STATIC_ROOT at the output of 'flask build-assets' in production.
+    # STATIC_AUTO_RELOAD rescans the folder when files change (defaults to DEBUG)
+    STATIC_ROOT = os.environ.get('STATIC_ROOT')
+    STATIC_AUTO_RELOAD = os.environ.get('STATIC_AUTO_RELOAD', str(DEBUG)).lower() == 'true'
+    
+    # Prometheus metrics at /api/metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    
+    # Per-request SQL tracking: X-Query-Count header, N+1 warnings and @query_budget checks.
+    # QUERY_BUDGET_STRICT makes an exceeded budget raise, for the test suite
+    QUERY_TRACKING = os.environ.get('QUERY_TRACKING', 'False').lower() == 'true'
+    QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', 'False').lower() == 'true'
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', '3'))
+    
+    # Token-bucket rate limits per user (from the JWT) or client IP. RATE_LIMITS overrides the default
+    # per endpoint or blueprint ('off' exempts). RATE_LIMIT_STORAGE is 'memory' (per worker), 'sqlite'
+    # (instance/rate_limits.db, shared by the workers on one host) or 'sqlite:///path'
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_DEFAULT = os.environ.get('RATE_LIMIT_DEFAULT', '300/minute')
+    RATE_LIMITS = os.environ.get('RATE_LIMITS', 'user.login=10/minute,user.register_user=5/minute,'
+                                                'serve_static=off,uploaded_file=off')
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE', 'memory')
+    # Requests in flight per process before new ones get a 503; defaults to the DB pool size plus overflow, 0 = no cap
+    RATE_LIMIT_MAX_CONCURRENT = _env_int('RATE_LIMIT_MAX_CONCURRENT')
+    
+    # Password hashing. PASSWORD_HASH_METHOD is a werkzeug method string ('scrypt:N:r:p' or
+    # 'pbkdf2:sha256:iterations'); hashes stored with other parameters are upgraded at the next login.
+    # At most PASSWORD_HASH_QUEUE_LIMIT hashes may be running or waiting before requests get a 503
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT', '16'))
+    
+    # Uploaded images and their variants; defaults to uploads/ next to the app package
+    UPLOAD_ROOT = os.environ.get('UPLOAD_ROOT')
+    
+    # Background image variant generation
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+    IMAGE_QUEUE_LIMIT = int(os.environ.get('IMAGE_QUEUE_LIMIT', '32'))
+    
+    # Production server (serve.py). SERVER_THREADS above 1 uses gunicorn's threaded workers
+    SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:8000')
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', str((os.cpu_count() or 1) * 2 + 1)))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', '4'))
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', '60'))
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', '30'))
+    SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', '5'))
+    # Recycle a worker after this many requests (0 = never), jittered so they do not restart together
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', '0'))
+    SERVER_ACCESS_LOG = os.environ.get('SERVER_ACCESS_LOG', '-')
+    
     # Admin default credentials
     ADMIN_NAME = os.environ.get('ADMIN_NAME', 'admin')
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@example.com')
@@ -0,0 +1,122 @@
+"""
+Production entry point: the app under gunicorn's pre-forking server.
+
+    python serve.py                                  # SERVER_* settings from config / .env
+    python serve.py --workers 8 --threads 4 --bind 0.0.0.0:8000
+
+The master process loads the app once, checks the schema, creates the admin
+account and warms the caches before it binds, then forks workers that share
+that memory. Each worker drops the database connections it inherited.
+SIGTERM stops accepting connections and lets in-flight requests finish for
+up to SERVER_GRACEFUL_TIMEOUT seconds; start.py remains the development server.
+"""
+import os
+import sys
+import glob
+import logging
+import argparse
+import tempfile
+from gunicorn.app.base import BaseApplication
+from config import Config
+
+# Same variable as app.utils.metrics.MULTIPROC_ENV; importing that module would load
+# prometheus_client, which reads the variable on import
+MULTIPROC_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+def prepare_metrics_dir(workers):
+    """
+    Give each worker process its own Prometheus files in PROMETHEUS_MULTIPROC_DIR.
+
+    Must run before the app is imported. Files left by a previous run are removed
+    so restarted counters do not add to old totals.
+    """
+    if workers < 2 and MULTIPROC_ENV not in os.environ:
+        return
+    path = os.environ.setdefault(MULTIPROC_ENV, tempfile.mkdtemp(prefix='techfix-metrics-'))
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, '*.db')):
+        os.remove(stale)
+
+class TechFixServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        self.application = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # With preload_app this runs once, in the master, before the listening socket is opened
+        error_log = logging.getLogger('gunicorn.error')
+        root = logging.getLogger()
+        if not root.handlers:
+            root.handlers = error_log.handlers
+            root.setLevel(error_log.level)
+
+        from app import create_app, db
+        from app.utils import bootstrap
+        config = Config
+        if self.options['workers'] > 1 and 'RATE_LIMIT_STORAGE' not in os.environ:
+            # Buckets kept per worker would multiply every limit by the worker count
+            config = type('ServerConfig', (Config,), {'RATE_LIMIT_STORAGE': 'sqlite'})
+        app = create_app(config)
+        with app.app_context():
+            created = bootstrap.check_schema()
+            if created:
+                error_log.info(f"Created tables: {', '.join(created)}")
+            if bootstrap.ensure_admin():
+                error_log.info('Admin user created')
+            bootstrap.warm_caches()
+            db.session.remove()
+            db.engine.dispose()  # Workers must not share the master's connections
+        self.application = app
+        return app
+
+def post_fork(server, worker):
+    from app import db
+    with server.app.application.app_context():
+        # close=False: the pooled connections belong to the master, so only forget them
+        db.engine.dispose(close=False)
+
+def worker_exit(server, worker):
+    from app.utils import images
+    images.shutdown(wait=True)
+
+def child_exit(server, worker):
+    from app.utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
+
+def server_options(args):
+    return {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'preload_app': True,
+        'timeout': Config.SERVER_TIMEOUT,
+        'graceful_timeout': Config.SERVER_GRACEFUL_TIMEOUT,
+        'keepalive': Config.SERVER_KEEPALIVE,
+        'max_requests': Config.SERVER_MAX_REQUESTS,
+        'max_requests_jitter': Config.SERVER_MAX_REQUESTS // 10,
+        'accesslog': Config.SERVER_ACCESS_LOG or None,
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+        'child_exit': child_exit
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run TechFix under gunicorn')
+    parser.add_argument('--bind', default=Config.SERVER_BIND)
+    parser.add_argument('--workers', type=int, default=Config.SERVER_WORKERS)
+    parser.add_argument('--threads', type=int, default=Config.SERVER_THREADS)
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.threads < 1:
+        parser.error('--workers and --threads must be at least 1')
+
+    prepare_metrics_dir(args.workers)
+    TechFixServer(server_options(args)).run()
+
+if __name__ == '__main__':
+    sys.exit(main())
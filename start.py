@@ -1,5 +1,5 @@
 from app import create_app, db
-from app.models.user import User, UserRole
+from app.utils import bootstrap
 from flask_migrate import Migrate
 from config import Config
 from flask import Flask
@@ -20,21 +20,16 @@ if not os.path.exists(UPLOAD_FOLDER):
 
 def create_admin_user():
     with app.app_context():
-        # Create all database tables
-        db.create_all()
-        
-        # Check if admin user exists
-        if not User.query.filter_by(name=Config.ADMIN_NAME).first():
-            admin = User(
-                name=Config.ADMIN_NAME,
-                email=Config.ADMIN_EMAIL,
-                role=UserRole.ADMIN
-            )
-            admin.set_password(Config.ADMIN_PASSWORD)
-            db.session.add(admin)
-            db.session.commit()
+        # Create any missing tables
+        bootstrap.check_schema()
+        if bootstrap.ensure_admin():
             print('Admin user created successfully')
 
+def warm_caches():
+    with app.app_context():
+        bootstrap.warm_caches()
+
 if __name__ == '__main__':
     create_admin_user()
+    warm_caches()
     app.run(debug=Config.DEBUG)
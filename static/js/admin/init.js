@@ -1,2 +1,4 @@
 checkAuth();
 showSection('suppliers');
+document.getElementById('quotationStatus').addEventListener('change', () => loadSectionData('quotations'));
+document.getElementById('orderStatus').addEventListener('change', () => loadSectionData('orders'));
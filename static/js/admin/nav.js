@@ -23,10 +23,6 @@ function showSection(section) {
         }
     });
     
-    if (section === 'products') {
-        loadProducts();
-    }
-    
     loadSectionData(section);
 }
 
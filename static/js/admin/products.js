@@ -1,22 +1,32 @@
 // Load products from server
 async function loadProducts() {
-    try {
-        const token = localStorage.getItem('token');
-        if (!token) throw new Error('No token found');
-        const response = await fetch('/api/products', {
-            headers: {
-                'Authorization': `Bearer ${token}`
-            }
-        });
-        if (!response.ok) {
-            throw new Error('Failed to load products');
-        }
-        const products = await response.json();
-        displayProducts(products, document.getElementById('productsList'));
-    } catch (err) {
-        console.error(err);
-        alert('Error loading products');
+    await loadSectionData('products');
+}
+
+// Responsive product image markup; falls back to the original upload until variants exist
+function productImageHtml(product) {
+    const variants = product.image_variants;
+    if (!variants) {
+        return `<img src="/${product.image}" alt="${product.name}" loading="lazy" />`;
     }
+    const widths = { thumb: 160, card: 480, full: 1280 };
+    const srcset = (format) => Object.keys(widths)
+        .filter(size => variants[size] && variants[size][format])
+        .map(size => `${variants[size][format]} ${widths[size]}w`)
+        .join(', ');
+    const fallback = variants.card.jpeg ? 'jpeg' : 'png';
+    const sources = ['avif', 'webp']
+        .filter(format => variants.card[format])
+        .map(format => `<source type="image/${format}" srcset="${srcset(format)}" sizes="(max-width: 600px) 100vw, 320px" />`)
+        .join('');
+    return `
+        <picture>
+            ${sources}
+            <img src="${variants.card[fallback]}" srcset="${srcset(fallback)}" sizes="(max-width: 600px) 100vw, 320px"
+                 alt="${product.name}" loading="lazy" decoding="async"
+                 style="background: url('${variants.placeholder}') center / cover no-repeat;" />
+        </picture>
+    `;
 }
 
 // Update the displayProducts function
@@ -38,9 +48,7 @@ function displayProducts(products, container) {
         const imageContainer = document.createElement('div');
         imageContainer.className = 'product-image';
         if (product.image) {
-            imageContainer.innerHTML = `
-                <img src="/${product.image}" alt="${product.name}" />
-            `;
+            imageContainer.innerHTML = productImageHtml(product);
         } else {
             imageContainer.innerHTML = `
                 <div class="no-image">
@@ -243,18 +251,37 @@ document.getElementById('cancel-product-form').addEventListener('click', () => {
     document.getElementById('product-form').style.display = 'none';
 });
 
-// Search products functionality
+// Search products on the server, debounced so typing doesn't fire a request per key
+let productSearchTimer = null;
 document.getElementById('productSearch').addEventListener('input', (e) => {
-    const searchTerm = e.target.value.toLowerCase();
-    const products = document.querySelectorAll('.product-card');
-    
-    products.forEach(card => {
-        const text = card.textContent.toLowerCase();
-        card.style.display = 
-            text.includes(searchTerm) ? 'block' : 'none';
-    });
+    clearTimeout(productSearchTimer);
+    const searchTerm = e.target.value.trim();
+    productSearchTimer = setTimeout(() => searchProducts(searchTerm), 250);
 });
 
+async function searchProducts(searchTerm) {
+    if (!searchTerm) {
+        loadSectionData('products');
+        return;
+    }
+    try {
+        const token = localStorage.getItem('token');
+        const response = await fetch(`/api/products/search?q=${encodeURIComponent(searchTerm)}`, {
+            headers: {
+                'Authorization': `Bearer ${token}`
+            }
+        });
+        if (!response.ok) {
+            throw new Error('Search failed');
+        }
+        const products = await response.json();
+        displayProducts(products, document.getElementById('productsList'));
+    } catch (err) {
+        console.error(err);
+        alert('Error searching products');
+    }
+}
+
 // Edit product functionality
 async function editProduct(productId) {
     try {
@@ -1,4 +1,9 @@
-async function loadSectionData(section) {
+const PAGE_SIZE = 50;
+
+// Rows loaded so far and the cursor for the next page, per section
+const sectionPages = {};
+
+async function loadSectionData(section, loadMore = false) {
     try {
         const token = localStorage.getItem('token');
         if (!token) {
@@ -32,6 +37,11 @@ async function loadSectionData(section) {
                 break;
         }
 
+        params.append('limit', PAGE_SIZE);
+        if (loadMore && sectionPages[section]?.nextCursor) {
+            params.append('cursor', sectionPages[section].nextCursor);
+        }
+
         // Construct URL with parameters
         let url = endpoint;
         if (params.toString()) {
@@ -50,7 +60,12 @@ async function loadSectionData(section) {
         }
 
         const data = await response.json();
-        displayData(section, data);
+        const previous = loadMore && sectionPages[section] ? sectionPages[section].items : [];
+        sectionPages[section] = {
+            items: previous.concat(data),
+            nextCursor: response.headers.get('X-Next-Cursor')
+        };
+        displayData(section, sectionPages[section].items);
         
     } catch (error) {
         console.error(`Error loading ${section}:`, error);
@@ -83,4 +98,12 @@ function displayData(section, data) {
             displayProducts(data, container);
             break;
     }
+
+    if (sectionPages[section]?.nextCursor) {
+        const loadMoreBtn = document.createElement('button');
+        loadMoreBtn.className = 'btn-secondary load-more';
+        loadMoreBtn.textContent = 'Load more';
+        loadMoreBtn.addEventListener('click', () => loadSectionData(section, true));
+        container.appendChild(loadMoreBtn);
+    }
 }
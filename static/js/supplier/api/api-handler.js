@@ -75,4 +75,26 @@ async function handleApiRequest(endpoint, options = {}) {
     }
 }
 
-export { handleApiRequest };
+const PAGE_SIZE = 50;
+
+// Fetch one page of a list endpoint; nextCursor is null on the last page
+async function fetchPage(endpoint, cursor = null, limit = PAGE_SIZE) {
+    const params = new URLSearchParams({ limit });
+    if (cursor) {
+        params.append('cursor', cursor);
+    }
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const response = await handleApiRequest(`${endpoint}${separator}${params}`);
+    return {
+        items: await response.json(),
+        nextCursor: response.headers.get('X-Next-Cursor')
+    };
+}
+
+// Every row in one streamed response, for pickers that really do need them all
+async function fetchAllPages(endpoint) {
+    const page = await fetchPage(endpoint, null, 'all');
+    return page.items;
+}
+
+export { handleApiRequest, fetchPage, fetchAllPages };
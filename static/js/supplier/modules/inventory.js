@@ -1,17 +1,23 @@
-import { handleApiRequest } from '../api/api-handler.js';
+import { handleApiRequest, fetchPage, fetchAllPages } from '../api/api-handler.js';
+import { renderLoadMore } from '../ui/pagination.js';
 
-async function loadInventory() {
+let inventoryPage = { items: [], nextCursor: null };
+
+async function loadInventory(loadMore = false) {
     try {
-        console.log('Fetching inventory...');
-        const response = await handleApiRequest('/api/inventory');
-        const inventory = await response.json();
-        console.log('Inventory data:', inventory);
+        const page = await fetchPage('/api/inventory', loadMore ? inventoryPage.nextCursor : null);
 
-        if (!Array.isArray(inventory)) {
+        if (!Array.isArray(page.items)) {
             throw new Error('Invalid inventory data received');
         }
 
-        displayInventory(inventory);
+        inventoryPage = {
+            items: loadMore ? inventoryPage.items.concat(page.items) : page.items,
+            nextCursor: page.nextCursor
+        };
+
+        await displayInventory(inventoryPage.items);
+        renderLoadMore(document.getElementById('inventoryList'), inventoryPage.nextCursor, () => loadInventory(true));
     } catch (error) {
         console.error('Error loading inventory:', error);
         document.getElementById('inventoryList').innerHTML = `
@@ -185,14 +191,11 @@ async function removeInventoryItem(productId) {
 async function openInventoryModal() {
     try {
         // Load both products and inventory to compare
-        const [productsResponse, inventoryResponse] = await Promise.all([
-            handleApiRequest('/api/products'),
-            handleApiRequest('/api/inventory')
+        const [products, inventory] = await Promise.all([
+            fetchAllPages('/api/products'),
+            fetchAllPages('/api/inventory')
         ]);
 
-        const products = await productsResponse.json();
-        const inventory = await inventoryResponse.json();
-
         // Create set of product IDs already in inventory
         const inventoryProductIds = new Set(inventory.map(item => item.product_id));
 
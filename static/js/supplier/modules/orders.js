@@ -1,10 +1,17 @@
-import { handleApiRequest } from '../api/api-handler.js';
+import { handleApiRequest, fetchPage } from '../api/api-handler.js';
+import { renderLoadMore } from '../ui/pagination.js';
 
-async function loadOrders() {
+let ordersPage = { items: [], nextCursor: null };
+
+async function loadOrders(loadMore = false) {
     try {
-        const response = await handleApiRequest('/api/orders/supplier');
-        const orders = await response.json();
-        displayOrders(orders);
+        const page = await fetchPage('/api/orders/supplier', loadMore ? ordersPage.nextCursor : null);
+        ordersPage = {
+            items: loadMore ? ordersPage.items.concat(page.items) : page.items,
+            nextCursor: page.nextCursor
+        };
+        displayOrders(ordersPage.items);
+        renderLoadMore(document.getElementById('ordersList'), ordersPage.nextCursor, () => loadOrders(true));
     } catch (error) {
         console.error('Error loading orders:', error);
         throw error;
@@ -1,14 +1,19 @@
-import { handleApiRequest } from '../api/api-handler.js';
+import { fetchPage } from '../api/api-handler.js';
+import { renderLoadMore } from '../ui/pagination.js';
+import { productImageHtml } from '../ui/images.js';
 
-async function loadProducts() {
+let productsPage = { items: [], nextCursor: null };
+
+async function loadProducts(loadMore = false) {
     try {
-        // First fetch all products
-        console.log('Fetching all products...');
-        const productsResponse = await handleApiRequest('/api/products');
-        const products = await productsResponse.json();
-        console.log('Products data:', products);
+        const page = await fetchPage('/api/products', loadMore ? productsPage.nextCursor : null);
+        productsPage = {
+            items: loadMore ? productsPage.items.concat(page.items) : page.items,
+            nextCursor: page.nextCursor
+        };
 
-        displayProducts(products);
+        displayProducts(productsPage.items);
+        renderLoadMore(document.getElementById('productsList'), productsPage.nextCursor, () => loadProducts(true));
     } catch (error) {
         console.error('Error loading products:', error);
         document.getElementById('productsList').innerHTML = `
@@ -37,9 +42,7 @@ function displayProducts(products) {
         const imageContainer = document.createElement('div');
         imageContainer.className = 'product-image';
         if (product.image) {
-            imageContainer.innerHTML = `
-                <img src="/${product.image}" alt="${product.name}" />
-            `;
+            imageContainer.innerHTML = productImageHtml(product);
         } else {
             imageContainer.innerHTML = `
                 <div class="no-image">
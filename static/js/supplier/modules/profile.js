@@ -203,6 +203,10 @@ function setupProfileFormListeners() {
                 });
                 
                 if (response.ok) {
+                    // Old tokens are invalidated by the password change
+                    const data = await response.json();
+                    localStorage.setItem('token', data.access_token);
+                    localStorage.setItem('refresh_token', data.refresh_token);
                     alert('Password updated successfully!');
                     passwordForm.reset();
                 } else {
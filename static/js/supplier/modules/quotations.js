@@ -1,10 +1,17 @@
-import { handleApiRequest } from '../api/api-handler.js';
+import { handleApiRequest, fetchPage, fetchAllPages } from '../api/api-handler.js';
+import { renderLoadMore } from '../ui/pagination.js';
 
-async function loadQuotations() {
+let quotationsPage = { items: [], nextCursor: null };
+
+async function loadQuotations(loadMore = false) {
     try {
-        const response = await handleApiRequest('/api/quotations');
-        const quotations = await response.json();
-        displayQuotations(quotations);
+        const page = await fetchPage('/api/quotations', loadMore ? quotationsPage.nextCursor : null);
+        quotationsPage = {
+            items: loadMore ? quotationsPage.items.concat(page.items) : page.items,
+            nextCursor: page.nextCursor
+        };
+        displayQuotations(quotationsPage.items);
+        renderLoadMore(document.getElementById('quotationsList'), quotationsPage.nextCursor, () => loadQuotations(true));
     } catch (error) {
         console.error('Error loading quotations:', error);
         throw error;
@@ -76,8 +83,7 @@ function removeQuotationItem(button) {
 
 async function populateProductSelect(select) {
     try {
-        const response = await handleApiRequest('/api/products');
-        const products = await response.json();
+        const products = await fetchAllPages('/api/products');
         const selects = select ? [select] : document.querySelectorAll('.product-select');
         
         selects.forEach(select => {
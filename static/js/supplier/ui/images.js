@@ -0,0 +1,25 @@
+// Responsive product image markup; falls back to the original upload until variants exist
+export function productImageHtml(product) {
+    const variants = product.image_variants;
+    if (!variants) {
+        return `<img src="/${product.image}" alt="${product.name}" loading="lazy" />`;
+    }
+    const widths = { thumb: 160, card: 480, full: 1280 };
+    const srcset = (format) => Object.keys(widths)
+        .filter(size => variants[size] && variants[size][format])
+        .map(size => `${variants[size][format]} ${widths[size]}w`)
+        .join(', ');
+    const fallback = variants.card.jpeg ? 'jpeg' : 'png';
+    const sources = ['avif', 'webp']
+        .filter(format => variants.card[format])
+        .map(format => `<source type="image/${format}" srcset="${srcset(format)}" sizes="(max-width: 600px) 100vw, 320px" />`)
+        .join('');
+    return `
+        <picture>
+            ${sources}
+            <img src="${variants.card[fallback]}" srcset="${srcset(fallback)}" sizes="(max-width: 600px) 100vw, 320px"
+                 alt="${product.name}" loading="lazy" decoding="async"
+                 style="background: url('${variants.placeholder}') center / cover no-repeat;" />
+        </picture>
+    `;
+}
@@ -0,0 +1,12 @@
+// Append a "Load more" button under a list when there is another page
+function renderLoadMore(container, nextCursor, onLoadMore) {
+    if (!container || !nextCursor) return;
+
+    const button = document.createElement('button');
+    button.className = 'btn-secondary load-more';
+    button.textContent = 'Load more';
+    button.addEventListener('click', onLoadMore);
+    container.appendChild(button);
+}
+
+export { renderLoadMore };
@@ -0,0 +1,107 @@
+import io
+import pytest
+from flask import request, request_started
+from app import create_app, db
+from app.models.inventory import Inventory
+from app.models.user import User, UserRole
+from app.utils import images, seed as seed_data
+from config import Config
+
+SUPPLIER_PASSWORD = seed_data.SUPPLIER_PASSWORD
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    # Every view's @query_budget is enforced: an overrun raises with the statements listed
+    QUERY_TRACKING = True
+    QUERY_BUDGET_STRICT = True
+    RATE_LIMIT_ENABLED = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+
+class Api:
+    """Test client that logs in once per account and checks status codes"""
+
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+        self.tokens = {}
+
+    def login(self, email, password):
+        response = self.client.post('/api/users/login', json={'email': email, 'password': password})
+        assert response.status_code == 200, response.get_json()
+        self.tokens[email] = response.get_json()
+        return self.tokens[email]
+
+    def headers(self, email, token='access_token'):
+        return {'Authorization': f'Bearer {self.tokens[email][token]}'}
+
+    def call(self, method, url, as_=None, expect=200, token='access_token', headers=None, **kwargs):
+        headers = {**(self.headers(as_, token) if as_ else {}), **(headers or {})}
+        response = self.client.open(url, method=method, headers=headers, **kwargs)
+        assert response.status_code == expect, (method, url, response.status_code, response.get_data(as_text=True))
+        return response
+
+    def get(self, url, as_=None, **kwargs):
+        return self.call('GET', url, as_, **kwargs).get_json()
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build an app on a fresh in-memory database; keyword arguments override TestConfig"""
+    def factory(**overrides):
+        config = type('Config', (TestConfig,), {
+            'REVOKED_TOKEN_SIGNAL_FILE': str(tmp_path / 'revoked_tokens.signal'),
+            'UPLOAD_ROOT': str(tmp_path / 'uploads'),
+            **overrides
+        })
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+        return app
+    yield factory
+    images.shutdown()  # Variant jobs write under tmp_path, so let them finish first
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+def png(color=(200, 30, 30)):
+    """A small PNG upload for multipart form data"""
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buffer, format='PNG')
+    buffer.seek(0)
+    return buffer, 'widget.png'
+
+def seed(app, **sizes):
+    """Seed a small dataset; returns (admin email, email of the supplier holding the most stock)"""
+    with app.app_context():
+        seed_data.generate(**{'suppliers': 3, 'products': 12, 'quotations': 20, 'seed': 1, **sizes})
+        supplier_id = (db.session.query(Inventory.supplier_id)
+                       .group_by(Inventory.supplier_id)
+                       .order_by(db.func.count().desc(), Inventory.supplier_id)
+                       .limit(1).scalar())
+        admin = User.query.filter_by(role=UserRole.ADMIN).first()
+        return admin.email, db.session.get(User, supplier_id).email
+
+def seeded_api(app):
+    """Seed app and log in the admin and one supplier, as api.admin and api.supplier"""
+    admin, supplier = seed(app)
+    client = Api(app)
+    client.login(admin, app.config['ADMIN_PASSWORD'])
+    client.login(supplier, SUPPLIER_PASSWORD)
+    client.admin, client.supplier = admin, supplier
+    return client
+
+@pytest.fixture
+def api(app):
+    return seeded_api(app)
+
+@pytest.fixture
+def endpoints_hit(app):
+    """Names of the endpoints the app has dispatched to"""
+    hit = set()
+    def record(sender, **extra):
+        hit.add(request.endpoint)
+    request_started.connect(record, app)
+    yield hit
+    request_started.disconnect(record, app)
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import inspect, text
+from app import db
+from app.utils import bootstrap
+
+def test_check_schema_adds_server_defaulted_columns(make_app, tmp_path):
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'old.db'}")
+    with app.app_context():
+        db.session.execute(text("INSERT INTO users (name, email, password_hash, role, status) "
+                                "VALUES ('old', 'old@example.com', 'x', 'SUPPLIER', 'ACTIVE')"))
+        db.session.execute(text('ALTER TABLE users DROP COLUMN token_version'))
+        db.session.commit()
+
+        assert bootstrap.check_schema() == []
+        assert 'token_version' in {column['name'] for column in inspect(db.engine).get_columns('users')}
+        assert db.session.execute(text('SELECT token_version FROM users')).scalar() == 1
+
+def test_check_schema_refuses_columns_without_a_default(make_app, tmp_path):
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'old.db'}")
+    with app.app_context():
+        db.session.execute(text('ALTER TABLE users DROP COLUMN name'))
+        db.session.commit()
+        with pytest.raises(bootstrap.SchemaError, match=r'users \(name\)'):
+            bootstrap.check_schema()
+
+def test_check_schema_creates_missing_indexes(make_app, tmp_path):
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'old.db'}")
+    with app.app_context():
+        dropped = {name: table for name, table in db.session.execute(text(
+            "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+        ))}
+        assert {'ix_orders_status', 'ix_quotations_supplier_user_id', 'ix_inventory_supplier_id'} <= set(dropped)
+        for name in dropped:
+            db.session.execute(text(f'DROP INDEX {name}'))
+        db.session.commit()
+
+        assert bootstrap.check_schema() == []
+        inspector = inspect(db.engine)
+        for name, table in dropped.items():
+            assert name in {index['name'] for index in inspector.get_indexes(table)}
+        assert bootstrap.check_schema() == []
@@ -0,0 +1,36 @@
+import json
+from app.utils.query_tracker import QUERY_COUNT_HEADER
+from tests.conftest import seeded_api
+from tests.test_query_budgets import stocked_products
+
+def test_bulk_rejects_bad_lines_and_applies_the_rest(api):
+    _, (first, second) = stocked_products(api)
+    lines = [
+        {'product_id': first, 'quantity': 2, 'mode': 5},
+        {'product_id': first, 'quantity': 1.7},
+        {'product_id': first, 'quantity': True},
+        {'product_id': second, 'quantity': 2.0, 'mode': 'add'},
+        {'product_id': first, 'quantity': '12'},
+    ]
+    report = api.call('POST', '/api/inventory/bulk', api.supplier,
+                      data=''.join(json.dumps(line) + '\n' for line in lines),
+                      headers={'Content-Type': 'application/x-ndjson'}).get_json()
+
+    assert report['processed'] == 2
+    assert report['errors'] == [
+        {'line': 1, 'error': "mode must be 'set' or 'add'"},
+        {'line': 2, 'error': 'product_id and quantity must be integers'},
+        {'line': 3, 'error': 'product_id and quantity must be integers'},
+    ]
+    inventory = {item['product_id']: item['quantity'] for item in api.get('/api/inventory', api.supplier)}
+    assert inventory[first] == 12
+
+def test_bulk_budget_scales_with_chunks(make_app):
+    api = seeded_api(make_app(BULK_INVENTORY_CHUNK_SIZE=2))
+    _, products = stocked_products(api, count=5)
+    rows = ''.join(f'{product_id},{n + 1},add\n' for n, product_id in enumerate(products))
+    response = api.call('POST', '/api/inventory/bulk', api.supplier, data='product_id,quantity,mode\n' + rows,
+                        headers={'Content-Type': 'text/csv'})
+    assert response.get_json()['processed'] == 5
+    # Three chunks: over one chunk's budget of 7, within three
+    assert 7 < int(response.headers[QUERY_COUNT_HEADER]) <= 21
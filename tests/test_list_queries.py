@@ -0,0 +1,33 @@
+"""List endpoints must run the same statements whatever the number of rows they return"""
+from app.utils.query_tracker import QUERY_COUNT_HEADER
+from tests.conftest import Api, seed, SUPPLIER_PASSWORD
+
+N = 15  # quotations in the small dataset; the large one has 10N
+
+LISTS = [
+    ('/api/orders/', 'admin'),
+    ('/api/orders/supplier', 'supplier'),
+    ('/api/quotations/', 'admin'),
+    ('/api/quotations/', 'supplier'),
+]
+
+def _statement_counts(make_app, quotations):
+    app = make_app()
+    admin, supplier = seed(app, quotations=quotations)
+    api = Api(app)
+    api.login(admin, app.config['ADMIN_PASSWORD'])
+    api.login(supplier, SUPPLIER_PASSWORD)
+    accounts = {'admin': admin, 'supplier': supplier}
+    counts = {}
+    for url, account in LISTS:
+        response = api.call('GET', f"{url}?limit={app.config['PAGE_SIZE_MAX']}", accounts[account])
+        counts[url, account] = (int(response.headers[QUERY_COUNT_HEADER]), len(response.get_json()))
+    return counts
+
+def test_list_statement_counts_do_not_grow_with_rows(make_app):
+    small = _statement_counts(make_app, N)
+    large = _statement_counts(make_app, 10 * N)
+    for key in small:
+        (small_statements, small_rows), (large_statements, large_rows) = small[key], large[key]
+        assert large_rows > small_rows, key
+        assert large_statements == small_statements, key
@@ -0,0 +1,30 @@
+from app import db
+from app.utils.query_tracker import QueryTracker
+from tests.conftest import png
+
+def test_search_escapes_product_text_in_snippets(api):
+    api.call('POST', '/api/products/', api.admin, data={
+        'name': '<script>alert(1)</script> Widget & Co', 'part_number': 'EW-1'
+    }, expect=201)
+    [result] = [r for r in api.get('/api/products/search?q=widget', api.admin) if r['part_number'] == 'EW-1']
+    assert result['snippet'] == '&lt;script&gt;alert(1)&lt;/script&gt; <mark>Widget</mark> &amp; Co'
+
+def test_search_rejects_non_positive_limits(api):
+    for limit in ('0', '-1'):
+        api.call('GET', f'/api/products/search?q=widget&limit={limit}', api.admin, expect=400)
+    api.call('GET', '/api/products/search?q=widget&limit=abc', api.admin, expect=400)
+
+def test_image_upload_stays_under_upload_root(api, tmp_path):
+    with QueryTracker(engine=_engine(api)) as queries:
+        product = api.call('POST', '/api/products/', api.admin, data={
+            'name': 'Pictured Widget', 'part_number': 'PW-1', 'image': png()
+        }, expect=201).get_json()
+    assert len([fp for fp, _, _ in queries.statements if 'FROM image_variants' in fp]) == 1
+
+    stored = tmp_path / 'uploads' / product['image'].split('/', 1)[1]
+    assert stored.is_file()
+    assert api.client.get(f"/{product['image']}").data == stored.read_bytes()
+
+def _engine(api):
+    with api.app.app_context():
+        return db.engine
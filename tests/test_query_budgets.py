@@ -0,0 +1,117 @@
+"""
+Every routed view run against its @query_budget.
+
+The app fixture turns on QUERY_BUDGET_STRICT, so a view running more SQL
+statements than its budget raises QueryBudgetExceeded with the statements
+listed. Each flow walks one area of the API; the last test checks that the
+flows between them reach every view that declares a budget.
+"""
+import pytest
+from app.models.inventory import Inventory
+from app.models.user import User
+from tests.conftest import png
+
+def stocked_products(api, count=2):
+    with api.app.app_context():
+        supplier_id = User.query.filter_by(email=api.supplier).one().id
+        rows = (Inventory.query.filter(Inventory.supplier_id == supplier_id, Inventory.quantity >= 5)
+                .order_by(Inventory.product_id).limit(count).all())
+        assert len(rows) == count
+        return supplier_id, [row.product_id for row in rows]
+
+def flow_users(api):
+    user = api.call('POST', '/api/users/register', json={
+        'name': 'New Supplier', 'email': 'new@example.com', 'password': 'secret'
+    }, expect=201).get_json()
+    api.login('new@example.com', 'secret')
+    api.get('/api/users/profile', 'new@example.com')
+    api.call('PUT', '/api/users/profile', 'new@example.com', json={'address': '1 Main St'})
+    api.get('/api/users/verify', 'new@example.com')
+    api.call('POST', '/api/users/refresh', 'new@example.com')
+    api.tokens['new@example.com'] = api.call('PUT', '/api/users/password', 'new@example.com', json={
+        'current_password': 'secret', 'new_password': 'secret2'
+    }).get_json()
+    api.call('POST', '/api/users/revoke-refresh-token', 'new@example.com')
+    # Revoking spends the token presented, so log out from a new session
+    api.login('new@example.com', 'secret2')
+    api.call('POST', '/api/users/logout', 'new@example.com')
+
+    api.get('/api/users/', api.admin)
+    api.get(f"/api/users/user/{user['id']}", api.admin)
+    api.call('POST', f"/api/users/{user['id']}/block", api.admin)
+    api.get('/api/users/blocked', api.admin)
+    api.call('POST', f"/api/users/{user['id']}/unblock", api.admin)
+    api.call('DELETE', f"/api/users/user/{user['id']}", api.admin)
+
+def flow_products(api):
+    product = api.call('POST', '/api/products/', api.admin, data={
+        'name': 'Budget Widget', 'part_number': 'BW-1', 'description': 'A widget for budgets', 'image': png()
+    }, expect=201).get_json()
+    api.get('/api/products/', api.admin)
+    api.get('/api/products/?sort=availability&in_stock=true', api.admin)
+    api.get('/api/products/search?q=widget', api.admin)
+    api.get(f"/api/products/{product['id']}", api.admin)
+    api.call('PUT', f"/api/products/{product['id']}", api.admin, data={'category': 'Widgets'})
+    # A new image releases the old one, which nothing else shares, so it is swept too: the longest update
+    api.call('PUT', f"/api/products/{product['id']}", api.admin, data={'image': png((30, 30, 200))})
+    # Bytes already stored only take another reference
+    api.call('POST', '/api/products/', api.admin, data={'name': 'Twin', 'part_number': 'BW-2', 'image': png()},
+             expect=201)
+    api.call('DELETE', f"/api/products/{product['id']}", api.admin)
+
+def flow_inventory(api):
+    _, (first, second) = stocked_products(api)
+    api.call('POST', '/api/inventory/add', api.supplier, json={'product_id': first, 'quantity': 3})
+    api.call('POST', '/api/inventory/remove', api.supplier, json={'product_id': first, 'quantity': 1})
+    api.call('PUT', '/api/inventory/update', api.supplier, json={'product_id': second, 'quantity': 40})
+    api.get('/api/inventory', api.supplier)
+    report = api.call('POST', '/api/inventory/bulk', api.supplier,
+                      data=f'product_id,quantity,mode\n{first},5,add\n{second},30,set\n',
+                      headers={'Content-Type': 'text/csv'}).get_json()
+    assert report['failed'] == 0
+
+def flow_procurement(api):
+    supplier_id, products = stocked_products(api)
+    items = [{'product_id': product_id, 'qty': 1, 'price': 9.5} for product_id in products]
+
+    def quotation():
+        return api.call('POST', '/api/quotations/', api.admin, json={
+            'supplier_user_id': supplier_id, 'items': items
+        }, expect=201).get_json()
+
+    approved, declined, accepted, removed = quotation(), quotation(), quotation(), quotation()
+    api.get('/api/quotations/', api.admin)
+    api.get(f"/api/quotations/{approved['id']}", api.supplier)
+    api.call('PUT', f"/api/quotations/{approved['id']}", api.admin, json={'items': items[:1]})
+    api.call('DELETE', f"/api/quotations/{removed['id']}", api.admin)
+
+    order = api.call('POST', f"/api/quotations/{approved['id']}/approve", api.admin).get_json()['order']
+    api.call('POST', f"/api/quotations/{declined['id']}/reject", api.admin)
+    api.call('PUT', f"/api/quotations/{accepted['id']}", api.supplier, json={'status': 'accepted'})
+    extra = api.call('POST', '/api/orders/', api.admin, json={'quotation_id': accepted['id']}, expect=201).get_json()
+
+    api.get('/api/orders/', api.admin)
+    api.get('/api/orders/supplier', api.supplier)
+    api.get(f"/api/orders/{order['id']}", api.supplier)
+    for status, account in [('confirmed', api.supplier), ('shipped', api.supplier), ('completed', api.admin)]:
+        api.call('PUT', f"/api/orders/{order['id']}", account, json={'status': status})
+    api.call('DELETE', f"/api/orders/{extra['id']}", api.admin)
+
+def flow_dashboards(api):
+    cursor = api.get('/api/changes', api.admin)['cursor']
+    api.get(f'/api/changes?since={cursor}', api.supplier)
+    api.get('/api/dashboard/summary', api.admin)
+    api.get('/api/dashboard/summary', api.supplier)
+    api.call('GET', '/api/metrics', api.admin)
+
+FLOWS = [flow_users, flow_products, flow_inventory, flow_procurement, flow_dashboards]
+
+@pytest.mark.parametrize('flow', FLOWS, ids=lambda flow: flow.__name__)
+def test_flow_stays_within_query_budgets(api, flow):
+    flow(api)
+
+def test_flows_reach_every_budgeted_view(api, endpoints_hit):
+    for flow in FLOWS:
+        flow(api)
+    budgeted = {endpoint for endpoint, view in api.app.view_functions.items() if hasattr(view, 'query_budget')}
+    assert budgeted - endpoints_hit == set()
@@ -0,0 +1,41 @@
+import os
+from app.utils.static_files import StaticManifest
+
+def _manifest(root):
+    manifest = StaticManifest()
+    manifest.root = str(root)
+    manifest.auto_reload = True
+    manifest.build()
+    return manifest
+
+def _touch_later(path, content):
+    stat = os.stat(path) if os.path.exists(path) else None
+    path.write_text(content)
+    if stat:  # Make sure the change is visible on coarse-mtime filesystems
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+def test_unknown_paths_do_not_rescan(tmp_path, monkeypatch):
+    (tmp_path / 'index.html').write_text('<html>')
+    manifest = _manifest(tmp_path)
+    builds = []
+    monkeypatch.setattr(manifest, '_build', lambda: builds.append(1))
+    for path in ('orders/42', 'missing.js', 'api/nothing'):
+        assert manifest.lookup(path) is None
+    assert builds == []
+
+def test_auto_reload_picks_up_added_edited_and_removed_files(tmp_path):
+    (tmp_path / 'index.html').write_text('<html>')
+    (tmp_path / 'js').mkdir()
+    manifest = _manifest(tmp_path)
+    etag = manifest.lookup('index.html')['etag']
+
+    _touch_later(tmp_path / 'index.html', '<html lang="en">')
+    assert manifest.lookup('index.html')['etag'] != etag
+
+    (tmp_path / 'js' / 'app.js').write_text('run()')
+    os.utime(tmp_path / 'js', ns=(0, os.stat(tmp_path / 'js').st_mtime_ns + 10 ** 9))
+    assert manifest.lookup('js/app.js')['mimetype'] in ('text/javascript', 'application/javascript')
+
+    (tmp_path / 'js' / 'app.js').unlink()
+    os.utime(tmp_path / 'js', ns=(0, os.stat(tmp_path / 'js').st_mtime_ns + 10 ** 9))
+    assert manifest.lookup('js/app.js') is None
@@ -0,0 +1,67 @@
+import pytest
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models.inventory import Inventory
+from app.models.user import User, UserRole, UserStatus
+from app.utils import counters
+from tests.conftest import Api, seeded_api
+
+def test_login_upgrades_outdated_hash_within_budget(app):
+    with app.app_context():
+        user = User(name='Legacy', email='legacy@example.com', role=UserRole.SUPPLIER, status=UserStatus.ACTIVE,
+                    password_hash=generate_password_hash('secret', 'pbkdf2:sha256:500'))
+        db.session.add(user)
+        db.session.commit()
+        token_version = user.token_version
+
+    api = Api(app)
+    tokens = api.login('legacy@example.com', 'secret')
+    assert tokens['user']['email'] == 'legacy@example.com'
+
+    with app.app_context():
+        user = User.query.filter_by(email='legacy@example.com').one()
+        assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+        assert user.token_version == token_version
+    # Upgrading the hash keeps the password, so the tokens just issued stay valid
+    assert api.get('/api/users/profile', 'legacy@example.com')['email'] == 'legacy@example.com'
+    api.login('legacy@example.com', 'secret')
+
+def _supplier(api):
+    with api.app.app_context():
+        user = User.query.filter_by(email=api.supplier).one()
+        return user.id, user.status, user.token_version
+
+@pytest.mark.parametrize('method, url', [('POST', '/api/users/{}/block'), ('DELETE', '/api/users/user/{}')])
+def test_user_changes_commit_with_their_counters(api, monkeypatch, method, url):
+    user_id, status, token_version = _supplier(api)
+    def fail(*args, **kwargs):
+        raise RuntimeError('counter update failed')
+    monkeypatch.setattr(counters, 'bump', fail)
+    monkeypatch.setattr(counters, 'move', fail)
+
+    response = api.client.open(url.format(user_id), method=method, headers=api.headers(api.admin))
+    assert response.status_code != 200
+    assert _supplier(api) == (user_id, status, token_version)
+    assert api.get('/api/users/profile', api.supplier)['id'] == user_id
+
+def test_deleted_users_tokens_are_rejected(make_app):
+    # Reload from the database on every request, as a worker that didn't handle the deletion would
+    app = make_app(REVOKED_TOKEN_SYNC_INTERVAL=0)
+    api = seeded_api(app)
+    user_id = api.call('POST', '/api/users/register', json={
+        'name': 'Leaving Supplier', 'email': 'leaving@example.com', 'password': 'secret'
+    }, expect=201).get_json()['id']
+    api.login('leaving@example.com', 'secret')
+    api.get('/api/inventory', 'leaving@example.com')
+    api.call('DELETE', f'/api/users/user/{user_id}', api.admin)
+
+    for method, url, kwargs in [
+        ('GET', '/api/orders/supplier', {}),
+        ('GET', '/api/inventory', {}),
+        ('GET', '/api/dashboard/summary', {}),
+        ('POST', '/api/inventory/add', {'json': {'product_id': 1, 'quantity': 1}}),
+        ('POST', '/api/users/refresh', {'token': 'refresh_token'}),
+    ]:
+        api.call(method, url, 'leaving@example.com', expect=401, **kwargs)
+    with app.app_context():
+        assert Inventory.query.filter_by(supplier_id=user_id).count() == 0